@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Activity weights for language statistics.
+Weights every repository by its recent churn from the repository statistics
+endpoints (/stats/code_frequency: lines added plus deleted per week, or
+/stats/commit_activity: commits per week) over the last few weeks, so this
+week's work counts for more than a repository untouched since 2019.
+
+GitHub answers 202 Accepted while it computes these statistics. All requests
+are fired at once, so GitHub computes them in parallel, and then only the
+pending ones are retried, concurrently, until they are ready or the wait budget
+runs out. Weekly series are cached by the repository's latest commit SHA:
+an unchanged repository costs no request, and a push that did not move the
+default branch costs one (ETag-cached) commit lookup.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from readme_sections import write_atomic
+from run_tracer import trace_span
+
+CACHE_VERSION = 1
+ACTIVITY_METRICS = ('code_frequency', 'commit_activity')
+WEEK_SECONDS = 7 * 86400
+
+
+def weekly_activity(metric: str, payload) -> List[List[int]]:
+    """[[week start, activity]] from a stats payload"""
+    if not isinstance(payload, list):
+        return []
+    if metric == 'commit_activity':
+        return [[int(week.get('week', 0)), int(week.get('total', 0))] for week in payload if isinstance(week, dict)]
+    # code_frequency rows are [week, additions, deletions (negative)]
+    return [[int(row[0]), int(row[1]) + abs(int(row[2]))] for row in payload if isinstance(row, list) and len(row) >= 3]
+
+
+def window_week(now: float) -> int:
+    """Index of the stats week (they start Sunday 00:00 UTC) containing now; the window only moves when it changes"""
+    # The epoch was a Thursday, so weeks counted from the first Sunday (Jan 4, 1970) line up with GitHub's
+    return int((now - 3 * 86400) // WEEK_SECONDS)
+
+
+def window_total(weeks: List[List[int]], window_weeks: int, now: float) -> int:
+    """Activity in the weeks that started within the window"""
+    since = now - window_weeks * WEEK_SECONDS
+    return sum(amount for week, amount in weeks if week >= since)
+
+
+class ActivityWeights:
+    def __init__(self, updater, cache_path: str, metric: str = 'code_frequency', window_weeks: int = 12,
+                 max_wait: float = 60.0, poll_interval: float = 2.0):
+        if metric not in ACTIVITY_METRICS:
+            raise ValueError(f"ACTIVITY_METRIC must be one of {', '.join(ACTIVITY_METRICS)}, not {metric!r}")
+        self.updater = updater
+        self.cache_path = cache_path
+        self.metric = metric
+        self.window_weeks = window_weeks
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_env(cls, updater) -> Optional['ActivityWeights']:
+        """Build from ACTIVITY_* variables (None unless ACTIVITY_WEIGHTING=true)"""
+        if os.getenv('ACTIVITY_WEIGHTING', 'false').lower() != 'true':
+            return None
+        workspace = os.getenv('GITHUB_WORKSPACE', '.')
+        return cls(
+            updater,
+            os.getenv('ACTIVITY_CACHE_PATH') or os.path.join(workspace, '.cache', 'activity-cache.json'),
+            metric=os.getenv('ACTIVITY_METRIC', 'code_frequency').lower(),
+            window_weeks=int(os.getenv('ACTIVITY_WINDOW_WEEKS', '12')),
+            max_wait=float(os.getenv('ACTIVITY_MAX_WAIT', '60')),
+        )
+
+    def load_cache(self) -> Dict[str, Dict]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable activity cache: {e}")
+            return {}
+        # Series of another account or metric are useless here
+        if (cache.get('version') != CACHE_VERSION or cache.get('username') != self.updater.username
+                or cache.get('metric') != self.metric):
+            return {}
+        return cache.get('repositories', {})
+
+    def save_cache(self, entries: Dict[str, Dict]) -> None:
+        payload = {'version': CACHE_VERSION, 'username': self.updater.username, 'metric': self.metric,
+                   'repositories': entries}
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            write_atomic(self.cache_path, json.dumps(payload, separators=(',', ':'), sort_keys=True))
+        except OSError as e:
+            print(f"⚠️  Could not save activity cache: {e}")
+
+    def repo_url(self, repo_name: str) -> str:
+        return f'{self.updater.base_url}/repos/{self.updater.username}/{repo_name}'
+
+    def head_sha(self, repo_name: str) -> Optional[str]:
+        """SHA of the default branch's latest commit (None for empty repositories or on failure)"""
+        commits = self.updater.make_github_request(f'{self.repo_url(repo_name)}/commits', {'per_page': 1})
+        if isinstance(commits, list) and commits:
+            return commits[0].get('sha')
+        return None
+
+    def request_stats(self, repo_name: str) -> Tuple[str, Optional[List[List[int]]]]:
+        """One stats request: ('ready', weeks), ('pending', None) while GitHub computes, or ('failed', None)"""
+        response = self.updater.get_response(f'{self.repo_url(repo_name)}/stats/{self.metric}')
+        if response is None:
+            return 'failed', None
+        if response.status_code == 202:
+            return 'pending', None
+        if response.status_code == 204:
+            # Empty repository: no activity at all
+            return 'ready', []
+        if response.status_code != 200:
+            # 422: too many commits for GitHub to compute statistics
+            return 'failed', None
+        try:
+            return 'ready', weekly_activity(self.metric, response.json())
+        except ValueError:
+            return 'failed', None
+
+    def fetch_series(self, repo_names: List[str]) -> Tuple[Dict[str, List[List[int]]], List[str]]:
+        """Fire every stats request, then retry the 202s together until ready; returns (series, unavailable)"""
+        ready: Dict[str, List[List[int]]] = {}
+        unavailable: List[str] = []
+        pending = list(repo_names)
+        deadline = time.monotonic() + self.max_wait
+        delay = self.poll_interval
+        rounds = 0
+        with ThreadPoolExecutor(max_workers=self.updater.fetch_concurrency) as pool:
+            while pending:
+                rounds += 1
+                still_pending = []
+                for repo_name, (status, weeks) in zip(pending, pool.map(self.request_stats, pending)):
+                    if status == 'ready':
+                        ready[repo_name] = weeks
+                    elif status == 'pending':
+                        still_pending.append(repo_name)
+                    else:
+                        unavailable.append(repo_name)
+                pending = still_pending
+                if not pending:
+                    break
+                if time.monotonic() + delay > deadline:
+                    print(f"⚠️  GitHub was still computing statistics for {len(pending)} repositories "
+                          f"after {self.max_wait:.0f}s (ACTIVITY_MAX_WAIT)")
+                    unavailable += pending
+                    break
+                print(f"⏳ GitHub is computing statistics for {len(pending)} repositories, "
+                      f"checking again in {delay:.0f}s")
+                with trace_span('activity_stats_wait', 'sleep', pending=len(pending)):
+                    time.sleep(delay)
+                delay = min(delay * 1.5, 10.0)
+        if repo_names:
+            print(f"  Fetched {self.metric} for {len(ready)} repositories in {rounds} round(s)")
+        return ready, unavailable
+
+    def compute(self, repositories: List[Dict]) -> Dict[str, float]:
+        """{repo name: activity in the window} for every non-fork repository"""
+        cache = self.load_cache()
+        owned = [repo for repo in repositories if not repo.get('fork', False)]
+        entries = {repo['name']: cache[repo['name']] for repo in owned if repo['name'] in cache}
+
+        # Unpushed repositories keep their series without a single request
+        pushed = [repo for repo in owned
+                  if repo['name'] not in entries or entries[repo['name']].get('pushed_at') != repo.get('pushed_at')]
+        with ThreadPoolExecutor(max_workers=self.updater.fetch_concurrency) as pool:
+            head_shas = dict(zip((repo['name'] for repo in pushed),
+                                 pool.map(self.head_sha, (repo['name'] for repo in pushed))))
+
+        stale = []
+        for repo in pushed:
+            entry = entries.get(repo['name'])
+            sha = head_shas[repo['name']]
+            if entry and sha and entry.get('sha') == sha:
+                # A push to another branch: the default branch's activity is unchanged
+                entry['pushed_at'] = repo.get('pushed_at')
+            else:
+                stale.append(repo['name'])
+
+        series, unavailable = self.fetch_series(stale)
+        pushed_at = {repo['name']: repo.get('pushed_at') for repo in owned}
+        for repo_name, weeks in series.items():
+            entries[repo_name] = {'sha': head_shas.get(repo_name), 'pushed_at': pushed_at[repo_name], 'weeks': weeks}
+        if unavailable:
+            stale_kept = sum(1 for repo_name in unavailable if repo_name in entries)
+            print(f"⚠️  No fresh activity statistics for {len(unavailable)} repositories "
+                  f"({stale_kept} use their previous series, the rest count as idle)")
+            # Keep the old series, but make the next run ask again
+            for repo_name in unavailable:
+                if repo_name in entries:
+                    entries[repo_name]['pushed_at'] = None
+        self.save_cache(entries)
+
+        now = time.time()
+        weights = {repo_name: float(window_total(entry.get('weeks', []), self.window_weeks, now))
+                   for repo_name, entry in entries.items()}
+        print(f"🔥 Activity over the last {self.window_weeks} weeks ({self.metric}): "
+              f"{sum(1 for weight in weights.values() if weight > 0)} of {len(owned)} repositories active; "
+              f"reused {len(owned) - len(stale)} cached series, fetched {len(series)}")
+        return weights
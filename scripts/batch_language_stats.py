@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Batch language statistics for several GitHub users and organizations.
+All accounts in a process share one HTTP connection pool, response cache
+and rate-limit scheduler; each account still gets its own JSON output
+(and README, when one exists in its output directory).
+
+Usage:
+    python scripts/batch_language_stats.py alice org:acme user:bob
+    GITHUB_ACCOUNTS="alice,org:acme" python scripts/batch_language_stats.py --processes 2
+    python scripts/batch_language_stats.py alice org:acme --confirm-publish   # after pushing the outputs
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+from typing import List, Tuple
+
+from github_cache import ResponseCache
+from github_session import create_github_session
+from rate_limiter import RateLimitError, RateLimitScheduler
+from token_pool import TokenPool, env_tokens
+from update_language_stats import LanguageStatsUpdater
+
+# Per-process shared resources, created once by init_worker
+_shared = {}
+
+
+def parse_accounts(values: List[str]) -> List[Tuple[str, str]]:
+    """Parse 'name', 'user:name' and 'org:name' entries into (account_type, name) pairs"""
+    accounts = []
+    for value in values:
+        for item in re.split(r'[\s,]+', value.strip()):
+            if not item:
+                continue
+            account_type, _, name = item.rpartition(':')
+            account_type = account_type or 'user'
+            if account_type not in ('user', 'org'):
+                raise ValueError(f"Unknown account type '{account_type}' in '{item}'")
+            accounts.append((account_type, name))
+    return accounts
+
+
+def init_worker(github_token: str, pool_size: int) -> None:
+    """Create the session, cache, rate limiter and token pool shared by every account in this process"""
+    _shared['token'] = github_token
+    _shared['session'] = create_github_session(github_token, pool_size)
+    _shared['cache'] = ResponseCache.from_env(os.getenv('GITHUB_WORKSPACE', '.'))
+    _shared['rate_limiter'] = RateLimitScheduler.from_env()
+    _shared['token_pool'] = TokenPool.from_env(github_token)
+    _shared['validated'] = False
+
+
+def account_updater(account_type: str, name: str, output_dir: str) -> LanguageStatsUpdater:
+    """An updater for one account on the shared resources, with per-account caches and outputs"""
+    workspace = os.getenv('GITHUB_WORKSPACE', '.')
+    updater = LanguageStatsUpdater(
+        _shared['token'], name, account_type=account_type,
+        session=_shared['session'], response_cache=_shared['cache'],
+        rate_limiter=_shared['rate_limiter'], token_pool=_shared['token_pool'],
+    )
+    account_dir = os.path.join(output_dir, name)
+    updater.snapshot_path = os.path.join(workspace, '.cache', 'snapshots', f'{name}.json')
+    updater.manifest_cache_path = os.path.join(workspace, '.cache', 'manifests', f'{name}.json')
+    updater.watermark_path = os.path.join(workspace, '.cache', 'watermarks', f'{name}.json')
+    updater.pending_publish_path = os.path.join(workspace, '.cache', 'pending-publish', f'{name}.json')
+    if updater.checkpoint:
+        updater.checkpoint.path = os.path.join(workspace, '.cache', 'checkpoints', f'{name}.json')
+    if updater.activity:
+        updater.activity.cache_path = os.path.join(workspace, '.cache', 'activity', f'{name}.json')
+    updater.readme_path = os.path.join(account_dir, 'README.md')
+    updater.extra_targets = []
+    updater.json_output_path = os.path.join(account_dir, 'language-stats.json')
+    updater.metrics_json_path = os.path.join(account_dir, 'metrics.json')
+    if updater.cards_dir:
+        updater.cards_dir = os.path.join(account_dir, 'assets')
+    return updater
+
+
+def process_accounts(accounts: List[Tuple[str, str]], output_dir: str) -> List[Tuple[str, str]]:
+    """Run the updater for each account with the shared resources; returns (account, status)"""
+    results = []
+
+    for account_type, name in accounts:
+        updater = account_updater(account_type, name, output_dir)
+
+        # The token is the same for every account, so only check it once per process
+        if _shared['validated']:
+            updater.viewer_login = _shared['viewer_login']
+            updater.validate_github_token = lambda: True
+
+        try:
+            status = 'ok' if updater.run() else 'no data'
+        except RateLimitError as e:
+            # The budget is shared, so later accounts would fail the same way
+            results.append((name, f'rate limited: {e}'))
+            break
+        results.append((name, status))
+
+        if not _shared['validated']:
+            _shared['validated'] = True
+            _shared['viewer_login'] = updater.viewer_login
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Update language statistics for several accounts')
+    parser.add_argument('accounts', nargs='*',
+                        help="accounts as 'name', 'user:name' or 'org:name' (default: $GITHUB_ACCOUNTS)")
+    parser.add_argument('--output-dir', default=os.path.join(os.getenv('GITHUB_WORKSPACE', '.'), 'stats'),
+                        help='directory receiving one sub-directory per account (default: ./stats)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='shard accounts across this many processes (default: 1)')
+    parser.add_argument('--confirm-publish', action='store_true',
+                        help="record each account's last run as published; run it after the outputs were pushed")
+    args = parser.parse_args()
+
+    accounts = parse_accounts(args.accounts or [os.getenv('GITHUB_ACCOUNTS', '')])
+    if not accounts:
+        print("Error: no accounts given (pass them as arguments or set GITHUB_ACCOUNTS)")
+        return 1
+
+    github_token = os.getenv('GITHUB_TOKEN', '') or next(iter(env_tokens()), '')
+    # Listing pages and language fetches run together, each up to the fetch concurrency
+    pool_size = 2 * max(1, int(os.getenv('LANGUAGE_FETCH_CONCURRENCY', '8')))
+    if args.confirm_publish:
+        init_worker(github_token, 1)
+        for account_type, name in accounts:
+            account_updater(account_type, name, args.output_dir).confirm_publish()
+        return 0
+
+    print(f"🚀 Batch update for {len(accounts)} accounts using {args.processes} process(es)")
+
+    if args.processes <= 1:
+        init_worker(github_token, pool_size)
+        results = process_accounts(accounts, args.output_dir)
+    else:
+        # Round-robin shards; the on-disk response cache is shared between processes
+        shards = [accounts[i::args.processes] for i in range(args.processes)]
+        with multiprocessing.Pool(args.processes, initializer=init_worker,
+                                  initargs=(github_token, pool_size)) as pool:
+            shard_results = pool.starmap(process_accounts, [(shard, args.output_dir) for shard in shards if shard])
+        results = [result for shard in shard_results for result in shard]
+
+    print("=" * 50)
+    for name, status in results:
+        print(f"  {'✅' if status == 'ok' else '⚠️ '} {name}: {status}")
+
+    failed = len(accounts) - sum(1 for _, status in results if status == 'ok')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark LanguageStatsUpdater.run against the local fake GitHub API.
+Each scenario runs a cold pass (empty caches) and a warm pass (caches from
+the cold pass) in a fresh subprocess and reports wall-clock time, request
+count, 304s, retries (injected faults) and peak RSS.
+
+Usage:
+    python scripts/benchmark_language_stats.py
+    python scripts/benchmark_language_stats.py --scenario 1k --scenario faults --output bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from fake_github_server import FakeGitHubState, build_synthetic_account, start_server
+
+SCENARIOS = {
+    'small': {'repos': 10},
+    '1k': {'repos': 1_000},
+    '50k': {'repos': 50_000},
+    'faults': {'repos': 1_000, 'fail_429': 0.01, 'fail_5xx': 0.01, 'fail_403': 0.005},
+    'slow': {'repos': 1_000, 'latency_ms': 20, 'slow_rate': 0.01, 'slow_ms': 1000},
+}
+
+README_TEMPLATE = """# Benchmark profile
+
+<!-- LANG-TOOLS-START -->
+<!-- LANG-TOOLS-END -->
+
+<!-- LANG-TABLE-START -->
+| Language   | Percentage | Progress Bar |
+|------------|------------|--------------|
+<!-- LANG-TABLE-END -->
+"""
+
+LOGIN = 'bench-user'
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB (0 where unsupported)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_child() -> int:
+    """Run the updater once with the environment prepared by the parent and print a JSON result"""
+    from update_language_stats import LanguageStatsUpdater
+
+    started = time.perf_counter()
+    updater = LanguageStatsUpdater(os.getenv('GITHUB_TOKEN', ''), LOGIN)
+    # The updater logs every repository; keep console I/O out of the measurement
+    with redirect_stdout(io.StringIO()):
+        ok = updater.run()
+    wall = time.perf_counter() - started
+
+    print(json.dumps({'ok': bool(ok), 'wall_seconds': wall, 'peak_rss_kb': peak_rss_kb()}))
+    return 0
+
+
+def run_scenario(name: str, settings: dict, backend: str) -> dict:
+    """Run the cold and warm passes of one scenario against a fresh fake server"""
+    settings = dict(settings)
+    repos = settings.pop('repos')
+    state = FakeGitHubState(LOGIN, build_synthetic_account(LOGIN, repos), rate_limit=10_000_000, **settings)
+    server = start_server(state)
+    workspace = tempfile.mkdtemp(prefix=f'bench-{name}-')
+    with open(os.path.join(workspace, 'README.md'), 'w', encoding='utf-8') as file:
+        file.write(README_TEMPLATE)
+
+    env = dict(os.environ,
+               GITHUB_API_URL=f'http://127.0.0.1:{server.server_port}',
+               GITHUB_WORKSPACE=workspace,
+               GITHUB_USERNAME=LOGIN,
+               GITHUB_TOKEN='bench-token',
+               GITHUB_API_BACKEND=backend,
+               PYTHONIOENCODING='utf-8')
+    env.pop('LANGUAGE_SNAPSHOT_PATH', None)
+    env.pop('GITHUB_CACHE_DIR', None)
+
+    result = {'scenario': name, 'repos': repos, 'backend': backend}
+    try:
+        for phase in ('cold', 'warm'):
+            state.reset_counters()
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child'],
+                env=env, capture_output=True, text=True, encoding='utf-8',
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"{name}/{phase} failed:\n{completed.stderr[-2000:]}")
+            child = json.loads(completed.stdout.strip().splitlines()[-1])
+            result[phase] = {
+                'ok': child['ok'],
+                'wall_seconds': round(child['wall_seconds'], 3),
+                'peak_rss_mb': round(child['peak_rss_kb'] / 1024, 1),
+                'requests': state.stats['requests'],
+                'not_modified': state.stats['not_modified'],
+                'retries': state.stats['faults'],
+                'by_endpoint': dict(state.stats['by_endpoint']),
+            }
+    finally:
+        server.shutdown()
+    return result
+
+
+def print_table(results: list) -> None:
+    header = f"{'scenario':<10} {'repos':>7} {'phase':<5} {'wall s':>8} {'requests':>9} {'304s':>7} {'retries':>7} {'RSS MB':>7}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        for phase in ('cold', 'warm'):
+            row = result[phase]
+            print(f"{result['scenario']:<10} {result['repos']:>7} {phase:<5} {row['wall_seconds']:>8.2f} "
+                  f"{row['requests']:>9} {row['not_modified']:>7} {row['retries']:>7} {row['peak_rss_mb']:>7.1f}"
+                  f"{'' if row['ok'] else '  (no stats)'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the language stats updater offline')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable; default: small, 1k, faults)')
+    parser.add_argument('--backend', choices=('rest', 'graphql'), default='rest')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child()
+
+    results = []
+    for name in args.scenario or ['small', '1k', 'faults']:
+        print(f"⏱️  Running scenario '{name}' ({args.backend})...", file=sys.stderr)
+        results.append(run_scenario(name, SCENARIOS[name], args.backend))
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Crawl checkpoint for resumable runs.
+Records every repository's language payload as it arrives, with the pushed_at
+it was fetched for, and flushes them to a local file every few seconds and when
+a run is interrupted. The next run lists the repositories again from the first
+page (the listing is ETag-cached, so this is cheap) and reuses the recorded
+payloads of repositories that were not pushed since, so only the work that was
+still outstanding is requested. Listing pages are deliberately not replayed:
+the listing is sorted by update time, so pages recorded hours ago no longer
+line up with the pages served now. The file is removed once a run has
+assembled a complete dataset.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from readme_sections import write_atomic
+
+CHECKPOINT_VERSION = 2
+
+
+class CrawlCheckpoint:
+    def __init__(self, path: str, username: str, max_age_hours: float = 12, flush_interval: float = 5):
+        self.path = path
+        self.username = username
+        self.max_age_seconds = max_age_hours * 3600
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        # Held across serialising and writing so an older state never overwrites a newer one
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        self.state = self.empty_state()
+
+    @classmethod
+    def from_env(cls, workspace: str, username: str) -> Optional['CrawlCheckpoint']:
+        """Build the checkpoint from CRAWL_CHECKPOINT_* variables (None when disabled)"""
+        if os.getenv('CRAWL_CHECKPOINT_DISABLED', 'false').lower() == 'true':
+            return None
+        path = os.getenv('CRAWL_CHECKPOINT_PATH') or os.path.join(workspace, '.cache', 'crawl-checkpoint.json')
+        return cls(path, username, float(os.getenv('CRAWL_CHECKPOINT_MAX_AGE_HOURS', '12')))
+
+    def empty_state(self) -> Dict:
+        return {
+            'version': CHECKPOINT_VERSION,
+            'username': self.username,
+            'started_at': time.time(),
+            'languages': {},        # {repo: {'pushed_at', 'languages'}} fetched so far
+        }
+
+    def load(self, listing_key: str) -> bool:
+        """Resume from the file if it belongs to this account and listing and is recent; returns True on resume"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            state = None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable crawl checkpoint: {e}")
+            state = None
+
+        resumable = (
+            state is not None
+            and state.get('version') == CHECKPOINT_VERSION
+            and state.get('username') == self.username
+            and state.get('listing_key') == listing_key
+            and time.time() - state.get('started_at', 0) <= self.max_age_seconds
+        )
+        with self.lock:
+            if resumable:
+                self.state = state
+            else:
+                self.state = dict(self.empty_state(), listing_key=listing_key)
+            self.dirty = False
+        if resumable:
+            age_minutes = (time.time() - state['started_at']) / 60
+            print(f"⏯️  Resuming crawl from checkpoint ({age_minutes:.0f} min old): "
+                  f"{len(state['languages'])} repositories fetched")
+        return resumable
+
+    @property
+    def languages(self) -> Dict[str, Dict]:
+        return self.state['languages']
+
+    def record_languages(self, repo_name: str, pushed_at: Optional[str], languages: Dict[str, int]) -> None:
+        with self.lock:
+            self.state['languages'][repo_name] = {'pushed_at': pushed_at, 'languages': languages}
+            self.dirty = True
+        self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        """Write pending progress, at most once per flush_interval unless forced"""
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty or (not force and time.monotonic() - self.last_flush < self.flush_interval):
+                    return
+                payload = json.dumps(self.state, separators=(',', ':'))
+                self.dirty = False
+                self.last_flush = time.monotonic()
+            directory = os.path.dirname(self.path)
+            try:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                write_atomic(self.path, payload)
+            except OSError as e:
+                print(f"⚠️  Could not save crawl checkpoint: {e}")
+
+    def clear(self) -> None:
+        """Forget the checkpoint after a complete crawl"""
+        with self.lock:
+            self.state = dict(self.empty_state(), listing_key=self.state.get('listing_key'))
+            self.dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️  Could not remove crawl checkpoint: {e}")
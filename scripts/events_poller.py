@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Long-running poller of the GitHub events API for incremental language statistics.
+Watches /users/{user}/events (or /orgs/{org}/events) with ETag conditional
+requests, so an idle poll is a free 304, and waits at least the X-Poll-Interval
+GitHub asks for between polls. Repositories with push, create, delete or public
+events are handed to the same incremental update as the webhook receiver, which
+refetches only those repositories and regenerates the README at most once per
+interval.
+
+Usage:
+    GITHUB_TOKEN=... GITHUB_USERNAME=octocat python scripts/events_poller.py
+    python scripts/events_poller.py --interval 300 --on-update "git commit -am 'stats' && git push"
+
+The events API lags pushes by 30 seconds to a few minutes and does not report
+deleted repositories; those drop out at the next full run.
+"""
+
+import argparse
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+from rate_limiter import RateLimitError
+from update_language_stats import LanguageStatsUpdater
+from webhook_receiver import WebhookReceiver
+
+# Event types that can change a repository's languages or whether it is counted
+TRACKED_EVENTS = {'PushEvent', 'CreateEvent', 'DeleteEvent', 'PublicEvent'}
+# The events API keeps at most 300 events, 100 per page
+MAX_EVENT_PAGES = 3
+
+
+class EventsPoller:
+    def __init__(self, updater: LanguageStatsUpdater, receiver: WebhookReceiver, min_interval: float = 60.0):
+        self.updater = updater
+        self.receiver = receiver
+        self.min_interval = min_interval
+        scope = 'orgs' if updater.account_type == 'org' else 'users'
+        self.events_url = f'{updater.base_url}/{scope}/{updater.username}/events'
+        self.etag: Optional[str] = None
+        self.last_event_id: Optional[int] = None
+        # GitHub's X-Poll-Interval; polls never come faster than this
+        self.poll_interval = min_interval
+        self.polls = 0
+        self.not_modified = 0
+        self.stop_event = threading.Event()
+
+    def request_page(self, url: str, params: dict = None, conditional: bool = False) -> Optional[requests.Response]:
+        """GET one events page (None on failure)"""
+        headers = {'If-None-Match': self.etag} if conditional and self.etag else None
+        response = self.updater.get_response(url, params, headers)
+        if response is not None and response.status_code not in (200, 304):
+            print(f"⚠️  Events poll answered {response.status_code}")
+            return None
+        return response
+
+    def fetch_new_events(self) -> Optional[List[Dict]]:
+        """Events newer than the last poll, oldest first (None when nothing changed or the poll failed)"""
+        response = self.request_page(self.events_url, {'per_page': 100}, conditional=True)
+        self.polls += 1
+        if response is None:
+            return None
+        interval = response.headers.get('X-Poll-Interval')
+        if interval and interval.isdigit():
+            self.poll_interval = max(self.min_interval, float(interval))
+        if response.status_code == 304:
+            # Answered from GitHub's side without touching the rate-limit budget
+            self.not_modified += 1
+            return None
+
+        self.etag = response.headers.get('ETag') or self.etag
+        events = list(response.json() or [])
+        fresh = [event for event in events if self.is_new(event)]
+        pages = 1
+        # A busy account may have produced more than a page since the last poll
+        next_url = self.updater.parse_link_header(response.headers.get('Link', '')).get('next')
+        while self.last_event_id is not None and fresh and len(fresh) == len(events) and next_url:
+            if pages >= MAX_EVENT_PAGES:
+                print("⚠️  More events than the events API keeps since the last poll; some may be missed "
+                      "until the next full run")
+                break
+            response = self.request_page(next_url)
+            if response is None:
+                break
+            pages += 1
+            events = list(response.json() or [])
+            fresh += [event for event in events if self.is_new(event)]
+            next_url = self.updater.parse_link_header(response.headers.get('Link', '')).get('next')
+
+        newest = max((int(event['id']) for event in fresh if str(event.get('id', '')).isdigit()), default=None)
+        if self.last_event_id is None:
+            # The first poll only marks where to start; the bootstrap crawl covers everything before it
+            self.last_event_id = newest or 0
+            return None
+        if newest is not None:
+            self.last_event_id = max(self.last_event_id, newest)
+        return list(reversed(fresh))
+
+    def is_new(self, event: Dict) -> bool:
+        event_id = str(event.get('id', ''))
+        return event_id.isdigit() and (self.last_event_id is None or int(event_id) > self.last_event_id)
+
+    def changes(self, events: List[Dict]) -> Dict[str, str]:
+        """{repo name: 'refresh'} for this account's repositories touched by tracked events"""
+        owner = self.updater.username.lower()
+        changed = {}
+        for event in events:
+            if event.get('type') not in TRACKED_EVENTS:
+                continue
+            full_name = (event.get('repo') or {}).get('name', '')
+            repo_owner, _, repo_name = full_name.partition('/')
+            if repo_name and repo_owner.lower() == owner:
+                changed[repo_name] = 'refresh'
+        return changed
+
+    def poll_once(self) -> int:
+        """Poll once and queue the touched repositories; returns how many were queued"""
+        events = self.fetch_new_events()
+        if not events:
+            return 0
+        changed = self.changes(events)
+        print(f"📬 {len(events)} new events, {len(changed)} repositories to refresh"
+              + (f": {', '.join(sorted(changed))}" if changed else ''))
+        if changed:
+            self.receiver.queue(changed, events=len(events))
+        return len(changed)
+
+    def run(self) -> None:
+        """Poll until stopped, sleeping the poll interval in between"""
+        while not self.stop_event.is_set():
+            try:
+                self.poll_once()
+            except RateLimitError as e:
+                print(f"❌ Rate limited while polling, backing off: {e}")
+                self.poll_interval = max(self.poll_interval, self.updater.rate_limiter.max_wait)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"⚠️  Events poll failed: {e}")
+            self.stop_event.wait(self.poll_interval)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Incremental language stats from the GitHub events API')
+    parser.add_argument('--min-poll-interval', type=float, default=float(os.getenv('EVENTS_MIN_POLL_SECONDS', '60')),
+                        help="shortest time between polls; GitHub's X-Poll-Interval wins when it is longer")
+    parser.add_argument('--debounce', type=float, default=float(os.getenv('EVENTS_DEBOUNCE_SECONDS', '0')),
+                        help='seconds without new events before a batch is applied')
+    parser.add_argument('--interval', type=float, default=float(os.getenv('EVENTS_MIN_INTERVAL_SECONDS', '300')),
+                        help='minimum seconds between README regenerations')
+    parser.add_argument('--on-update', default=os.getenv('EVENTS_ON_UPDATE'),
+                        help='shell command run in the workspace after files changed (e.g. git commit and push)')
+    args = parser.parse_args()
+
+    username = os.getenv('GITHUB_USERNAME')
+    if not username:
+        print("Error: GITHUB_USERNAME environment variable not set")
+        return 1
+
+    updater = LanguageStatsUpdater(os.getenv('GITHUB_TOKEN', ''), username)
+    # The receiver's batching and incremental update, fed by polls instead of signed deliveries
+    receiver = WebhookReceiver(updater, secret='', debounce=args.debounce, interval=args.interval,
+                               on_update=args.on_update)
+    poller = EventsPoller(updater, receiver, args.min_poll_interval)
+    try:
+        # Mark the event stream first so nothing pushed during the bootstrap crawl is missed
+        poller.fetch_new_events()
+        receiver.bootstrap()
+    except (RateLimitError, RuntimeError) as e:
+        print(f"❌ Could not bootstrap: {e}")
+        return 1
+
+    worker = threading.Thread(target=receiver.run_worker, daemon=True)
+    worker.start()
+    print(f"👀 Polling {poller.events_url} every {poller.poll_interval:.0f}s or more "
+          f"(at most one update per {args.interval:.0f}s)")
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        poller.stop()
+        receiver.stop()
+        print(f"📊 {poller.polls} polls, {poller.not_modified} not modified")
+        updater.export_metrics()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the GitHub API used by update_language_stats.py.
+Serves synthetic accounts (or recorded fixtures), supports ETag revalidation,
+Link pagination, X-RateLimit-* headers, GraphQL repository queries and root
+manifests through the git trees/blobs API, and can inject 403/429/5xx and slow
+responses for benchmarking.
+
+Usage:
+    python scripts/fake_github_server.py --repos 1000 --port 8765
+    python scripts/fake_github_server.py --fail-429 0.05 --latency-ms 50
+    python scripts/fake_github_server.py --record fixtures/ --upstream https://api.github.com
+    python scripts/fake_github_server.py --replay fixtures/
+
+GET /_push?repo=NAME simulates a push (creating NAME if needed) and records it
+in the events API, for the events poller; with &empty=1 a new repository is
+created without commits (its git tree answers 409). GET /_star?repo=NAME adds a
+star without a push.
+
+Point the updater at it with GITHUB_API_URL=http://127.0.0.1:8765.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+LANGUAGES = ['Python', 'JavaScript', 'TypeScript', 'HTML', 'CSS', 'Dart', 'Go', 'Rust',
+             'Java', 'Kotlin', 'C++', 'C', 'Shell', 'PHP', 'Swift', 'Ruby']
+KEYWORDS = ['react', 'flutter', 'nodejs', 'firebase', 'mysql', 'android', 'cli', 'api']
+
+# Root-level manifest served for repositories of each keyword (git trees/blobs API)
+MANIFESTS = {
+    'react': ('package.json', '{"dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0"}}'),
+    'flutter': ('pubspec.yaml', 'name: app\ndependencies:\n  flutter:\n    sdk: flutter\n  firebase_core: ^2.0.0\n'),
+    'nodejs': ('package.json', '{"dependencies": {"express": "^4.18.0", "mysql2": "^3.0.0"}}'),
+    'firebase': ('firebase.json', '{"hosting": {"public": "dist"}}'),
+    'mysql': ('requirements.txt', 'PyMySQL==1.1.0\nflask>=2.0\n'),
+    'android': ('build.gradle', "plugins {\n    id 'com.android.application'\n}\n"),
+}
+
+
+def build_synthetic_account(login: str, repo_count: int, seed: int = 0) -> List[Dict]:
+    """Generate a deterministic account with repo_count repositories"""
+    rng = random.Random(f'{login}-{seed}')
+    repositories = []
+    for index in range(repo_count):
+        keyword = rng.choice(KEYWORDS)
+        languages = {language: rng.randint(100, 500_000)
+                     for language in rng.sample(LANGUAGES, rng.randint(1, 4))}
+        day = 1 + index % 28
+        repositories.append({
+            'name': f'{keyword}-project-{index}',
+            'full_name': f'{login}/{keyword}-project-{index}',
+            'fork': rng.random() < 0.1,
+            'private': rng.random() < 0.2,
+            'archived': rng.random() < 0.05,
+            'description': f'A {keyword} project number {index}',
+            'topics': [keyword],
+            'created_at': f'2024-01-{day:02d}T00:00:00Z',
+            'updated_at': f'2025-06-{day:02d}T00:00:00Z',
+            'pushed_at': f'2025-06-{day:02d}T12:00:00Z',
+            'stargazers_count': index * 7 % 50,
+            'forks_count': index * 3 % 11,
+            'languages': languages,
+            'manifests': dict([MANIFESTS[keyword]]) if keyword in MANIFESTS else {},
+        })
+    return repositories
+
+
+class FakeGitHubState:
+    """Accounts, fault settings and counters shared by all request handlers"""
+
+    def __init__(self, login: str, repositories: List[Dict], rate_limit: int = 5000,
+                 fail_403: float = 0.0, fail_429: float = 0.0, fail_5xx: float = 0.0,
+                 slow_rate: float = 0.0, latency_ms: float = 0.0, slow_ms: float = 2000.0,
+                 seed: int = 0, replay_dir: str = None, record_dir: str = None, upstream: str = None,
+                 invalid_tokens: List[str] = (), poll_interval: int = 60, stats_delay: float = 2.0):
+        self.login = login
+        self.repositories = repositories
+        self.by_name = {repo['name']: repo for repo in repositories}
+        # Git blob SHA -> content for every manifest, as served by /git/blobs/{sha}
+        self.blobs = {blob_sha(content): content
+                      for repo in repositories for content in repo.get('manifests', {}).values()}
+        self.rate_limit = rate_limit
+        self.fail_403 = fail_403
+        self.fail_429 = fail_429
+        self.fail_5xx = fail_5xx
+        self.slow_rate = slow_rate
+        self.latency_ms = latency_ms
+        self.slow_ms = slow_ms
+        self.replay_dir = replay_dir
+        self.record_dir = record_dir
+        self.upstream = upstream.rstrip('/') if upstream else None
+        # Tokens answered with 401 Bad credentials
+        self.invalid_tokens = set(invalid_tokens)
+        # Account activity served by the events API, newest first
+        self.events: List[Dict] = []
+        self.next_event_id = 1000
+        self.poll_interval = poll_interval
+        # Repository statistics answer 202 for stats_delay seconds after first being asked for
+        self.stats_delay = stats_delay
+        self.stats_ready_at: Dict[str, float] = {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            # Like GitHub, every credential (and anonymous access) has its own budget
+            self.budgets: Dict[str, List[int]] = {}
+            self.stats = {'requests': 0, 'not_modified': 0, 'faults': 0, 'by_status': {}, 'by_endpoint': {},
+                          'by_token': {}}
+
+    def budget(self, credential: str) -> List[int]:
+        """[remaining, reset_at] of a credential's budget (call with the lock held)"""
+        entry = self.budgets.get(credential)
+        if entry is None or time.time() >= entry[1]:
+            entry = self.budgets[credential] = [self.rate_limit, int(time.time()) + 3600]
+        return entry
+
+    def remaining(self, credential: str) -> Tuple[int, int]:
+        with self.lock:
+            remaining, reset_at = self.budget(credential)
+            return remaining, reset_at
+
+    def count(self, endpoint: str, status: int, credential: str = '') -> None:
+        with self.lock:
+            self.stats['requests'] += 1
+            label = credential[-4:] if credential else 'anonymous'
+            self.stats['by_token'][label] = self.stats['by_token'].get(label, 0) + 1
+            self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+            if status == 304:
+                self.stats['not_modified'] += 1
+            if status in (403, 429) or status >= 500:
+                self.stats['faults'] += 1
+
+    def pick_fault(self) -> Optional[int]:
+        """Decide whether to inject a fault for the next request"""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.fail_403:
+            return 403
+        if roll < self.fail_403 + self.fail_429:
+            return 429
+        if roll < self.fail_403 + self.fail_429 + self.fail_5xx:
+            return 502
+        return None
+
+    def spend(self, credential: str = '') -> Tuple[int, int]:
+        """Charge one request against the credential's budget; returns (remaining, reset)"""
+        with self.lock:
+            entry = self.budget(credential)
+            entry[0] = max(0, entry[0] - 1)
+            return entry[0], entry[1]
+
+
+    def push(self, repo_name: str, empty: bool = False) -> Dict:
+        """Simulate a push (creating the repository if needed, without commits when empty) and record its events"""
+        with self.lock:
+            repo = self.by_name.get(repo_name)
+            created = repo is None
+            if created:
+                repo = {
+                    'name': repo_name, 'full_name': f'{self.login}/{repo_name}', 'fork': False, 'private': False,
+                    'archived': False, 'description': f'A new project {repo_name}', 'topics': [],
+                    'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    'stargazers_count': 0, 'forks_count': 0, 'languages': {}, 'manifests': {},
+                }
+                self.repositories.append(repo)
+                self.by_name[repo_name] = repo
+            repo['empty'] = created and empty
+            if not repo['empty']:
+                language = self.rng.choice(LANGUAGES)
+                repo['languages'][language] = repo['languages'].get(language, 0) + self.rng.randint(1_000, 50_000)
+            repo['pushed_at'] = repo['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            event_types = ('CreateEvent',) if repo['empty'] else ('CreateEvent', 'PushEvent') if created else ('PushEvent',)
+            for event_type in event_types:
+                self.events.insert(0, {
+                    'id': str(self.next_event_id), 'type': event_type, 'public': not repo['private'],
+                    'actor': {'login': self.login}, 'repo': {'name': repo['full_name']},
+                    'payload': {'ref_type': 'repository'} if event_type == 'CreateEvent' else {'size': 1},
+                    'created_at': repo['pushed_at'],
+                })
+                self.next_event_id += 1
+            # Like GitHub, only the most recent 300 events are kept
+            del self.events[300:]
+            return {'repo': repo_name, 'created': created, 'languages': repo['languages']}
+
+
+    def head_sha(self, repo: Dict) -> str:
+        return blob_sha(f"{repo['name']}@{repo.get('pushed_at')}")
+
+    def stats_ready(self, repo: Dict) -> bool:
+        """Start computing a repository's statistics on first request; True once they are available"""
+        key = self.head_sha(repo)
+        with self.lock:
+            ready_at = self.stats_ready_at.setdefault(key, time.time() + self.stats_delay)
+        return time.time() >= ready_at
+
+    def weekly_activity(self, repo: Dict) -> List[Tuple[int, int, int]]:
+        """Deterministic [week, additions, deletions] for the last 52 weeks; about a third of repositories are active"""
+        rng = random.Random(self.head_sha(repo))
+        this_week = int(time.time()) // 604800 * 604800
+        active_weeks = rng.choice([0, 0, 2, 8, 26])
+        return [(this_week - offset * 604800,
+                 rng.randint(10, 2000) if offset < active_weeks else 0,
+                 -rng.randint(0, 500) if offset < active_weeks else 0)
+                for offset in reversed(range(52))]
+
+
+def blob_sha(content: str) -> str:
+    """Git object id of a blob with this content"""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def fixture_name(method: str, path: str) -> str:
+    """File name of a recorded fixture for a request"""
+    digest = hashlib.sha256(f'{method} {path}'.encode('utf-8')).hexdigest()[:24]
+    return f'{digest}.json'
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: FakeGitHubState = None
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def send_json(self, endpoint: str, status: int, body, headers: Dict[str, str] = None,
+                  charge: bool = True) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            # Conditional hit: like GitHub, a 304 does not use up rate-limit budget
+            status, payload, charge = 304, b'', False
+
+        credential = self.credential()
+        remaining, reset = self.state.spend(credential) if charge else self.state.remaining(credential)
+        self.state.count(endpoint, status, credential)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        self.send_header('X-RateLimit-Limit', str(self.state.rate_limit))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(reset))
+        self.send_header('X-RateLimit-Resource', 'graphql' if endpoint == 'graphql' else 'core')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def credential(self) -> str:
+        authorization = self.headers.get('Authorization') or ''
+        return authorization.split(' ', 1)[-1] if authorization else ''
+
+    def reject_credentials(self, endpoint: str) -> bool:
+        """Answer 401 for invalid tokens and 403 once a credential's budget is used up; True if rejected"""
+        credential = self.credential()
+        if credential and credential in self.state.invalid_tokens:
+            self.send_json(endpoint, 401, {'message': 'Bad credentials'}, charge=False)
+            return True
+        if self.state.remaining(credential)[0] <= 0:
+            self.send_json(endpoint, 403, {'message': 'API rate limit exceeded'}, charge=False)
+            return True
+        return False
+
+    def inject_latency_and_faults(self, endpoint: str) -> bool:
+        """Sleep and/or answer with an injected error; returns True if a fault was sent"""
+        delay = self.state.latency_ms
+        if self.state.slow_rate and self.state.rng.random() < self.state.slow_rate:
+            delay += self.state.slow_ms
+        if delay:
+            time.sleep(delay / 1000)
+
+        fault = self.state.pick_fault()
+        if fault == 403:
+            self.send_json(endpoint, 403, {'message': 'You have exceeded a secondary rate limit.'},
+                           {'Retry-After': '1'}, charge=False)
+        elif fault == 429:
+            self.send_json(endpoint, 429, {'message': 'API rate limit exceeded'}, {'Retry-After': '1'}, charge=False)
+        elif fault:
+            self.send_json(endpoint, fault, {'message': 'Server Error'}, charge=False)
+        return fault is not None
+
+    def paginate(self, endpoint: str, repositories: List[Dict], query: Dict[str, List[str]],
+                 headers: Dict[str, str] = None) -> None:
+        if query.get('sort') == ['pushed']:
+            repositories = sorted(repositories, key=lambda repo: repo['pushed_at'],
+                                  reverse=query.get('direction') != ['asc'])
+        per_page = min(100, int(query.get('per_page', ['30'])[0]))
+        page = max(1, int(query.get('page', ['1'])[0]))
+        last = max(1, (len(repositories) + per_page - 1) // per_page)
+        items = repositories[(page - 1) * per_page:page * per_page]
+        body = [{key: value for key, value in repo.items() if key not in ('languages', 'manifests')} for repo in items]
+
+        links = []
+        base = f'http://{self.headers.get("Host")}{urlparse(self.path).path}'
+        if page < last:
+            links.append(f'<{base}?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{base}?per_page={per_page}&page={last}>; rel="last"')
+        if page > 1:
+            links.append(f'<{base}?per_page={per_page}&page=1>; rel="first"')
+        self.send_json(endpoint, 200, body, dict(headers or {}, **({'Link': ', '.join(links)} if links else {})))
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+
+        # Control endpoints for the benchmark harness (never faulted or charged)
+        if path == '/_stats':
+            return self.send_json('_stats', 200, self.state.stats, charge=False)
+        if path == '/_reset':
+            self.state.reset_counters()
+            return self.send_json('_reset', 200, {'ok': True}, charge=False)
+        if path == '/_push':
+            repo_name = query.get('repo', ['pushed-project'])[0]
+            empty = query.get('empty', ['0'])[0] == '1'
+            return self.send_json('_push', 200, self.state.push(repo_name, empty), charge=False)
+        if path == '/_star':
+            repo = self.state.by_name.get(query.get('repo', [''])[0])
+            if repo is None:
+                return self.send_json('_star', 404, {'message': 'Not Found'}, charge=False)
+            with self.state.lock:
+                repo['stargazers_count'] = repo.get('stargazers_count', 0) + 1
+            return self.send_json('_star', 200, {'repo': repo['name'], 'stars': repo['stargazers_count']}, charge=False)
+        if path == '/rate_limit':
+            if self.credential() in self.state.invalid_tokens:
+                return self.send_json('rate_limit', 401, {'message': 'Bad credentials'}, charge=False)
+            remaining, reset = self.state.remaining(self.credential())
+            core = {'limit': self.state.rate_limit, 'remaining': remaining, 'reset': reset}
+            return self.send_json('rate_limit', 200, {'resources': {'core': core, 'graphql': dict(core)}}, charge=False)
+
+        if self.state.replay_dir or self.state.record_dir:
+            return self.proxy_or_replay('GET', b'')
+
+        endpoint = self.classify(path)
+        if self.reject_credentials(endpoint) or self.inject_latency_and_faults(endpoint):
+            return
+
+        login = self.state.login
+        if path == '/user':
+            return self.send_json(endpoint, 200, {'login': login})
+        if path in ('/user/repos', f'/users/{login}/repos', f'/orgs/{login}/repos'):
+            return self.paginate(endpoint, self.state.repositories, query)
+        if path in (f'/users/{login}/events', f'/orgs/{login}/events'):
+            return self.paginate(endpoint, list(self.state.events), query,
+                                 {'X-Poll-Interval': str(self.state.poll_interval)})
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)', path)
+        if match and match.group(1) == login and match.group(2) in self.state.by_name:
+            repo = self.state.by_name[match.group(2)]
+            return self.send_json(endpoint, 200, {key: value for key, value in repo.items()
+                                                  if key not in ('languages', 'manifests')})
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)/languages', path)
+        if match and match.group(1) == login and match.group(2) in self.state.by_name:
+            return self.send_json(endpoint, 200, self.state.by_name[match.group(2)]['languages'])
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)/commits', path)
+        if match and match.group(1) == login and match.group(2) in self.state.by_name:
+            repo = self.state.by_name[match.group(2)]
+            return self.send_json(endpoint, 200, [{'sha': self.state.head_sha(repo),
+                                                   'commit': {'committer': {'date': repo.get('pushed_at')}}}])
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)/stats/(code_frequency|commit_activity)', path)
+        if match and match.group(1) == login and match.group(2) in self.state.by_name:
+            repo = self.state.by_name[match.group(2)]
+            if not self.state.stats_ready(repo):
+                return self.send_json(endpoint, 202, {})
+            weeks = self.state.weekly_activity(repo)
+            if match.group(3) == 'code_frequency':
+                return self.send_json(endpoint, 200, [list(week) for week in weeks])
+            return self.send_json(endpoint, 200, [{'week': week, 'total': additions // 50, 'days': [0] * 7}
+                                                  for week, additions, _ in weeks])
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)/git/trees/HEAD', path)
+        if match and match.group(1) == login and match.group(2) in self.state.by_name:
+            if self.state.by_name[match.group(2)].get('empty'):
+                return self.send_json(endpoint, 409, {'message': 'Git Repository is empty.'})
+            manifests = self.state.by_name[match.group(2)].get('manifests', {})
+            tree = [{'path': name, 'mode': '100644', 'type': 'blob', 'sha': blob_sha(content)}
+                    for name, content in manifests.items()]
+            tree.append({'path': 'README.md', 'mode': '100644', 'type': 'blob', 'sha': blob_sha(match.group(2))})
+            return self.send_json(endpoint, 200, {'sha': blob_sha(json.dumps(tree)), 'tree': tree, 'truncated': False})
+        match = re.fullmatch(r'/repos/([^/]+)/([^/]+)/git/blobs/([0-9a-f]{40})', path)
+        if match and match.group(1) == login and match.group(3) in self.state.blobs:
+            content = base64.b64encode(self.state.blobs[match.group(3)].encode('utf-8')).decode('ascii')
+            return self.send_json(endpoint, 200, {'sha': match.group(3), 'encoding': 'base64', 'content': content})
+        self.send_json(endpoint, 404, {'message': 'Not Found'})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', '0'))
+        raw = self.rfile.read(length) if length else b''
+
+        if self.state.replay_dir or self.state.record_dir:
+            return self.proxy_or_replay('POST', raw)
+        if urlparse(self.path).path != '/graphql':
+            return self.send_json('other', 404, {'message': 'Not Found'})
+        if self.reject_credentials('graphql') or self.inject_latency_and_faults('graphql'):
+            return
+
+        variables = json.loads(raw or b'{}').get('variables') or {}
+        offset = int(variables.get('cursor') or 0)
+        page = self.state.repositories[offset:offset + 100]
+        nodes = [{
+            'name': repo['name'],
+            'isFork': repo['fork'],
+            'isPrivate': repo['private'],
+            'isArchived': repo['archived'],
+            'description': repo['description'],
+            'createdAt': repo['created_at'],
+            'updatedAt': repo['updated_at'],
+            'pushedAt': repo['pushed_at'],
+            'stargazerCount': repo.get('stargazers_count', 0),
+            'forkCount': repo.get('forks_count', 0),
+            'repositoryTopics': {'nodes': [{'topic': {'name': topic}} for topic in repo['topics']]},
+            'languages': {'edges': [{'size': size, 'node': {'name': name}}
+                                    for name, size in repo['languages'].items()]},
+        } for repo in page]
+        has_next = offset + 100 < len(self.state.repositories)
+        connection = {'pageInfo': {'hasNextPage': has_next, 'endCursor': str(offset + 100)}, 'nodes': nodes}
+        self.send_json('graphql', 200, {'data': {'repositoryOwner': {'repositories': connection}}})
+
+    def proxy_or_replay(self, method: str, body: bytes) -> None:
+        """Serve a recorded fixture, or forward upstream and record the response"""
+        endpoint = self.classify(urlparse(self.path).path)
+        path = os.path.join(self.state.replay_dir or self.state.record_dir, fixture_name(method, self.path))
+
+        if self.state.replay_dir:
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    fixture = json.load(file)
+            except FileNotFoundError:
+                return self.send_json(endpoint, 404, {'message': f'No fixture for {method} {self.path}'})
+            if self.inject_latency_and_faults(endpoint):
+                return
+            return self.send_json(endpoint, fixture['status'], fixture['body'], fixture.get('headers'))
+
+        headers = {'Accept': self.headers.get('Accept', 'application/vnd.github.v3+json')}
+        if self.headers.get('Authorization'):
+            headers['Authorization'] = self.headers['Authorization']
+        response = requests.request(method, f'{self.state.upstream}{self.path}', headers=headers,
+                                    data=body or None, timeout=30)
+        fixture = {
+            'method': method,
+            'path': self.path,
+            'status': response.status_code,
+            # Only replay headers the client relies on; credentials never reach the fixture
+            'headers': {name: response.headers[name] for name in ('Link',) if name in response.headers},
+            'body': response.json() if response.content else None,
+        }
+        os.makedirs(self.state.record_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(fixture, file, indent=1)
+        self.send_json(endpoint, fixture['status'], fixture['body'], fixture['headers'])
+
+    @staticmethod
+    def classify(path: str) -> str:
+        """Collapse a request path into an endpoint label for the counters"""
+        if path.endswith('/languages'):
+            return 'languages'
+        if '/git/trees/' in path:
+            return 'trees'
+        if '/git/blobs/' in path:
+            return 'blobs'
+        if '/stats/' in path:
+            return 'stats'
+        if path.endswith('/commits'):
+            return 'commits'
+        if path.endswith('/repos'):
+            return 'repos'
+        if path == '/graphql':
+            return 'graphql'
+        return path.strip('/').split('/')[0] or 'root'
+
+
+def start_server(state: FakeGitHubState, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Start the fake server on a background thread and return it (see server.server_port)"""
+    handler = type('BoundFakeGitHubHandler', (FakeGitHubHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Local fake GitHub API for offline runs and benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--login', default='bench-user', help='account login served by the fake API')
+    parser.add_argument('--repos', type=int, default=10, help='number of synthetic repositories')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate-limit', type=int, default=5000, help='requests per hour and credential before 403s')
+    parser.add_argument('--invalid-token', action='append', default=[], help='token answered with 401 (repeatable)')
+    parser.add_argument('--poll-interval', type=int, default=60, help='X-Poll-Interval sent with the events API')
+    parser.add_argument('--stats-delay', type=float, default=2.0,
+                        help='seconds repository statistics answer 202 Accepted before they are ready')
+    parser.add_argument('--fail-403', type=float, default=0.0, help='fraction answered with a secondary-limit 403')
+    parser.add_argument('--fail-429', type=float, default=0.0, help='fraction answered with 429 Too Many Requests')
+    parser.add_argument('--fail-5xx', type=float, default=0.0, help='fraction answered with 502 Bad Gateway')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='fraction of responses delayed by --slow-ms')
+    parser.add_argument('--slow-ms', type=float, default=2000.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='latency added to every response')
+    parser.add_argument('--record', metavar='DIR', help='proxy to --upstream and record fixtures into DIR')
+    parser.add_argument('--upstream', default='https://api.github.com')
+    parser.add_argument('--replay', metavar='DIR', help='serve recorded fixtures from DIR')
+    args = parser.parse_args()
+
+    state = FakeGitHubState(
+        args.login, build_synthetic_account(args.login, args.repos, args.seed),
+        rate_limit=args.rate_limit, fail_403=args.fail_403, fail_429=args.fail_429,
+        fail_5xx=args.fail_5xx, slow_rate=args.slow_rate, latency_ms=args.latency_ms,
+        slow_ms=args.slow_ms, seed=args.seed, replay_dir=args.replay, record_dir=args.record,
+        upstream=args.upstream if args.record else None, invalid_tokens=args.invalid_token,
+        poll_interval=args.poll_interval, stats_delay=args.stats_delay,
+    )
+    server = start_server(state, args.host, args.port)
+    print(f"🧪 Fake GitHub API for '{args.login}' listening on http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
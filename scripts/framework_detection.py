@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Data-driven framework and tool detection.
+Rules map a framework to the keywords searched in repository names and
+descriptions, the topics that mark it, and its shields.io badge. The rules are
+compiled once into a prefix-trie regex per field plus a topic lookup, so each
+repository is scanned in a single pass however many rules there are.
+"""
+
+import json
+import re
+from typing import Dict, FrozenSet, Iterable, List
+
+# Order here is the order badges appear in the README.
+# 'name' / 'description' are substrings matched case-insensitively; 'topics' are exact topic names.
+# 'manifests' maps a root-level manifest to the dependencies that mark the framework (an empty
+# list means the file alone is enough); it is only used when MANIFEST_DETECTION is enabled.
+FRAMEWORK_RULES: List[Dict] = [
+    {
+        'framework': 'Flutter',
+        'name': ['flutter'],
+        'description': ['flutter'],
+        'topics': ['flutter'],
+        'manifests': {'pubspec.yaml': ['flutter']},
+        'badge': {'label': 'Flutter', 'color': '02569B', 'logo': 'flutter'},
+    },
+    {
+        'framework': 'React',
+        'name': ['react'],
+        'description': ['react'],
+        'topics': ['react'],
+        'manifests': {'package.json': ['react']},
+        'badge': {'label': 'React', 'color': '20232A', 'logo': 'react'},
+    },
+    {
+        'framework': 'Node.js',
+        'name': ['node', 'nodejs'],
+        'description': ['node.js', 'nodejs', 'node js'],
+        'topics': ['nodejs', 'node'],
+        'manifests': {'package.json': []},
+        'badge': {'label': 'Node.js', 'color': '43853D', 'logo': 'node.js'},
+    },
+    {
+        'framework': 'Firebase',
+        'name': ['firebase'],
+        'description': ['firebase'],
+        'topics': ['firebase'],
+        'manifests': {
+            'package.json': ['firebase', 'firebase-admin', 'firebase-functions'],
+            'pubspec.yaml': ['firebase_core'],
+            'requirements.txt': ['firebase-admin'],
+            'firebase.json': [],
+        },
+        'badge': {'label': 'Firebase', 'color': '039BE5', 'logo': 'Firebase'},
+    },
+    {
+        'framework': 'MySQL',
+        'name': ['mysql'],
+        'description': ['mysql'],
+        'topics': ['mysql'],
+        'manifests': {
+            'package.json': ['mysql', 'mysql2'],
+            'pubspec.yaml': ['mysql1'],
+            'requirements.txt': ['mysqlclient', 'pymysql', 'mysql-connector-python'],
+        },
+        'badge': {'label': 'MySQL', 'color': '005C84', 'logo': 'mysql'},
+    },
+    {
+        'framework': 'Android Studio',
+        'name': ['android'],
+        'description': ['android'],
+        'topics': ['android'],
+        'manifests': {'build.gradle': ['com.android'], 'build.gradle.kts': ['com.android']},
+        'badge': {'label': 'Android_Studio', 'color': '3DDC84', 'logo': 'android-studio'},
+    },
+]
+
+
+def load_framework_rules(path: str = '') -> List[Dict]:
+    """Return the built-in rules, overridden or extended by a JSON list of rules at path"""
+    rules = [dict(rule) for rule in FRAMEWORK_RULES]
+    if not path:
+        return rules
+
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            extra_rules = json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable framework rules file {path}: {e}")
+        return rules
+
+    positions = {rule['framework']: index for index, rule in enumerate(rules)}
+    for rule in extra_rules:
+        if not isinstance(rule, dict) or not rule.get('framework'):
+            print(f"⚠️  Skipping framework rule without a 'framework' name: {rule!r}")
+            continue
+        # A rule for an existing framework replaces it in place; new frameworks go last
+        if rule['framework'] in positions:
+            rules[positions[rule['framework']]] = rule
+        else:
+            positions[rule['framework']] = len(rules)
+            rules.append(rule)
+    return rules
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex for the keywords that shares common prefixes and prefers the longest match"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional tail: a keyword that is a prefix of a longer one still matches
+        if terminal:
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+
+    return render(trie)
+
+
+class FrameworkMatcher:
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self.frameworks = [rule['framework'] for rule in rules]
+        self.badges = {rule['framework']: rule.get('badge') for rule in rules}
+        self.name_matcher = self._compile_field(rules, 'name')
+        self.description_matcher = self._compile_field(rules, 'description')
+
+        self.topic_index: Dict[str, FrozenSet[str]] = {}
+        for rule in rules:
+            for topic in rule.get('topics', []):
+                topic = topic.lower()
+                self.topic_index[topic] = self.topic_index.get(topic, frozenset()) | {rule['framework']}
+
+        # {manifest file: {dependency: frameworks}}; '' marks frameworks implied by the file itself
+        self.manifest_index: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        for rule in rules:
+            for file_name, dependencies in (rule.get('manifests') or {}).items():
+                by_dependency = self.manifest_index.setdefault(file_name, {})
+                for dependency in dependencies or ['']:
+                    dependency = dependency.lower()
+                    by_dependency[dependency] = by_dependency.get(dependency, frozenset()) | {rule['framework']}
+        self.manifest_files = set(self.manifest_index)
+
+    @staticmethod
+    def _compile_field(rules: List[Dict], field: str):
+        """Compile one field's keywords into (regex, {longest match: frameworks})"""
+        owners: Dict[str, FrozenSet[str]] = {}
+        for rule in rules:
+            for keyword in rule.get(field, []):
+                keyword = keyword.lower()
+                owners[keyword] = owners.get(keyword, frozenset()) | {rule['framework']}
+        if not owners:
+            return None, {}
+
+        # The lookahead reports the longest keyword starting at each position; every shorter
+        # keyword starting there is a prefix of it, so fold those frameworks in up front.
+        resolved = {
+            keyword: frozenset().union(*(frameworks for other, frameworks in owners.items()
+                                         if keyword.startswith(other)))
+            for keyword in owners
+        }
+        pattern = re.compile(f'(?=({_trie_pattern(owners)}))')
+        return pattern, resolved
+
+    @staticmethod
+    def _scan(matcher, text: str) -> FrozenSet[str]:
+        pattern, resolved = matcher
+        if pattern is None or not text:
+            return frozenset()
+        found = frozenset()
+        for keyword in set(pattern.findall(text)):
+            found |= resolved[keyword]
+        return found
+
+    def match_text(self, name: str, description: str = '') -> FrozenSet[str]:
+        """Return the frameworks a repository's name and description point to"""
+        found = self._scan(self.name_matcher, (name or '').lower())
+        found |= self._scan(self.description_matcher, (description or '').lower())
+        return found
+
+    def match_topics(self, topics: Iterable[str] = ()) -> FrozenSet[str]:
+        """Return the frameworks a repository's topics mark"""
+        found = frozenset()
+        for topic in topics or ():
+            found |= self.topic_index.get(topic.lower(), frozenset())
+        return found
+
+    def match(self, name: str, description: str = '', topics: Iterable[str] = ()) -> FrozenSet[str]:
+        """Return the frameworks a repository's name, description and topics point to"""
+        return self.match_text(name, description) | self.match_topics(topics)
+
+    def match_manifests(self, manifests: Dict[str, List[str]]) -> FrozenSet[str]:
+        """Return the frameworks declared by {manifest file: dependency identifiers}"""
+        found = frozenset()
+        for file_name, identifiers in manifests.items():
+            by_dependency = self.manifest_index.get(file_name)
+            if not by_dependency:
+                continue
+            found |= by_dependency.get('', frozenset())
+            for identifier in identifiers:
+                # 'com.android' matches the plugin 'com.android.application' and
+                # 'com.google.firebase' the coordinate 'com.google.firebase:firebase-bom:32.0.0'
+                for end, char in enumerate(identifier + '.'):
+                    if char in '.:' and identifier[:end] in by_dependency:
+                        found |= by_dependency[identifier[:end]]
+        return found
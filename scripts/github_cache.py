@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+On-disk conditional-request cache for GitHub API responses.
+Stores response bodies alongside their ETag / Last-Modified validators so
+unchanged resources can be revalidated with a cheap 304 Not Modified.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str, max_age_days: float = 30, max_size_mb: float = 50):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_days * 86400
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, workspace: str = '.') -> Optional['ResponseCache']:
+        """Build a cache from environment settings, or None when caching is disabled"""
+        if os.getenv('GITHUB_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+            return None
+        cache_dir = os.getenv('GITHUB_CACHE_DIR') or os.path.join(workspace, '.cache', 'github-api')
+        return cls(
+            cache_dir,
+            max_age_days=float(os.getenv('GITHUB_CACHE_MAX_AGE_DAYS', '30')),
+            max_size_mb=float(os.getenv('GITHUB_CACHE_MAX_MB', '50')),
+        )
+
+    @staticmethod
+    def make_key(url: str, params: dict = None, scope: str = '') -> str:
+        """Build a stable cache key from the URL, sorted query params and auth scope"""
+        query = '&'.join(f'{k}={v}' for k, v in sorted((params or {}).items()))
+        raw = f'{scope}|{url}?{query}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small for large accounts
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached entry for a key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > self.max_age_seconds:
+            self._remove(path)
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Return the If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key: str, url: str, body, etag: str = None, last_modified: str = None,
+              link: str = None) -> None:
+        """Persist a response body with its validators (no-op without a validator)"""
+        if not etag and not last_modified:
+            return
+
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            # Pagination header, replayed when the page is served from a 304
+            'link': link,
+            'stored_at': time.time(),
+            'body': body,
+        }
+        self._write(self._path(key), entry)
+
+    def touch(self, key: str) -> None:
+        """Refresh an entry's age after a successful 304 revalidation"""
+        entry = self.get(key)
+        if entry:
+            entry['stored_at'] = time.time()
+            self._write(self._path(key), entry)
+
+    def _write(self, path: str, entry: Dict) -> None:
+        # Write to a temp file then rename so concurrent readers never see partial JSON
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(entry, file, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """Evict expired entries, then the oldest entries until under the size limit"""
+        now = time.time()
+        entries = []
+        removed = 0
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith('.tmp') or now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+            removed += 1
+
+        return removed
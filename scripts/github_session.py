@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Shared keep-alive HTTP session for GitHub API calls.
+One pooled session per run avoids a fresh TLS handshake for every request
+and moves connection-level retries into the transport.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_github_session(github_token: str = '', pool_size: int = 8) -> requests.Session:
+    """Create a pooled session; the Authorization header is set only when a token is given"""
+    session = requests.Session()
+    session.headers.update({
+        'Accept': 'application/vnd.github.v3+json',
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': 'language-stats-updater',
+    })
+    if github_token:
+        session.headers['Authorization'] = f'token {github_token}'
+
+    # Retry connection errors and transient 5xx responses with exponential backoff.
+    # Rate-limit responses (403/429) are left to the caller, which knows how long to wait.
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False,
+        # 429/403 Retry-After is handled by the rate-limit scheduler so all workers pause together
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Append-only SQLite history of language statistics.
+Every run records its per-repository, per-language bytes and the account-wide
+totals. Runs whose data matches the previous run point at that run's rows
+instead of copying them, so a quiet account grows the database by one row per
+run. Deltas, top movers and windowed percentages are answered by indexed
+queries. Runs are marked published once their README was pushed.
+
+Usage:
+    python scripts/history_store.py runs --account octocat
+    python scripts/history_store.py movers --account octocat --limit 10
+    python scripts/history_store.py window --account octocat --days 30
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    data_run_id INTEGER NOT NULL,
+    data_hash TEXT NOT NULL,
+    sections_hash TEXT,
+    repo_count INTEGER NOT NULL,
+    published INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_by_account ON runs (account, id);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (account, recorded_at);
+
+CREATE TABLE IF NOT EXISTS repo_languages (
+    run_id INTEGER NOT NULL,
+    repo TEXT NOT NULL,
+    language TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    PRIMARY KEY (run_id, repo, language)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS repo_languages_by_repo ON repo_languages (repo, run_id);
+
+CREATE TABLE IF NOT EXISTS language_totals (
+    run_id INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    PRIMARY KEY (run_id, language)
+) WITHOUT ROWID;
+"""
+
+
+def data_fingerprint(repo_languages: Dict[str, Dict[str, int]], language_totals: Dict[str, int]) -> str:
+    """Stable hash of a run's per-repo bytes and totals"""
+    payload = json.dumps([repo_languages, language_totals], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class HistoryStore:
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Batch workers share one file, so wait for each other's short write transactions.
+        # The webhook receiver opens the store on one thread and writes from its worker thread.
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls, workspace: str) -> Optional['HistoryStore']:
+        """Build the store from LANGUAGE_HISTORY_* variables (None when disabled or unusable)"""
+        if os.getenv('LANGUAGE_HISTORY_DISABLED', 'false').lower() == 'true':
+            return None
+        path = os.getenv('LANGUAGE_HISTORY_PATH') or os.path.join(workspace, '.cache', 'language-history.sqlite3')
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            print(f"⚠️  Language history disabled, could not open {path}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def latest_run(self, account: str, before: Optional[int] = None) -> Optional[Tuple]:
+        """(id, data_run_id, data_hash, sections_hash, published) of the newest run, optionally before a run id"""
+        return self.connection.execute(
+            'SELECT id, data_run_id, data_hash, sections_hash, published FROM runs '
+            'WHERE account = ? AND id < ? ORDER BY id DESC LIMIT 1',
+            (account, before if before is not None else 2 ** 62),
+        ).fetchone()
+
+    def record_run(self, account: str, repo_languages: Dict[str, Dict[str, int]],
+                   language_totals: Dict[str, int], sections_hash: Optional[str] = None) -> int:
+        """Append one run; rows are only written when the data differs from the previous run"""
+        fingerprint = data_fingerprint(repo_languages, language_totals)
+        previous = self.latest_run(account)
+
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs (account, recorded_at, data_run_id, data_hash, sections_hash, repo_count) '
+                'VALUES (?, ?, 0, ?, ?, ?)',
+                (account, time.time(), fingerprint, sections_hash, len(repo_languages)),
+            )
+            run_id = cursor.lastrowid
+            if previous and previous[2] == fingerprint:
+                data_run_id = previous[1]
+            else:
+                data_run_id = run_id
+                self.connection.executemany(
+                    'INSERT INTO repo_languages (run_id, repo, language, bytes) VALUES (?, ?, ?, ?)',
+                    ((run_id, repo, language, size)
+                     for repo, languages in repo_languages.items() for language, size in languages.items()),
+                )
+                self.connection.executemany(
+                    'INSERT INTO language_totals (run_id, language, bytes) VALUES (?, ?, ?)',
+                    ((run_id, language, size) for language, size in language_totals.items()),
+                )
+            self.connection.execute('UPDATE runs SET data_run_id = ? WHERE id = ?', (data_run_id, run_id))
+        return run_id
+
+    def set_sections_hash(self, run_id: int, sections_hash: str) -> None:
+        with self.connection:
+            self.connection.execute('UPDATE runs SET sections_hash = ? WHERE id = ?', (sections_hash, run_id))
+
+    def mark_published(self, run_id: int) -> None:
+        """Record that the published README holds this run's sections"""
+        with self.connection:
+            self.connection.execute('UPDATE runs SET published = 1 WHERE id = ?', (run_id,))
+
+    def _data_run_pair(self, account: str, older: Optional[int], newer: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        """Resolve (older, newer) run ids to the runs holding their rows; defaults to the last two distinct datasets"""
+        def data_run(run_id: int) -> Optional[int]:
+            row = self.connection.execute(
+                'SELECT data_run_id FROM runs WHERE account = ? AND id = ?', (account, run_id)).fetchone()
+            return row[0] if row else None
+
+        if newer is None:
+            latest = self.latest_run(account)
+            newer_data = latest[1] if latest else None
+        else:
+            newer_data = data_run(newer)
+        if older is not None:
+            return data_run(older), newer_data
+        if newer_data is None:
+            return None, None
+        row = self.connection.execute(
+            'SELECT MAX(data_run_id) FROM runs WHERE account = ? AND data_run_id < ?', (account, newer_data)).fetchone()
+        return (row[0] if row else None), newer_data
+
+    def language_deltas(self, account: str, older: Optional[int] = None,
+                        newer: Optional[int] = None) -> Dict[str, int]:
+        """{language: byte change} between two runs (default: the last two distinct datasets; {} without both)"""
+        older_data, newer_data = self._data_run_pair(account, older, newer)
+        if newer_data is None or older_data is None:
+            return {}
+        rows = self.connection.execute(
+            'SELECT language, SUM(bytes) FROM ('
+            '  SELECT language, bytes FROM language_totals WHERE run_id = ?'
+            '  UNION ALL'
+            '  SELECT language, -bytes FROM language_totals WHERE run_id = ?'
+            ') GROUP BY language HAVING SUM(bytes) != 0 ORDER BY ABS(SUM(bytes)) DESC',
+            (newer_data, older_data),
+        )
+        return dict(rows)
+
+    def top_movers(self, account: str, limit: int = 10, older: Optional[int] = None,
+                   newer: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """(repo, language, byte change) with the largest absolute change between two runs"""
+        older_data, newer_data = self._data_run_pair(account, older, newer)
+        if newer_data is None or older_data is None:
+            return []
+        return self.connection.execute(
+            'SELECT repo, language, SUM(bytes) AS delta FROM ('
+            '  SELECT repo, language, bytes FROM repo_languages WHERE run_id = ?'
+            '  UNION ALL'
+            '  SELECT repo, language, -bytes FROM repo_languages WHERE run_id = ?'
+            ') GROUP BY repo, language HAVING delta != 0 ORDER BY ABS(delta) DESC, repo LIMIT ?',
+            (newer_data, older_data, limit),
+        ).fetchall()
+
+    def windowed_percentages(self, account: str, days: float) -> Dict[str, float]:
+        """Average share of each language over the runs recorded in the last `days` days"""
+        since = time.time() - days * 86400
+        rows = self.connection.execute(
+            'WITH window_runs AS ('
+            '  SELECT data_run_id FROM runs WHERE account = ? AND recorded_at >= ?'
+            '), run_sums AS ('
+            '  SELECT run_id, SUM(bytes) AS total FROM language_totals'
+            '  WHERE run_id IN (SELECT data_run_id FROM window_runs) GROUP BY run_id'
+            ') '
+            'SELECT t.language, SUM(100.0 * t.bytes / s.total) / (SELECT COUNT(*) FROM window_runs) AS share '
+            'FROM window_runs w JOIN language_totals t ON t.run_id = w.data_run_id '
+            'JOIN run_sums s ON s.run_id = t.run_id '
+            'GROUP BY t.language ORDER BY share DESC',
+            (account, since),
+        )
+        return dict(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Query the language statistics history')
+    parser.add_argument('command', choices=('runs', 'deltas', 'movers', 'window'))
+    parser.add_argument('--account', required=True)
+    parser.add_argument('--path', default=os.getenv('LANGUAGE_HISTORY_PATH') or os.path.join(
+        os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'language-history.sqlite3'))
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--days', type=float, default=30)
+    args = parser.parse_args()
+
+    store = HistoryStore(args.path)
+    try:
+        if args.command == 'runs':
+            rows = store.connection.execute(
+                'SELECT id, recorded_at, data_run_id, repo_count, published FROM runs '
+                'WHERE account = ? ORDER BY id DESC LIMIT ?', (args.account, args.limit))
+            for run_id, recorded_at, data_run_id, repo_count, published in rows:
+                stamp = time.strftime('%Y-%m-%d %H:%M', time.gmtime(recorded_at))
+                reused = '' if data_run_id == run_id else f' (same data as run {data_run_id})'
+                print(f"  #{run_id:<5} {stamp} UTC  {repo_count:>6} repos  "
+                      f"{'published' if published else 'not published'}{reused}")
+        elif args.command == 'deltas':
+            for language, delta in store.language_deltas(args.account).items():
+                print(f"  {language:<20} {delta:+,} bytes")
+        elif args.command == 'movers':
+            for repo, language, delta in store.top_movers(args.account, args.limit):
+                print(f"  {repo:<40} {language:<15} {delta:+,} bytes")
+        else:
+            for language, share in store.windowed_percentages(args.account, args.days).items():
+                print(f"  {language:<20} {share:6.2f}%")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Repositories x languages byte matrix with per-repository attribute columns.
+The fetched language data is laid out once, and every statistic view (private
+or archived repositories, a pushed_at window, the React allocation
+percentage, excluded vendored languages) is a masked column reduction over it,
+so extra views cost no API calls. Forks are never crawled, so they have no
+rows. NumPy is used when installed; otherwise the
+same reductions run in pure Python.
+
+Usage (reads the artifacts written by stats_pipeline.py):
+    python scripts/language_matrix.py --account octocat
+    python scripts/language_matrix.py --account octocat --since-days 365 --exclude-language HTML,CSS
+    python scripts/language_matrix.py --account octocat --exclude-archived --react-percent 60
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from framework_detection import FrameworkMatcher, load_framework_rules
+
+try:
+    import numpy as np
+except ImportError:  # Optional; the pure-Python path gives identical results
+    np = None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds for a GitHub ISO-8601 timestamp (None when missing or malformed)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class LanguageMatrix:
+    def __init__(self, repos: List[str], languages: List[str], rows: List[List[int]],
+                 private: List[bool], archived: List[bool],
+                 pushed_at: List[Optional[float]], react: List[bool]):
+        self.repos = repos
+        self.languages = languages
+        self.language_index = {language: column for column, language in enumerate(languages)}
+        if np is not None:
+            self.bytes = np.array(rows, dtype=np.int64).reshape(len(repos), len(languages))
+            self.private = np.array(private, dtype=bool)
+            self.archived = np.array(archived, dtype=bool)
+            self.pushed_at = np.array([value if value is not None else np.nan for value in pushed_at], dtype=float)
+            self.react = np.array(react, dtype=bool)
+        else:
+            self.bytes = rows
+            self.private = private
+            self.archived = archived
+            self.pushed_at = pushed_at
+            self.react = react
+
+    @classmethod
+    def build(cls, snapshot: Dict[str, Dict], repositories: Iterable[Dict],
+              react_repos: Iterable[str] = ()) -> 'LanguageMatrix':
+        """Lay out the snapshot's language bytes as one row per listed non-fork repository that has language data"""
+        react_repos = set(react_repos)
+        repos, rows, private, archived, pushed_at, react = [], [], [], [], [], []
+        languages: Dict[str, int] = {}
+        sparse_rows = []
+        for repo in repositories:
+            repo_languages = snapshot.get(repo['name'], {}).get('languages')
+            if not repo_languages or repo.get('fork', False):
+                continue
+            for language in repo_languages:
+                languages.setdefault(language, len(languages))
+            repos.append(repo['name'])
+            sparse_rows.append(repo_languages)
+            private.append(bool(repo.get('private', False)))
+            archived.append(bool(repo.get('archived', False)))
+            pushed_at.append(parse_timestamp(repo.get('pushed_at')))
+            react.append(repo['name'] in react_repos)
+
+        for repo_languages in sparse_rows:
+            row = [0] * len(languages)
+            for language, size in repo_languages.items():
+                row[languages[language]] = size
+            rows.append(row)
+        return cls(repos, list(languages), rows, private, archived, pushed_at, react)
+
+    def row_mask(self, include_private: bool = True, include_archived: bool = True, pushed_since: Optional[float] = None):
+        """Boolean mask of the repositories a view covers"""
+        if np is not None:
+            mask = np.ones(len(self.repos), dtype=bool)
+            if not include_private:
+                mask &= ~self.private
+            if not include_archived:
+                mask &= ~self.archived
+            if pushed_since is not None:
+                mask &= self.pushed_at >= pushed_since  # NaN (unknown) compares False
+            return mask
+        return [
+            (include_private or not self.private[row])
+            and (include_archived or not self.archived[row])
+            and (pushed_since is None or (self.pushed_at[row] is not None and self.pushed_at[row] >= pushed_since))
+            for row in range(len(self.repos))
+        ]
+
+    def totals(self, react_percent: int = 0, exclude_languages: Iterable[str] = (), **filters) -> Dict[str, int]:
+        """{language: bytes} over the repositories selected by the filters (see row_mask)"""
+        mask = self.row_mask(**filters)
+        excluded = set(exclude_languages)
+        js_column = self.language_index.get('JavaScript')
+        react_bytes = 0
+
+        if np is not None:
+            selected = self.bytes[mask]
+            column_totals = selected.sum(axis=0)
+            if react_percent > 0 and js_column is not None:
+                js_bytes = selected[self.react[mask], js_column]
+                # Same per-repository truncation as int(js * (percent / 100))
+                react_bytes = int(np.floor(js_bytes * (react_percent / 100)).astype(np.int64).sum())
+            column_totals = column_totals.tolist()
+        else:
+            column_totals = [0] * len(self.languages)
+            for row, selected in enumerate(mask):
+                if not selected:
+                    continue
+                sizes = self.bytes[row]
+                for column, size in enumerate(sizes):
+                    column_totals[column] += size
+                if react_percent > 0 and js_column is not None and self.react[row]:
+                    react_bytes += int(sizes[js_column] * (react_percent / 100))
+
+        totals = {language: int(size) for language, size in zip(self.languages, column_totals)
+                  if size and language not in excluded}
+        if react_bytes and 'JavaScript' not in excluded:
+            totals['JavaScript'] -= react_bytes
+            if not totals['JavaScript']:
+                del totals['JavaScript']
+            if 'React' not in excluded:
+                totals['React'] = totals.get('React', 0) + react_bytes
+        return totals
+
+    def weighted_totals(self, weights: Dict[str, float], react_percent: int = 0,
+                        exclude_languages: Iterable[str] = (), **filters) -> Dict[str, float]:
+        """{language: weight} where each repository spreads its weight over its languages by byte share"""
+        mask = self.row_mask(**filters)
+        excluded = set(exclude_languages)
+        js_column = self.language_index.get('JavaScript')
+        react_weight = 0.0
+
+        if np is not None:
+            repo_weights = np.array([float(weights.get(repo, 0.0)) for repo in self.repos])[mask]
+            selected = self.bytes[mask].astype(float)
+            row_totals = selected.sum(axis=1)
+            shares = np.divide(selected, row_totals[:, None], out=np.zeros_like(selected),
+                               where=row_totals[:, None] > 0)
+            weighted = shares * repo_weights[:, None]
+            column_totals = weighted.sum(axis=0).tolist()
+            if react_percent > 0 and js_column is not None:
+                react_weight = float(weighted[self.react[mask], js_column].sum() * (react_percent / 100))
+        else:
+            column_totals = [0.0] * len(self.languages)
+            for row, selected in enumerate(mask):
+                weight = weights.get(self.repos[row], 0.0)
+                row_total = sum(self.bytes[row])
+                if not selected or not weight or not row_total:
+                    continue
+                for column, size in enumerate(self.bytes[row]):
+                    column_totals[column] += weight * size / row_total
+                if react_percent > 0 and js_column is not None and self.react[row]:
+                    react_weight += weight * self.bytes[row][js_column] / row_total * (react_percent / 100)
+
+        totals = {language: float(value) for language, value in zip(self.languages, column_totals)
+                  if value > 0 and language not in excluded}
+        if react_weight > 0 and 'JavaScript' not in excluded:
+            totals['JavaScript'] -= react_weight
+            if totals['JavaScript'] <= 0:
+                del totals['JavaScript']
+            if 'React' not in excluded:
+                totals['React'] = totals.get('React', 0.0) + react_weight
+        return totals
+
+    def repo_languages(self, **filters) -> Dict[str, Dict[str, int]]:
+        """{repo: {language: bytes}} for the selected repositories"""
+        mask = self.row_mask(**filters)
+        return {
+            repo: {language: int(size) for language, size in zip(self.languages, self.bytes[row]) if size}
+            for row, repo in enumerate(self.repos) if mask[row]
+        }
+
+    def percentages(self, **view) -> Dict[str, float]:
+        """Percentages for one view, sorted in descending order"""
+        totals = self.totals(**view)
+        total_bytes = sum(totals.values())
+        if total_bytes == 0:
+            return {}
+        return dict(sorted(((language, size * 100 / total_bytes) for language, size in totals.items()),
+                           key=lambda item: item[1], reverse=True))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compute language statistic views from the pipeline artifacts')
+    parser.add_argument('--account', required=True)
+    parser.add_argument('--artifacts-dir', default=os.getenv('LANGUAGE_ARTIFACTS_DIR') or os.path.join(
+        os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'artifacts'))
+    parser.add_argument('--exclude-private', action='store_true')
+    parser.add_argument('--exclude-archived', action='store_true')
+    parser.add_argument('--since-days', type=float, help='only repositories pushed within this many days')
+    parser.add_argument('--react-percent', type=int, default=int(os.getenv('REACT_JS_ALLOCATION_PERCENT', '0')))
+    parser.add_argument('--exclude-language', default=os.getenv('EXCLUDED_LANGUAGES', ''),
+                        help='comma-separated languages to leave out (e.g. vendored HTML)')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    artifacts = {}
+    for name in ('repo-index.json', 'language-matrix.json'):
+        with open(os.path.join(args.artifacts_dir, name), 'r', encoding='utf-8') as file:
+            artifact = json.load(file)
+        if artifact.get('account') != args.account:
+            print(f"❌ {name} was written for {artifact.get('account')}, not {args.account}")
+            return 1
+        artifacts[name] = artifact['data']
+
+    repositories = artifacts['repo-index.json']['repositories']
+    # React flags as in the updater: name and description, plus manifest detection results when present
+    matcher = FrameworkMatcher(load_framework_rules(os.getenv('FRAMEWORK_RULES_PATH', '')))
+    react_repos = {name for name, frameworks in artifacts['language-matrix.json'].get('manifest_frameworks', {}).items()
+                   if 'React' in frameworks}
+    react_repos |= {repo['name'] for repo in repositories
+                    if 'React' in matcher.match_text(repo['name'], repo.get('description'))}
+
+    started = time.perf_counter()
+    matrix = LanguageMatrix.build(artifacts['language-matrix.json']['repositories'], repositories, react_repos)
+    built = time.perf_counter()
+    view = matrix.percentages(
+        react_percent=args.react_percent,
+        exclude_languages=[language.strip() for language in args.exclude_language.split(',') if language.strip()],
+        include_private=not args.exclude_private,
+        include_archived=not args.exclude_archived,
+        pushed_since=time.time() - args.since_days * 86400 if args.since_days is not None else None,
+    )
+    finished = time.perf_counter()
+
+    print(f"🧮 {len(matrix.repos)} repositories x {len(matrix.languages)} languages "
+          f"({'numpy' if np is not None else 'pure Python'}; built in {(built - started) * 1000:.1f} ms, "
+          f"view in {(finished - built) * 1000:.2f} ms)")
+    for language, percentage in list(view.items())[:args.limit]:
+        print(f"  {language:<20} {percentage:6.2f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
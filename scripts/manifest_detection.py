@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Manifest-based framework detection.
+Reads root-level manifests (package.json, pubspec.yaml, build.gradle, ...) through
+the git trees and blobs API. Parsed dependency names are cached by blob SHA, and
+each repository's manifest SHAs are cached by pushed_at, so an unchanged
+repository costs no requests and a changed one only downloads manifests whose
+content changed. Empty repositories (409 on the tree) are cached the same way.
+Misses are fetched concurrently.
+"""
+
+import base64
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_.:@/\-]+')
+YAML_KEY_PATTERN = re.compile(r'^\s+([A-Za-z0-9_]+)\s*:', re.MULTILINE)
+REQUIREMENT_PATTERN = re.compile(r'^\s*([A-Za-z0-9_.\-]+)', re.MULTILINE)
+
+
+def parse_package_json(text: str) -> Set[str]:
+    data = json.loads(text)
+    names = set()
+    for field in ('dependencies', 'devDependencies', 'peerDependencies', 'optionalDependencies'):
+        section = data.get(field)
+        if isinstance(section, dict):
+            names.update(section)
+    return names
+
+
+def parse_pubspec(text: str) -> Set[str]:
+    # Dependencies are indented keys; without a YAML parser the other nested keys come along harmlessly
+    return set(YAML_KEY_PATTERN.findall(text))
+
+
+def parse_requirements(text: str) -> Set[str]:
+    lines = (line for line in text.splitlines() if not line.lstrip().startswith(('#', '-')))
+    return {match.replace('_', '-') for match in REQUIREMENT_PATTERN.findall('\n'.join(lines))}
+
+
+def parse_tokens(text: str) -> Set[str]:
+    # Gradle and other build scripts: plugin ids and group:artifact coordinates appear as plain tokens
+    return set(TOKEN_PATTERN.findall(text))
+
+
+MANIFEST_PARSERS: Dict[str, Callable[[str], Set[str]]] = {
+    'package.json': parse_package_json,
+    'pubspec.yaml': parse_pubspec,
+    'requirements.txt': parse_requirements,
+}
+
+
+def parse_manifest(file_name: str, text: str) -> List[str]:
+    """Return the sorted, lowercased dependency identifiers declared in a manifest"""
+    parser = MANIFEST_PARSERS.get(file_name, parse_tokens)
+    try:
+        names = parser(text)
+    except (ValueError, AttributeError):
+        return []
+    return sorted({name.lower() for name in names})
+
+
+class ManifestDetector:
+    def __init__(self, cache_path: str, username: str, base_url: str, manifest_files: Set[str],
+                 fetch_json: Callable[[str], Dict], fetch_response: Callable[[str], Optional[object]],
+                 concurrency: int = 8):
+        self.cache_path = cache_path
+        self.username = username
+        self.base_url = base_url
+        self.manifest_files = set(manifest_files)
+        # Same request path as every other API call (ETag cache, rate limiter, metrics)
+        self.fetch_json = fetch_json
+        # Raw GET for tree listings, whose status tells an empty repository (409) from a failure
+        self.fetch_response = fetch_response
+        self.concurrency = max(1, concurrency)
+
+    def load_cache(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            cache = {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable manifest cache: {e}")
+            cache = {}
+
+        # Blob entries are content-addressed and always valid. Repository entries only list the
+        # manifests that were being looked for, so they are reused for the same account and files only.
+        same_scope = (cache.get('username') == self.username
+                      and cache.get('manifest_files') == sorted(self.manifest_files))
+        repositories = cache.get('repositories', {}) if same_scope else {}
+        return {'blobs': cache.get('blobs', {}), 'repositories': repositories}
+
+    def save_cache(self, cache: Dict) -> None:
+        directory = os.path.dirname(self.cache_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump({'username': self.username, 'manifest_files': sorted(self.manifest_files), **cache}, file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not save manifest cache: {e}")
+
+    def fetch_manifest_shas(self, repo_name: str) -> Dict[str, str]:
+        """Return {manifest file: blob sha} from the repository's root tree, or None on failure"""
+        response = self.fetch_response(f'{self.base_url}/repos/{self.username}/{repo_name}/git/trees/HEAD')
+        if response is None:
+            return None
+        if response.status_code == 409:
+            # Empty repository: no manifests until the first push, which changes pushed_at
+            return {}
+        try:
+            tree = response.json() if response.status_code == 200 else None
+        except ValueError:
+            tree = None
+        if not tree or 'tree' not in tree:
+            return None
+        return {entry['path']: entry['sha'] for entry in tree['tree']
+                if entry.get('type') == 'blob' and entry.get('path') in self.manifest_files}
+
+    def fetch_blob_identifiers(self, repo_name: str, file_name: str, sha: str) -> List[str]:
+        """Download one manifest blob and parse it, or None on failure"""
+        blob = self.fetch_json(f'{self.base_url}/repos/{self.username}/{repo_name}/git/blobs/{sha}')
+        if not blob or blob.get('encoding') != 'base64':
+            return None
+        try:
+            text = base64.b64decode(blob.get('content', '')).decode('utf-8', errors='replace')
+        except ValueError:
+            return None
+        return parse_manifest(file_name, text)
+
+    def detect(self, repositories: Iterable[Dict]) -> Dict[str, Dict[str, List[str]]]:
+        """Return {repository: {manifest file: dependency identifiers}} for non-fork repositories"""
+        cache = self.load_cache()
+        blobs, previous = cache['blobs'], cache['repositories']
+        current = {}
+        stale = []
+
+        for repo in repositories:
+            if repo.get('fork', False):
+                continue
+            entry = previous.get(repo['name'])
+            if entry and entry.get('pushed_at') and entry.get('pushed_at') == repo.get('pushed_at'):
+                current[repo['name']] = entry
+            else:
+                stale.append((repo['name'], repo.get('pushed_at')))
+        reused = len(current)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Only repositories pushed since the last run need their tree listed again
+            trees = executor.map(lambda item: self.fetch_manifest_shas(item[0]), stale)
+            for (repo_name, pushed_at), files in zip(stale, trees):
+                # Failed listings are not stored so the next run retries them
+                if files is not None:
+                    current[repo_name] = {'pushed_at': pushed_at, 'files': files}
+
+            # Each distinct blob is downloaded at most once, and never again while its SHA is cached
+            missing = {}
+            for repo_name, entry in current.items():
+                for file_name, sha in entry['files'].items():
+                    if sha not in blobs:
+                        missing.setdefault(sha, (repo_name, file_name))
+            parsed = executor.map(lambda item: self.fetch_blob_identifiers(item[1][0], item[1][1], item[0]),
+                                  missing.items())
+            for sha, identifiers in zip(missing, parsed):
+                if identifiers is not None:
+                    blobs[sha] = identifiers
+
+        print(f"📦 Manifests: {reused} repositories unchanged, listed {len(stale)} trees, "
+              f"downloaded {len(missing)} new manifests ({time.perf_counter() - started:.2f}s)")
+
+        # Keep only blobs still referenced so the cache tracks the account's current state
+        referenced = {sha for entry in current.values() for sha in entry['files'].values()}
+        if current:
+            self.save_cache({'blobs': {sha: ids for sha, ids in blobs.items() if sha in referenced},
+                             'repositories': current})
+
+        return {
+            repo_name: {file_name: blobs[sha] for file_name, sha in entry['files'].items() if sha in blobs}
+            for repo_name, entry in current.items()
+        }
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Local SVG renderer for the profile cards (assets/top-langs.svg, assets/github-stats.svg).
+Cards are drawn from the statistics the updater already computed, so no second
+API crawl is needed. Output is deterministic, and a card file is only rewritten
+when the rendered SVG's hash changes.
+"""
+
+import os
+from html import escape
+from typing import Dict, List, Tuple
+
+from readme_sections import write_atomic
+
+# Color sets (hex without '#') modelled on the common github-readme-stats themes
+THEMES: Dict[str, Dict[str, str]] = {
+    'default': {'title': '2f80ed', 'text': '434d58', 'icon': '4c71f2', 'bg': 'fffefe', 'border': 'e4e2e2'},
+    'dark': {'title': 'ffffff', 'text': '9f9f9f', 'icon': '79ff97', 'bg': '151515', 'border': 'e4e2e2'},
+    'tokyonight': {'title': '70a5fd', 'text': '38bdae', 'icon': 'bf91f3', 'bg': '1a1b27', 'border': 'e4e2e2'},
+    'radical': {'title': 'fe428e', 'text': 'a9fef7', 'icon': 'f8d847', 'bg': '141321', 'border': 'e4e2e2'},
+    'github_dark': {'title': '58a6ff', 'text': 'c3d1d9', 'icon': '1f6feb', 'bg': '0d1117', 'border': '30363d'},
+}
+
+FONT = "'Segoe UI', Ubuntu, Sans-Serif"
+CARD_WIDTH = 300
+BAR_WIDTH = 250
+
+
+def get_theme(name: str) -> Dict[str, str]:
+    """Return the named theme, falling back to the default one"""
+    theme = THEMES.get((name or '').lower())
+    if theme is None:
+        print(f"⚠️  Unknown card theme '{name}', using 'default'")
+        theme = THEMES['default']
+    return theme
+
+
+def _card(width: int, height: int, title: str, body: List[str], theme: Dict[str, str]) -> str:
+    """Wrap card body elements in the shared frame, title and stylesheet"""
+    lines = [
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" fill="none" '
+        f'xmlns="http://www.w3.org/2000/svg" role="img" aria-labelledby="titleId">',
+        f'  <title id="titleId">{escape(title, quote=False)}</title>',
+        '  <style>',
+        f'    .header {{ font: 600 18px {FONT}; fill: #{theme["title"]}; }}',
+        f'    .stat {{ font: 600 14px {FONT}; fill: #{theme["text"]}; }}',
+        f'    .lang-name {{ font: 400 11px {FONT}; fill: #{theme["text"]}; }}',
+        f'    .icon {{ fill: #{theme["icon"]}; }}',
+        '  </style>',
+        f'  <rect x="0.5" y="0.5" rx="4.5" width="{width - 1}" height="{height - 1}" '
+        f'fill="#{theme["bg"]}" stroke="#{theme["border"]}" stroke-opacity="1"/>',
+        f'  <text x="25" y="35" class="header">{escape(title, quote=False)}</text>',
+    ]
+    lines += body
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+
+def _top_languages(language_stats: Dict[str, float], langs_count: int) -> List[Tuple[str, float]]:
+    """Top languages re-normalised so the shown ones add up to 100%"""
+    top = list(language_stats.items())[:max(1, langs_count)]
+    total = sum(percentage for _, percentage in top) or 1.0
+    return [(language, percentage * 100 / total) for language, percentage in top]
+
+
+def render_top_languages_card(language_stats: Dict[str, float], colors: Dict[str, str],
+                              theme_name: str = 'default', layout: str = 'compact',
+                              langs_count: int = 8, title: str = 'Most Used Languages') -> str:
+    """Render the top-languages card; layout is 'compact' (one stacked bar) or 'normal' (a bar per language)"""
+    theme = get_theme(theme_name)
+    languages = _top_languages(language_stats, langs_count)
+    body = []
+
+    if layout == 'normal':
+        for index, (language, percentage) in enumerate(languages):
+            y = 55 + index * 40
+            color = colors.get(language, '808080')
+            width = max(2.0, BAR_WIDTH * percentage / 100)
+            body += [
+                f'  <g transform="translate(25, {y})">',
+                f'    <text x="2" y="15" class="lang-name">{escape(language, quote=False)}</text>',
+                f'    <text x="{BAR_WIDTH + 10}" y="34" class="lang-name">{percentage:.2f}%</text>',
+                f'    <rect x="0" y="25" rx="5" width="{BAR_WIDTH}" height="8" fill="#ddd"/>',
+                f'    <rect x="0" y="25" rx="5" width="{width:.2f}" height="8" fill="#{color}"/>',
+                '  </g>',
+            ]
+        height = 45 + 40 * len(languages) + 20
+        return _card(CARD_WIDTH + 20, height, title, body, theme)
+
+    # Compact: one stacked bar, then a two-column legend
+    body += [
+        '  <mask id="rect-mask">',
+        f'    <rect x="25" y="55" width="{BAR_WIDTH}" height="8" fill="white" rx="5"/>',
+        '  </mask>',
+    ]
+    offset = 0.0
+    for language, percentage in languages:
+        width = BAR_WIDTH * percentage / 100
+        body.append(f'  <rect mask="url(#rect-mask)" x="{25 + offset:.2f}" y="55" width="{width:.2f}" '
+                    f'height="8" fill="#{colors.get(language, "808080")}"/>')
+        offset += width
+
+    rows = (len(languages) + 1) // 2
+    for index, (language, percentage) in enumerate(languages):
+        column, row = index // rows, index % rows
+        x, y = 25 + column * 150, 85 + row * 25
+        body += [
+            f'  <g transform="translate({x}, {y})">',
+            f'    <circle cx="5" cy="6" r="5" fill="#{colors.get(language, "808080")}"/>',
+            f'    <text x="15" y="10" class="lang-name">{escape(language, quote=False)} {percentage:.2f}%</text>',
+            '  </g>',
+        ]
+    height = 90 + rows * 25
+    return _card(CARD_WIDTH, height, title, body, theme)
+
+
+def render_stats_card(stats: List[Tuple[str, str]], theme_name: str = 'default',
+                      title: str = 'GitHub Stats') -> str:
+    """Render a stats card from (label, value) rows"""
+    theme = get_theme(theme_name)
+    body = []
+    for index, (label, value) in enumerate(stats):
+        y = 65 + index * 25
+        body += [
+            f'  <g transform="translate(25, {y})">',
+            '    <circle class="icon" cx="6" cy="-5" r="5"/>',
+            f'    <text x="20" y="0" class="stat">{escape(label, quote=False)}:</text>',
+            f'    <text x="220" y="0" class="stat" font-weight="700">{escape(str(value), quote=False)}</text>',
+            '  </g>',
+        ]
+    height = 45 + 25 * len(stats) + 25
+    return _card(450, height, title, body, theme)
+
+
+def write_card(path: str, svg: str) -> bool:
+    """Write a card unless the file already holds the same SVG; returns True if it was rewritten"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            if file.read() == svg:
+                return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_atomic(path, svg)
+    return True
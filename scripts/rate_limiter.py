@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware request scheduling for GitHub API calls.
+Tracks the X-RateLimit-* headers of every response, paces requests ahead
+of time when the budget runs low, and computes backoff for primary and
+secondary rate limits.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from run_tracer import trace_span
+
+
+class RateLimitError(Exception):
+    """Raised when the run cannot finish within the available rate-limit budget"""
+
+
+class RateLimitScheduler:
+    def __init__(self, reserve: int = 50, max_wait: float = 900):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'RateLimitScheduler':
+        return cls(
+            reserve=int(os.getenv('RATE_LIMIT_RESERVE', '50')),
+            max_wait=float(os.getenv('RATE_LIMIT_MAX_WAIT', '900')),
+        )
+
+    def update(self, headers) -> None:
+        """Record the budget reported by a response's X-RateLimit-* headers"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        # GraphQL and search have their own budgets; only the core REST budget is paced
+        if headers.get('X-RateLimit-Resource', 'core') != 'core':
+            return
+
+        with self._lock:
+            self.remaining = int(remaining)
+            self.reset_at = float(reset)
+            if headers.get('X-RateLimit-Limit'):
+                self.limit = int(headers['X-RateLimit-Limit'])
+            if self.remaining == 0:
+                # Nothing left: hold every worker until the window resets
+                self._blocked_until = max(self._blocked_until, self.reset_at + 1)
+
+    @property
+    def blocked_until(self) -> float:
+        return self._blocked_until
+
+    def headroom(self) -> float:
+        """Requests left above the reserve (unknown budgets count as a full default window)"""
+        with self._lock:
+            if self.remaining is None:
+                return float(self.limit or 5000)
+            return float(self.remaining - self.effective_reserve())
+
+    def claim(self) -> None:
+        """Count a request against the budget before its response reports the real figure"""
+        with self._lock:
+            if self.remaining:
+                self.remaining -= 1
+
+    def set_budget(self, core: Dict) -> None:
+        """Adopt the core budget reported by /rate_limit"""
+        if not core:
+            return
+        with self._lock:
+            self.remaining = core.get('remaining')
+            self.limit = core.get('limit')
+            self.reset_at = core.get('reset')
+            if self.remaining == 0 and self.reset_at:
+                self._blocked_until = max(self._blocked_until, self.reset_at + 1)
+
+    def effective_reserve(self) -> int:
+        """Reserve scaled down for small budgets (60/hour unauthenticated)"""
+        if self.limit:
+            return min(self.reserve, self.limit // 10)
+        return self.reserve
+
+    def _pace_interval(self, now: float) -> float:
+        # Spread the last few requests evenly over the rest of the window
+        if self.remaining is None or self.reset_at is None or self.remaining > self.effective_reserve():
+            return 0.0
+        return max(0.0, self.reset_at - now) / max(self.remaining, 1)
+
+    def before_request(self) -> None:
+        """Block until the next request may be sent"""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = start + self._pace_interval(now)
+        delay = start - now
+        if delay > self.max_wait:
+            raise RateLimitError(
+                f"Rate limit budget exhausted; next request allowed in {delay:.0f}s "
+                f"(RATE_LIMIT_MAX_WAIT={self.max_wait:.0f}s)")
+        if delay > 0:
+            if delay >= 1:
+                print(f"⏳ Pacing requests to stay within the rate limit: waiting {delay:.1f}s")
+            with trace_span('rate_limit_wait', 'sleep', seconds=round(delay, 3)):
+                time.sleep(delay)
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        """Detect primary and secondary rate-limit responses"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        return (response.headers.get('X-RateLimit-Remaining') == '0'
+                or 'Retry-After' in response.headers
+                or 'rate limit' in response.text.lower())
+
+    def backoff(self, response: requests.Response, attempt: int) -> float:
+        """Compute how long to wait after a rate-limited response and pause all workers"""
+        now = time.time()
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        elif response.headers.get('X-RateLimit-Remaining') == '0' and response.headers.get('X-RateLimit-Reset'):
+            delay = max(0.0, float(response.headers['X-RateLimit-Reset']) - now) + 1
+        else:
+            # Secondary rate limit without guidance: wait at least a minute, growing each attempt
+            delay = 60.0 * (2 ** attempt)
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, now + delay)
+        return delay
+
+    def fetch_budget(self, session: requests.Session, base_url: str) -> Dict[str, Dict]:
+        """Query /rate_limit (free of charge) and return the per-resource budgets"""
+        try:
+            response = session.get(f'{base_url}/rate_limit', timeout=10)
+            response.raise_for_status()
+            resources = response.json().get('resources', {})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠️  Could not query rate limit budget: {e}")
+            return {}
+
+        self.set_budget(resources.get('core') or {})
+        return resources
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Marker-based section engine for generated Markdown content.
+Finds every <!-- NAME-START --> / <!-- NAME-END --> block in one linear scan,
+splices any number of named sections in a single pass, skips sections whose
+content is unchanged, and writes files through temp-file-plus-rename.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from typing import Dict, List, Tuple
+
+MARKER_PATTERN = re.compile(r'<!--\s*([A-Za-z0-9_]+(?:-[A-Za-z0-9_]+)*?)-(START|END)\s*-->')
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def find_sections(content: str) -> Dict[str, Tuple[int, int]]:
+    """Return {name: (inner_start, inner_end)} for every well-formed marker pair"""
+    sections = {}
+    open_markers = {}
+    for match in MARKER_PATTERN.finditer(content):
+        name, kind = match.group(1), match.group(2)
+        if kind == 'START':
+            open_markers[name] = match.end()
+        elif name in open_markers:
+            sections[name] = (open_markers.pop(name), match.start())
+    return sections
+
+
+def splice_sections(content: str, updates: Dict[str, str]) -> Tuple[str, List[str], List[str]]:
+    """Replace the inner text of the named sections.
+
+    Each section body is written as "\\n<body>\\n" between its markers. Returns the
+    new content, the names that changed, and the names that were not found.
+    """
+    sections = find_sections(content)
+    missing = [name for name in updates if name not in sections]
+    changed = []
+    pieces = []
+    cursor = 0
+
+    for name, (start, end) in sorted(sections.items(), key=lambda item: item[1][0]):
+        if name not in updates:
+            continue
+        new_inner = f'\n{updates[name]}\n'
+        if content[start:end] == new_inner:
+            continue
+        pieces.append(content[cursor:start])
+        pieces.append(new_inner)
+        cursor = end
+        changed.append(name)
+
+    if not changed:
+        return content, changed, missing
+    pieces.append(content[cursor:])
+    return ''.join(pieces), changed, missing
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Write a file through a temp file in the same directory and an atomic rename"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(content)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
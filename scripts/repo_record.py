@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compact repository record holding only the fields the stats code uses.
+A full REST repository object carries about 100 fields; keeping just these
+keeps memory flat for accounts with tens of thousands of repositories.
+"""
+
+from typing import Dict, Optional
+
+
+class RepoRecord:
+    """Slotted repository record that also answers dict-style lookups (repo['name'], repo.get(...))"""
+
+    __slots__ = ('name', 'fork', 'private', 'archived', 'description', 'topics',
+                 'created_at', 'updated_at', 'pushed_at', 'stargazers_count', 'forks_count', 'languages')
+
+    def __init__(self, name: str, fork: bool = False, private: bool = False, archived: bool = False,
+                 description: Optional[str] = None, topics: tuple = (), created_at: Optional[str] = None,
+                 updated_at: Optional[str] = None, pushed_at: Optional[str] = None,
+                 stargazers_count: int = 0, forks_count: int = 0,
+                 languages: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.fork = fork
+        self.private = private
+        self.archived = archived
+        self.description = description
+        self.topics = tuple(topics)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.pushed_at = pushed_at
+        self.stargazers_count = stargazers_count
+        self.forks_count = forks_count
+        # Only set when the listing already delivered language sizes (GraphQL)
+        self.languages = languages
+
+    @classmethod
+    def from_rest(cls, data: Dict) -> 'RepoRecord':
+        """Project a REST repository object onto a record"""
+        return cls(
+            data['name'],
+            fork=data.get('fork', False),
+            private=data.get('private', False),
+            archived=data.get('archived', False),
+            description=data.get('description'),
+            topics=data.get('topics') or (),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+            pushed_at=data.get('pushed_at'),
+            stargazers_count=data.get('stargazers_count') or 0,
+            forks_count=data.get('forks_count') or 0,
+        )
+
+    @classmethod
+    def from_graphql(cls, node: Dict) -> 'RepoRecord':
+        """Project a GraphQL repository node (with languages) onto a record"""
+        return cls(
+            node['name'],
+            fork=node.get('isFork', False),
+            private=node.get('isPrivate', False),
+            archived=node.get('isArchived', False),
+            description=node.get('description'),
+            topics=[topic_node['topic']['name']
+                    for topic_node in (node.get('repositoryTopics') or {}).get('nodes', [])],
+            created_at=node.get('createdAt'),
+            updated_at=node.get('updatedAt'),
+            pushed_at=node.get('pushedAt'),
+            stargazers_count=node.get('stargazerCount') or 0,
+            forks_count=node.get('forkCount') or 0,
+            languages={edge['node']['name']: edge['size']
+                       for edge in (node.get('languages') or {}).get('edges', [])},
+        )
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f'RepoRecord({self.name!r}, fork={self.fork}, pushed_at={self.pushed_at!r})'
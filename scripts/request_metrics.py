@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Request-level metrics for GitHub API calls.
+Collects per-endpoint counters and latency histograms plus retry, 304,
+rate-limit wait and budget figures, and exports them at the end of a run
+as a JSON summary and a Prometheus textfile (node_exporter textfile collector).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Latency histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Collapse concrete API paths into low-cardinality endpoint labels
+ENDPOINT_PATTERNS = (
+    (re.compile(r'^/repos/[^/]+/[^/]+/languages$'), '/repos/{owner}/{repo}/languages'),
+    (re.compile(r'^/repos/[^/]+/[^/]+/git/blobs/[^/]+$'), '/repos/{owner}/{repo}/git/blobs/{sha}'),
+    (re.compile(r'^/repos/[^/]+/[^/]+/git/trees/[^/]+$'), '/repos/{owner}/{repo}/git/trees/{ref}'),
+    (re.compile(r'^/repos/[^/]+/[^/]+/(.+)$'), '/repos/{owner}/{repo}/\\1'),
+    (re.compile(r'^/repos/[^/]+/[^/]+$'), '/repos/{owner}/{repo}'),
+    (re.compile(r'^/users/[^/]+/(.+)$'), '/users/{user}/\\1'),
+    (re.compile(r'^/orgs/[^/]+/(.+)$'), '/orgs/{org}/\\1'),
+)
+
+
+def endpoint_label(url: str) -> str:
+    """Return the templated endpoint for a request URL"""
+    path = urlparse(url).path.rstrip('/') or '/'
+    # GitHub Enterprise serves the API under /api/v3
+    if path.startswith('/api/v3/'):
+        path = path[len('/api/v3'):]
+    for pattern, label in ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return pattern.sub(label, path)
+    return path
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests: Dict[str, Dict[str, int]] = {}
+        self.latency_buckets: Dict[str, list] = {}
+        self.latency_sum: Dict[str, float] = {}
+        self.latency_count: Dict[str, int] = {}
+        self.retries = 0
+        self.not_modified = 0
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_limit: Optional[int] = None
+        self.run_success: Optional[bool] = None
+
+    def record_request(self, url: str, status: int, latency: float, transport_retries: int = 0) -> None:
+        """Record one completed HTTP exchange"""
+        endpoint = endpoint_label(url)
+        with self._lock:
+            by_status = self.requests.setdefault(endpoint, {})
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+
+            buckets = self.latency_buckets.setdefault(endpoint, [0] * len(LATENCY_BUCKETS))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    buckets[index] += 1
+            self.latency_sum[endpoint] = self.latency_sum.get(endpoint, 0.0) + latency
+            self.latency_count[endpoint] = self.latency_count.get(endpoint, 0) + 1
+
+            self.retries += transport_retries
+            if status == 304:
+                self.not_modified += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_rate_limit_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.rate_limit_waits += 1
+            self.rate_limit_wait_seconds += seconds
+
+    def record_budget(self, remaining: Optional[int], limit: Optional[int]) -> None:
+        with self._lock:
+            if remaining is not None:
+                self.rate_limit_remaining = remaining
+            if limit is not None:
+                self.rate_limit_limit = limit
+
+    def total_requests(self) -> int:
+        return sum(sum(by_status.values()) for by_status in self.requests.values())
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly summary of the run"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, by_status in sorted(self.requests.items()):
+                count = self.latency_count.get(endpoint, 0)
+                endpoints[endpoint] = {
+                    'requests': sum(by_status.values()),
+                    'by_status': dict(sorted(by_status.items())),
+                    'latency_avg_seconds': round(self.latency_sum.get(endpoint, 0.0) / count, 4) if count else 0.0,
+                    'latency_buckets': dict(zip((str(bound) for bound in LATENCY_BUCKETS),
+                                                self.latency_buckets.get(endpoint, []))),
+                }
+            return {
+                'started_at': self.started_at,
+                'duration_seconds': round(time.time() - self.started_at, 3),
+                'success': self.run_success,
+                'requests_total': sum(endpoint['requests'] for endpoint in endpoints.values()),
+                'not_modified_total': self.not_modified,
+                'retries_total': self.retries,
+                'rate_limit_waits_total': self.rate_limit_waits,
+                'rate_limit_wait_seconds_total': round(self.rate_limit_wait_seconds, 3),
+                'rate_limit_remaining': self.rate_limit_remaining,
+                'rate_limit_limit': self.rate_limit_limit,
+                'endpoints': endpoints,
+            }
+
+    def to_prometheus(self, labels: Dict[str, str] = None) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        summary = self.to_dict()
+        base = ''.join(f',{key}="{value}"' for key, value in sorted((labels or {}).items()))
+        plain = '{' + base.lstrip(',') + '}' if base else ''
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        metric('github_api_requests_total', 'counter', 'GitHub API requests by endpoint and status.')
+        for endpoint, data in summary['endpoints'].items():
+            for status, count in data['by_status'].items():
+                lines.append(f'github_api_requests_total{{endpoint="{endpoint}",status="{status}"{base}}} {count}')
+
+        metric('github_api_request_duration_seconds', 'histogram', 'GitHub API request latency.')
+        with self._lock:
+            for endpoint in sorted(self.latency_buckets):
+                for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets[endpoint]):
+                    lines.append(f'github_api_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"{base}}} {count}')
+                total = self.latency_count.get(endpoint, 0)
+                lines.append(f'github_api_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"{base}}} {total}')
+                lines.append(f'github_api_request_duration_seconds_sum{{endpoint="{endpoint}"{base}}} {self.latency_sum.get(endpoint, 0.0):.6f}')
+                lines.append(f'github_api_request_duration_seconds_count{{endpoint="{endpoint}"{base}}} {total}')
+
+        for name, kind, help_text, value in (
+            ('github_api_not_modified_total', 'counter', 'Responses served from the cache after a 304.', summary['not_modified_total']),
+            ('github_api_retries_total', 'counter', 'Retried requests (transport and rate limit).', summary['retries_total']),
+            ('github_api_rate_limit_waits_total', 'counter', 'Times the run waited for a rate limit.', summary['rate_limit_waits_total']),
+            ('github_api_rate_limit_wait_seconds_total', 'counter', 'Seconds spent waiting for rate limits.', summary['rate_limit_wait_seconds_total']),
+            ('github_api_rate_limit_remaining', 'gauge', 'Remaining core rate-limit budget at the end of the run.', summary['rate_limit_remaining']),
+            ('github_api_rate_limit_limit', 'gauge', 'Core rate-limit budget per window.', summary['rate_limit_limit']),
+            ('language_stats_run_duration_seconds', 'gauge', 'Wall-clock duration of the run.', summary['duration_seconds']),
+            ('language_stats_run_success', 'gauge', '1 if the run computed statistics, else 0.',
+             None if summary['success'] is None else int(summary['success'])),
+            ('language_stats_run_timestamp_seconds', 'gauge', 'Unix time the run started.', round(summary['started_at'])),
+        ):
+            if value is None:
+                continue
+            metric(name, kind, help_text)
+            lines.append(f'{name}{plain} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _atomic_write(path: str, content: str) -> None:
+        # The textfile collector may read at any moment, so never expose a partial file
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+    def write_json(self, path: str) -> None:
+        self._atomic_write(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str, labels: Dict[str, str] = None) -> None:
+        self._atomic_write(path, self.to_prometheus(labels))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Phase and request tracing for profiling slow runs.
+Records timed spans (run phases, every HTTP exchange, rate-limit sleeps) per
+thread and writes them in the Chrome trace event format, which chrome://tracing,
+Perfetto and speedscope open as a flame chart. Optionally also runs cProfile
+and dumps its stats (main thread only; worker-thread time shows in the trace).
+
+Enable with `--profile [TRACE_PATH]` / `--cprofile PATH` on update_language_stats.py,
+or with the TRACE_OUTPUT_PATH / CPROFILE_OUTPUT_PATH environment variables.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from readme_sections import write_atomic
+
+# The tracer of the run in progress; modules without access to the updater trace through it
+_active: Optional['RunTracer'] = None
+
+
+def trace_span(name: str, category: str = 'phase', **args):
+    """Span on the active tracer, or a no-op context when tracing is off"""
+    tracer = _active
+    if tracer is None:
+        return nullcontext(args)
+    return tracer.span(name, category, **args)
+
+
+class RunTracer:
+    def __init__(self, trace_path: Optional[str] = None, profile_path: Optional[str] = None):
+        self.trace_path = trace_path
+        self.profile_path = profile_path
+        self.events: List[Dict] = []
+        self.thread_names: Dict[int, str] = {}
+        self.origin = time.perf_counter()
+        self.profiler: Optional[cProfile.Profile] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'RunTracer':
+        return cls(os.getenv('TRACE_OUTPUT_PATH') or None, os.getenv('CPROFILE_OUTPUT_PATH') or None)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.trace_path or self.profile_path)
+
+    def start(self) -> None:
+        """Make this the active tracer and start cProfile if requested"""
+        global _active
+        if not self.enabled:
+            return
+        _active = self
+        self.origin = time.perf_counter()
+        if self.profile_path:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def complete(self, name: str, category: str, started: float, duration: float, **args) -> None:
+        """Record a finished span from perf_counter timestamps"""
+        if not self.trace_path:
+            return
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((started - self.origin) * 1e6, 1),
+            'dur': round(duration * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': thread.ident,
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+            self.thread_names.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, category: str = 'phase', **args):
+        """Time the enclosed block; an escaping exception is recorded in the span's args"""
+        started = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self.complete(name, category, started, time.perf_counter() - started, **args)
+
+    def finish(self) -> None:
+        """Stop profiling and write the trace and cProfile files"""
+        global _active
+        if not self.enabled:
+            return
+        if _active is self:
+            _active = None
+        if self.profiler:
+            self.profiler.disable()
+            try:
+                self.make_parent(self.profile_path)
+                self.profiler.dump_stats(self.profile_path)
+                print(f"💾 Wrote cProfile stats to {self.profile_path} (inspect with `python -m pstats` or snakeviz)")
+            except OSError as e:
+                print(f"⚠️  Could not write cProfile stats: {e}")
+            self.profiler = None
+        if self.trace_path:
+            try:
+                self.make_parent(self.trace_path)
+                write_atomic(self.trace_path, json.dumps(self.to_dict(), separators=(',', ':')))
+                print(f"💾 Wrote {len(self.events)} trace spans to {self.trace_path} "
+                      f"(open in https://www.speedscope.app or chrome://tracing)")
+            except OSError as e:
+                print(f"⚠️  Could not write trace: {e}")
+
+    @staticmethod
+    def make_parent(path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def to_dict(self) -> Dict:
+        """Chrome trace event format: the spans plus thread-name metadata for readable lanes"""
+        pid = os.getpid()
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+            metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                         'args': {'name': 'update_language_stats'}}]
+            metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                         for tid, name in self.thread_names.items()]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
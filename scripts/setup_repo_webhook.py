@@ -121,6 +121,11 @@ def print_setup_instructions():
     print("- Add the generated GitHub Action to your other repositories")
     print("- They will automatically trigger updates when you push code")
     print()
+    print("Option 4: Self-Hosted Webhook Receiver (Incremental)")
+    print("- Run scripts/webhook_receiver.py with WEBHOOK_SECRET, GITHUB_TOKEN and GITHUB_USERNAME")
+    print("- Point push/repository webhooks at it; only changed repositories are refetched")
+    print("- Bursts of pushes are coalesced into one README update per interval")
+    print()
     print("🔗 WEBHOOK SETUP FOR OTHER REPOSITORIES:")
     print("- Copy the action file to other repos: .github/workflows/trigger-language-stats.yml")
     print("- Add PERSONAL_ACCESS_TOKEN secret with repo access")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Local renderer for the README badges (the language table and the languages
+and tools section) so profile views do not depend on img.shields.io.
+Badges follow the shields.io flat-square and for-the-badge layouts and are
+stored under content-hashed file names (assets/badges/<name>-<hash>.svg), so
+they can be cached forever: a changed badge gets a new name, an unchanged one
+is never rewritten, and badges no longer referenced are pruned.
+
+Logos come from simple-icons SVG files (<slug>.svg): the ones the built-in
+languages and frameworks use ship in scripts/badge_logos, and BADGE_LOGOS_DIR
+can point at another directory. Logo names are matched like shields.io does
+(a slug or an icon title such as "node.js"); a missing icon gives a badge
+without a logo.
+"""
+
+import os
+import re
+from functools import lru_cache
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from readme_sections import content_hash, write_atomic
+
+BUNDLED_LOGOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'badge_logos')
+FONT_FAMILY = 'Verdana,Geneva,DejaVu Sans,sans-serif'
+BADGE_NAME_PATTERN = re.compile(r'^[a-z0-9-]+-[0-9a-f]{10}\.svg$')
+
+# Approximate Verdana advance widths at 11px; textLength makes renderers fit the text exactly
+NARROW_CHARS = set("fijlrtI.,:;!|'()[] ")
+WIDE_CHARS = set('mwMW%@')
+
+
+def text_width(text: str, font_size: float = 11, bold: bool = False, letter_spacing: float = 0) -> float:
+    """Estimated rendered width of text in Verdana"""
+    width = 0.0
+    for char in text:
+        if char in NARROW_CHARS:
+            width += 3.9
+        elif char in WIDE_CHARS:
+            width += 10.7
+        elif char.isupper() or char.isdigit() or char in '#+&':
+            width += 7.5
+        else:
+            width += 6.5
+    width *= font_size / 11 * (1.1 if bold else 1.0)
+    return round(width + letter_spacing * max(len(text) - 1, 0), 1)
+
+
+def text_color(background: str) -> str:
+    """Dark text on light backgrounds, white otherwise (as shields.io does)"""
+    try:
+        red, green, blue = (int(background[index:index + 2], 16) for index in (0, 2, 4))
+    except ValueError:
+        return 'fff'
+    brightness = (red * 299 + green * 587 + blue * 114) / 255000
+    return '333' if brightness > 0.69 else 'fff'
+
+
+def normalize_color(color: str) -> str:
+    color = (color or '').lstrip('#').lower()
+    if len(color) == 3:
+        color = ''.join(char * 2 for char in color)
+    return color if re.fullmatch(r'[0-9a-f]{6}', color) else '808080'
+
+
+def logo_slug(name: str) -> str:
+    """simple-icons slug for a logo name or icon title ('node.js' -> 'nodedotjs', 'C++' -> 'cplusplus')"""
+    name = name.lower().replace('+', 'plus').replace('.', 'dot').replace('&', 'and')
+    return re.sub(r'[^a-z0-9]', '', name)
+
+
+@lru_cache(maxsize=None)
+def load_logo(logos_dir: str, slug: str) -> Optional[str]:
+    """Path data of a simple-icons logo (None when the directory or icon is missing)"""
+    if not logos_dir or not slug:
+        return None
+    try:
+        with open(os.path.join(logos_dir, f'{logo_slug(slug)}.svg'), 'r', encoding='utf-8') as file:
+            icon = file.read()
+    except OSError:
+        return None
+    paths = re.findall(r'<path[^>]*\sd="([^"]+)"', icon)
+    return ' '.join(paths) or None
+
+
+def _logo(path_data: Optional[str], x: float, y: float, size: float, color: str) -> List[str]:
+    if not path_data:
+        return []
+    return [f'  <svg x="{x}" y="{y}" width="{size}" height="{size}" viewBox="0 0 24 24">'
+            f'<path fill="#{color}" d="{path_data}"/></svg>']
+
+
+@lru_cache(maxsize=1024)
+def render_badge(label: str, message: str, color: str, style: str = 'flat-square',
+                 label_color: str = '555', logo: Optional[str] = None, logo_color: str = 'fff') -> str:
+    """Render one badge; an empty label gives a single-part badge (like /badge/<message>-<color>)"""
+    color, label_color = normalize_color(color), normalize_color(label_color)
+    title = f'{label}: {message}' if label else message
+    big = style == 'for-the-badge'
+    height, font_size, padding = (28, 10, 12) if big else (20, 11, 6)
+    spacing = 1.25 if big else 0
+    if big:
+        label, message = label.upper(), message.upper()
+
+    logo_size = 14
+    logo_width = logo_size + 3 if logo else 0
+    parts: List[Tuple[str, str]] = ([(label, label_color)] if label else []) + [(message, color)]
+    widths = [text_width(text, font_size, big, spacing) for text, _ in parts]
+    boxes = [width + 2 * padding for width in widths]
+    # The logo sits in the first part, before its text
+    boxes[0] += logo_width
+    total = round(sum(boxes), 1)
+
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total}" height="{height}" role="img" '
+        f'aria-label="{escape(title)}">',
+        f'  <title>{escape(title, quote=False)}</title>',
+        '  <g shape-rendering="crispEdges">',
+    ]
+    x = 0.0
+    for box, (_, fill) in zip(boxes, parts):
+        lines.append(f'    <rect x="{x:.1f}" width="{box:.1f}" height="{height}" fill="#{fill}"/>')
+        x += box
+    lines.append('  </g>')
+    lines += _logo(logo, padding - 3 if big else padding - 1, (height - logo_size) / 2, logo_size, logo_color)
+
+    weight = ' font-weight="bold"' if big else ''
+    spacing_attr = f' letter-spacing="{spacing}"' if spacing else ''
+    lines.append(f'  <g text-anchor="middle" font-family="{FONT_FAMILY}" font-size="{font_size}"'
+                 f'{weight}{spacing_attr} text-rendering="geometricPrecision">')
+    x = 0.0
+    for index, ((text, fill), width, box) in enumerate(zip(parts, widths, boxes)):
+        start = x + (logo_width if index == 0 else 0)
+        center = (start + x + box) / 2
+        baseline = 18 if big else 14
+        lines.append(f'    <text x="{center:.1f}" y="{baseline}" fill="#{text_color(fill)}" '
+                     f'textLength="{width}" lengthAdjust="spacingAndGlyphs">{escape(text, quote=False)}</text>')
+        x += box
+    lines.append('  </g>')
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+
+def badge_file_name(slug: str, svg: str) -> str:
+    """<slug>-<first 10 hex digits of the SVG's hash>.svg"""
+    slug = re.sub(r'[^a-z0-9]+', '-', slug.lower().replace('+', 'p').replace('#', 'sharp')).strip('-') or 'badge'
+    return f'{slug}-{content_hash(svg)[:10]}.svg'
+
+
+def write_badges(directory: str, badges: Dict[str, str]) -> int:
+    """Write the badges that do not exist yet (a name fixes its content); returns how many were written"""
+    written = 0
+    for name, svg in badges.items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            continue
+        os.makedirs(directory, exist_ok=True)
+        write_atomic(path, svg)
+        written += 1
+    return written
+
+
+def prune_badges(directory: str, keep: Dict[str, str]) -> int:
+    """Remove generated badges that are no longer referenced; returns how many were removed"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for name in names:
+        if BADGE_NAME_PATTERN.match(name) and name not in keep:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Staged language statistics pipeline: fetch -> aggregate -> render -> write.
+Each stage reads the previous stage's versioned JSON artifact and records the
+fingerprints of its inputs, so a stage whose inputs (upstream artifacts and
+relevant settings) did not change is skipped. Only `fetch` talks to GitHub;
+changing a color or a top-N cutoff re-runs `render` and `write` offline.
+
+Artifacts (in LANGUAGE_ARTIFACTS_DIR, default .cache/artifacts):
+    repo-index.json       repository metadata from the listing
+    language-matrix.json  per-repository language bytes (and manifest frameworks)
+    stats.json            language totals and percentages
+    rendered.json         README sections, badges and SVG cards
+
+Usage:
+    python scripts/stats_pipeline.py                  # all stages
+    python scripts/stats_pipeline.py render write     # offline, from cached artifacts
+    python scripts/stats_pipeline.py aggregate --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from profile_cards import write_card
+from rate_limiter import RateLimitError
+from repo_record import RepoRecord
+from readme_sections import write_atomic
+from update_language_stats import LanguageStatsUpdater
+
+ARTIFACT_VERSION = 1
+STAGES = ('fetch', 'aggregate', 'render', 'write')
+ARTIFACT_FILES = {
+    'repos': 'repo-index.json',
+    'matrix': 'language-matrix.json',
+    'stats': 'stats.json',
+    'rendered': 'rendered.json',
+}
+
+
+def fingerprint(value) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class StatsPipeline:
+    def __init__(self, updater: LanguageStatsUpdater, artifacts_dir: str, force: bool = False):
+        self.updater = updater
+        self.artifacts_dir = artifacts_dir
+        self.force = force
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.artifacts_dir, ARTIFACT_FILES[name])
+
+    def load(self, name: str) -> Optional[Dict]:
+        """Load an artifact, ignoring it if it is missing, from another version or for another account"""
+        try:
+            with open(self.path(name), 'r', encoding='utf-8') as file:
+                artifact = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if artifact.get('version') != ARTIFACT_VERSION or artifact.get('account') != self.updater.username:
+            return None
+        return artifact
+
+    def require(self, name: str) -> Dict:
+        artifact = self.load(name)
+        if artifact is None:
+            raise FileNotFoundError(f"{ARTIFACT_FILES[name]} is missing or stale; run the earlier stages first")
+        return artifact
+
+    def save(self, name: str, inputs: Dict[str, str], data: Dict) -> None:
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'account': self.updater.username,
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'inputs': inputs,
+            'fingerprint': fingerprint(data),
+            'data': data,
+        }
+        write_atomic(self.path(name), json.dumps(artifact, indent=1, sort_keys=True))
+
+    def is_fresh(self, name: str, inputs: Dict[str, str]) -> bool:
+        artifact = self.load(name)
+        return not self.force and artifact is not None and artifact.get('inputs') == inputs
+
+    def aggregate_settings(self) -> str:
+        return fingerprint(self.updater.aggregate_settings())
+
+    def render_settings(self) -> str:
+        return fingerprint(self.updater.render_settings())
+
+    def load_repositories(self, repos_artifact: Dict) -> List[RepoRecord]:
+        return [RepoRecord(**repo) for repo in repos_artifact['data']['repositories']]
+
+    def load_manifest_matches(self, matrix_artifact: Dict) -> None:
+        self.updater.manifest_matches = {
+            name: frozenset(frameworks)
+            for name, frameworks in matrix_artifact['data'].get('manifest_frameworks', {}).items()
+        }
+        self.updater.framework_matches.clear()
+
+    def fetch(self) -> None:
+        """Crawl GitHub (snapshot- and ETag-backed) into the repo index and language matrix"""
+        updater = self.updater
+        if not updater.validate_github_token():
+            print("⚠️  Continuing without valid authentication...")
+        # Watermark for the preflight once this output is published, observed before crawling
+        listing_url, listing_params, _, _ = updater.get_listing_endpoints()
+        observation = updater.observe_latest_push(listing_url, listing_params)
+        updater.plan_run_budget(observation['repo_count'] if observation else 0)
+        snapshot, repositories = updater.refresh_language_snapshot(updater.iter_repository_pages())
+        if not repositories:
+            raise RuntimeError("No repositories found; keeping the previous artifacts")
+        if not updater.dataset_complete():
+            raise RuntimeError("Crawl incomplete (progress is checkpointed); keeping the previous artifacts")
+        if updater.manifest_detection:
+            updater.detect_repository_manifests(repositories)
+        if updater.activity:
+            updater.activity_weights = updater.activity.compute(repositories)
+
+        records = []
+        for repo in repositories:
+            record = repo.to_dict()
+            record.pop('languages', None)
+            record['topics'] = list(record['topics'])
+            records.append(record)
+        self.save('repos', {}, {'repositories': records, 'observation': observation})
+        self.save('matrix', {}, {
+            'repositories': snapshot,
+            'manifest_frameworks': {name: sorted(frameworks)
+                                    for name, frameworks in updater.manifest_matches.items() if frameworks},
+            'activity_weights': updater.activity_weights,
+        })
+        print(f"💾 Indexed {len(records)} repositories, {len(snapshot)} with language data")
+
+    def aggregate(self) -> bool:
+        """Turn the language matrix into totals and percentages; returns False if skipped"""
+        repos_artifact, matrix_artifact = self.require('repos'), self.require('matrix')
+        inputs = {
+            'repos': repos_artifact['fingerprint'],
+            'matrix': matrix_artifact['fingerprint'],
+            'settings': self.aggregate_settings(),
+        }
+        if self.is_fresh('stats', inputs):
+            print("⏭️  aggregate: inputs unchanged, keeping stats.json")
+            return False
+
+        self.load_manifest_matches(matrix_artifact)
+        repositories = self.load_repositories(repos_artifact)
+        totals = self.updater.aggregate_language_totals(matrix_artifact['data']['repositories'], repositories)
+        if self.updater.activity:
+            self.updater.activity_weights = matrix_artifact['data'].get('activity_weights', {})
+            totals = self.updater.activity_weighted_totals(totals)
+        language_stats = self.updater.calculate_percentages(totals)
+        if self.updater.history:
+            self.updater.record_history()
+        self.save('stats', inputs, {'language_totals': totals, 'language_stats': language_stats,
+                                    'history_run_id': self.updater.history_run_id})
+        print(f"📈 Aggregated {len(language_stats)} languages")
+        return True
+
+    def render(self) -> bool:
+        """Render README sections and cards from the stats; returns False if skipped"""
+        stats_artifact, repos_artifact = self.require('stats'), self.require('repos')
+        matrix_artifact = self.require('matrix')
+        inputs = {
+            'stats': stats_artifact['fingerprint'],
+            'repos': repos_artifact['fingerprint'],
+            'matrix': matrix_artifact['fingerprint'],
+            'settings': self.render_settings(),
+        }
+        if self.is_fresh('rendered', inputs):
+            print("⏭️  render: inputs unchanged, keeping rendered.json")
+            return False
+
+        self.load_manifest_matches(matrix_artifact)
+        repositories = self.load_repositories(repos_artifact)
+        language_stats = stats_artifact['data']['language_stats']
+        sections = self.updater.build_readme_sections(language_stats, repositories)
+        cards = self.updater.render_profile_cards(language_stats, repositories) if self.updater.cards_dir else {}
+        self.save('rendered', inputs, {'sections': sections, 'cards': cards, 'badges': self.updater.badge_files})
+        print(f"🎨 Rendered {len(sections)} sections, {len(self.updater.badge_files)} badges and {len(cards)} cards")
+        return True
+
+    def write(self) -> None:
+        """Write the rendered sections, cards and JSON export (each file only if its content changed)"""
+        updater = self.updater
+        rendered = self.require('rendered')['data']
+        # Publishing is tracked against the history run that produced these stats
+        updater.history_run_id = updater.history_run_id or self.require('stats')['data'].get('history_run_id')
+        updater.discard_pending_publish()
+        if not all(rendered['sections'].values()):
+            print("No language statistics to update")
+            return
+        updater.write_sections(rendered['sections'], rendered.get('badges'))
+        repos_artifact = self.require('repos')
+        updater.stage_publish(repos_artifact['data'].get('observation'), self.load_repositories(repos_artifact))
+        for file_name, svg in rendered['cards'].items():
+            path = os.path.join(updater.cards_dir or 'assets', file_name)
+            print(f"🖼️  Rendered {path}" if write_card(path, svg) else f"No changes needed in {path}")
+        if updater.json_output_path:
+            self.load_manifest_matches(self.require('matrix'))
+            updater.write_json_output(self.require('stats')['data']['language_stats'],
+                                      self.load_repositories(self.require('repos')))
+
+    def run(self, stages: List[str]) -> None:
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            started = time.perf_counter()
+            getattr(self, stage)()
+            print(f"✔️  {stage} finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run the language stats pipeline stage by stage')
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"stages to run, in pipeline order: {', '.join(STAGES)} (default: all)")
+    parser.add_argument('--artifacts-dir', default=os.getenv('LANGUAGE_ARTIFACTS_DIR') or os.path.join(
+        os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'artifacts'))
+    parser.add_argument('--force', action='store_true', help='re-run stages even if their inputs are unchanged')
+    args = parser.parse_args()
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    username = os.getenv('GITHUB_USERNAME')
+    if not username:
+        print("Error: GITHUB_USERNAME environment variable not set")
+        return 1
+
+    updater = LanguageStatsUpdater(os.getenv('GITHUB_TOKEN', ''), username)
+    pipeline = StatsPipeline(updater, args.artifacts_dir, force=args.force)
+    try:
+        pipeline.run(args.stages or list(STAGES))
+    except RateLimitError as e:
+        print(f"❌ Rate limit budget exhausted: {e}")
+        return 1
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        updater.export_metrics()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Pool of GitHub tokens with per-token rate-limit budgets.
+Each token has its own RateLimitScheduler fed by the X-RateLimit-* headers of
+the responses it received. Every request goes to the usable token with the
+most headroom, so the run's throughput grows with the number of tokens.
+Exhausted tokens sit out until their window resets; invalid ones are dropped.
+Every token should be able to read the same repositories (e.g. several tokens
+for the same account, or installation tokens for the same organization).
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from rate_limiter import RateLimitScheduler
+
+
+def env_tokens() -> List[str]:
+    """Tokens listed in GITHUB_TOKENS (comma or whitespace separated)"""
+    return [token for token in re.split(r'[\s,]+', os.getenv('GITHUB_TOKENS', '')) if token]
+
+
+class PooledToken:
+    __slots__ = ('value', 'label', 'limiter', 'disabled', 'requests')
+
+    def __init__(self, value: str, label: str, limiter: RateLimitScheduler):
+        self.value = value
+        self.label = label
+        self.limiter = limiter
+        self.disabled = False
+        self.requests = 0
+
+
+class TokenPool:
+    def __init__(self, tokens: List[str], reserve: int = 50, max_wait: float = 900):
+        self.tokens = [
+            PooledToken(value, f"#{index + 1} (…{value[-4:]})", RateLimitScheduler(reserve, max_wait))
+            for index, value in enumerate(tokens)
+        ]
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, primary_token: str = '') -> Optional['TokenPool']:
+        """Pool GITHUB_TOKENS (comma or whitespace separated) behind the primary token; None for a single token"""
+        tokens = [primary_token] if primary_token else []
+        for token in env_tokens():
+            if token not in tokens:
+                tokens.append(token)
+        if len(tokens) < 2:
+            return None
+        return cls(
+            tokens,
+            reserve=int(os.getenv('RATE_LIMIT_RESERVE', '50')),
+            max_wait=float(os.getenv('RATE_LIMIT_MAX_WAIT', '900')),
+        )
+
+    def active(self) -> List[PooledToken]:
+        return [token for token in self.tokens if not token.disabled]
+
+    @property
+    def remaining(self) -> Optional[int]:
+        known = [token.limiter.remaining for token in self.active() if token.limiter.remaining is not None]
+        return sum(known) if known else None
+
+    @property
+    def limit(self) -> Optional[int]:
+        known = [token.limiter.limit for token in self.active() if token.limiter.limit is not None]
+        return sum(known) if known else None
+
+    def effective_reserve(self) -> int:
+        return sum(token.limiter.effective_reserve() for token in self.active())
+
+    def acquire(self) -> Optional[PooledToken]:
+        """Pick the token with the most headroom and wait for its next slot (None when every token was dropped)"""
+        with self._lock:
+            active = self.active()
+            if not active:
+                return None
+            now = time.time()
+            ready = [token for token in active if token.limiter.blocked_until <= now]
+            if ready:
+                token = max(ready, key=lambda candidate: candidate.limiter.headroom())
+            else:
+                # Every token is exhausted: wait for the one that resets first
+                token = min(active, key=lambda candidate: candidate.limiter.blocked_until)
+            token.limiter.claim()
+            token.requests += 1
+        token.limiter.before_request()
+        return token
+
+    def disable(self, token: PooledToken, reason: str) -> None:
+        """Take a token out of rotation for the rest of the run"""
+        with self._lock:
+            if token.disabled:
+                return
+            token.disabled = True
+        print(f"🚫 Token {token.label} taken out of rotation ({reason}); {len(self.active())} left")
+
+    def fetch_budget(self, session: requests.Session, base_url: str) -> Dict[str, Dict]:
+        """Query /rate_limit for every token, drop invalid ones and return the pooled per-resource budgets"""
+        pooled: Dict[str, Dict] = {}
+        for token in self.active():
+            try:
+                response = session.get(f'{base_url}/rate_limit', timeout=10,
+                                       headers={'Authorization': f'token {token.value}'})
+                if response.status_code == 401:
+                    self.disable(token, 'invalid or revoked')
+                    continue
+                response.raise_for_status()
+                resources = response.json().get('resources', {})
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"⚠️  Could not query rate limit budget for token {token.label}: {e}")
+                continue
+
+            token.limiter.set_budget(resources.get('core') or {})
+            for name, budget in resources.items():
+                total = pooled.setdefault(name, {'limit': 0, 'remaining': 0, 'reset': None})
+                total['limit'] += budget.get('limit', 0)
+                total['remaining'] += budget.get('remaining', 0)
+                # The pooled budget starts growing again when the first token resets
+                if budget.get('reset') and (total['reset'] is None or budget['reset'] < total['reset']):
+                    total['reset'] = budget['reset']
+        if pooled:
+            print(f"🔑 Token pool: {len(self.active())} tokens, "
+                  f"{pooled.get('core', {}).get('remaining', 0)} core requests remaining in total")
+        return pooled
+
+    def summary(self) -> str:
+        return ', '.join(
+            f"{token.label}: {token.requests} requests"
+            + (' (dropped)' if token.disabled else
+               f" ({token.limiter.remaining} left)" if token.limiter.remaining is not None else '')
+            for token in self.tokens
+        )
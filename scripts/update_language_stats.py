@@ -4,13 +4,35 @@ Script to automatically update language statistics in README.md
 Fetches language data from all public repositories and calculates percentages
 """
 
+import argparse
+import asyncio
+import json
 import os
 import re
 import requests
-from typing import Dict, List
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import time
 import sys
 
+from activity_weights import ActivityWeights, window_week
+from github_cache import ResponseCache
+from crawl_checkpoint import CrawlCheckpoint
+from framework_detection import FrameworkMatcher, load_framework_rules
+from github_session import create_github_session
+from history_store import HistoryStore
+from language_matrix import LanguageMatrix
+from manifest_detection import ManifestDetector
+from profile_cards import render_stats_card, render_top_languages_card, write_card
+from rate_limiter import RateLimitError, RateLimitScheduler
+from repo_record import RepoRecord
+from readme_sections import content_hash, splice_sections, write_atomic
+from request_metrics import RequestMetrics, endpoint_label
+from run_tracer import RunTracer, trace_span
+from static_badges import BUNDLED_LOGOS_DIR, badge_file_name, load_logo, prune_badges, render_badge, write_badges
+from token_pool import PooledToken, TokenPool, env_tokens
+
 # Ensure UTF-8 output early (before any prints) for Windows consoles.
 try:
     sys.stdout.reconfigure(encoding="utf-8")
@@ -19,7 +41,9 @@ except Exception:
     pass
 
 class LanguageStatsUpdater:
-    def __init__(self, github_token: str, username: str):
+    def __init__(self, github_token: str, username: str, account_type: str = 'user',
+                 session: requests.Session = None, response_cache: ResponseCache = None,
+                 rate_limiter: RateLimitScheduler = None, token_pool: TokenPool = None):
         # Windows terminals can default to non-UTF-8 encodings, which may crash
         # when printing emoji/unicode. Force UTF-8 when supported.
         try:
@@ -28,13 +52,127 @@ class LanguageStatsUpdater:
         except Exception:
             pass
 
-        self.github_token = github_token
+        # Without GITHUB_TOKEN the first pooled token doubles as the primary one
+        self.github_token = github_token or next(iter(env_tokens()), '')
         self.username = username
-        self.headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
+        # 'user' or 'org'; organizations are listed through /orgs/{org}/repos
+        self.account_type = account_type
+        # Login of the token owner, filled in by validate_github_token
+        self.viewer_login = None
+        # GITHUB_API_URL is set by Actions (and GHES); it also points runs at a local fake API
+        self.base_url = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.graphql_url = f'{self.base_url}/graphql'
+        
+        # 'rest' (default) or 'graphql' to batch listing and languages into a few queries
+        self.api_backend = os.getenv('GITHUB_API_BACKEND', 'rest').lower()
+        
+        # Maximum number of /languages requests in flight at once
+        self.fetch_concurrency = max(1, int(os.getenv('LANGUAGE_FETCH_CONCURRENCY', '8')))
+        
+        # One keep-alive session for every call, pooled for listing pages and language fetches
+        # running together (each up to the fetch concurrency).
+        # Authenticated vs. unauthenticated is decided once, in validate_github_token.
+        # Batch runs pass in a shared session, cache and rate limiter.
+        if session is not None:
+            self.session = session
+            self.authenticated = 'Authorization' in session.headers
+        else:
+            self.authenticated = bool(self.github_token and self.github_token != "dummy_token")
+            self.session = create_github_session(
+                self.github_token if self.authenticated else '', 2 * self.fetch_concurrency)
+        
+        # Paces requests from the X-RateLimit-* headers and plans the run budget
+        self.rate_limiter = rate_limiter or RateLimitScheduler.from_env()
+        # Extra tokens from GITHUB_TOKENS: requests go to the token with the most headroom
+        self.token_pool = token_pool or (TokenPool.from_env(self.github_token) if self.authenticated else None)
+        
+        # On-disk ETag cache so unchanged resources are revalidated with a 304
+        self.response_cache = response_cache or ResponseCache.from_env(os.getenv('GITHUB_WORKSPACE', '.'))
+        
+        # Per-repo snapshot of language bytes keyed on pushed_at for incremental runs
+        self.snapshot_path = os.getenv('LANGUAGE_SNAPSHOT_PATH') or os.path.join(
+            os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'language-snapshot.json')
+        
+        # Append-only SQLite history of per-run, per-repo language bytes (None when disabled)
+        self.history = HistoryStore.from_env(os.getenv('GITHUB_WORKSPACE', '.'))
+        self.history_run_id = None
+        # What a run that left README.md in sync hands to --confirm-publish, which runs after the push
+        self.pending_publish_path = os.getenv('PENDING_PUBLISH_PATH') or os.path.join(
+            os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'pending-publish.json')
+        # Inputs of the last computed statistics, kept for the history store
+        self.repo_languages: Dict[str, Dict[str, int]] = {}
+        self.language_totals: Dict[str, int] = {}
+        
+        # Change-detection preflight: newest pushed_at plus repo count from one listing request.
+        # FORCE_FULL_RUN bypasses it.
+        self.force_full_run = os.getenv('FORCE_FULL_RUN', 'false').lower() == 'true'
+        self.watermark_path = os.getenv('PREFLIGHT_WATERMARK_PATH') or os.path.join(
+            os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'preflight-watermark.json')
+        self.preflight_observation = None
+        
+        # Per-endpoint request metrics, exported at the end of the run when paths are set
+        self.metrics = RequestMetrics()
+        self.metrics_json_path = os.getenv('METRICS_JSON_PATH')
+        self.metrics_prometheus_path = os.getenv('METRICS_PROMETHEUS_PATH')
+        
+        # Optional phase/request trace (Chrome trace format) and cProfile dump of run()
+        self.tracer = RunTracer.from_env()
+        
+        # Output targets: the README to update and an optional JSON export of the stats
+        self.readme_path = os.path.join(os.getenv('GITHUB_WORKSPACE', '.'), 'README.md')
+        # Other documents whose marker sections are refreshed from the same computed stats
+        self.extra_targets = [
+            os.path.join(os.getenv('GITHUB_WORKSPACE', '.'), name.strip())
+            for name in os.getenv('EXTRA_STATS_TARGETS', 'LANGUAGE_STATS.md').split(',') if name.strip()
+        ]
+        self.json_output_path = os.getenv('LANGUAGE_STATS_JSON')
+        # Outcome per target file of the last update: 'updated', 'unchanged' or 'failed'
+        self.target_status: Dict[str, str] = {}
+        
+        # Progress of the current crawl, so an interrupted run resumes where it stopped
+        self.checkpoint = CrawlCheckpoint.from_env(os.getenv('GITHUB_WORKSPACE', '.'), username)
+        # Listing pages and repositories the last crawl could not fetch, and the repository
+        # count range the listing's rel="last" page implies (None when it is not known)
+        self.listing_failures: List = []
+        self.crawl_failures: List[str] = []
+        self.listing_expected: Optional[Tuple[int, int]] = None
+        self.max_missing_repositories = int(os.getenv('MAX_MISSING_REPOSITORIES', '0'))
+        
+        # Languages left out of the stats entirely (e.g. vendored HTML or generated code)
+        self.excluded_languages = {
+            name.strip() for name in os.getenv('EXCLUDED_LANGUAGES', '').split(',') if name.strip()
         }
-        self.base_url = 'https://api.github.com'
+        
+        # How many languages the README table and the badge row show
+        self.table_top_n = int(os.getenv('LANGUAGE_TABLE_TOP_N', '10'))
+        self.badges_top_n = int(os.getenv('LANGUAGE_BADGES_TOP_N', '8'))
+        
+        # SVG profile cards rendered from the same stats (replaces a second crawl by an external action)
+        self.cards_dir = os.getenv('PROFILE_CARDS_DIR')
+        self.card_theme = os.getenv('PROFILE_CARD_THEME', 'tokyonight')
+        self.card_layout = os.getenv('PROFILE_CARD_LAYOUT', 'compact').lower()
+        self.card_langs_count = int(os.getenv('PROFILE_CARD_LANGS_COUNT', '8'))
+        
+        # README badges are rendered into content-hashed SVGs next to the README (empty: link img.shields.io)
+        self.badges_dir = os.getenv('BADGES_DIR', 'assets/badges').strip('/')
+        self.badge_logos_dir = os.getenv('BADGE_LOGOS_DIR') or BUNDLED_LOGOS_DIR
+        self.badge_files: Dict[str, str] = {}
+        
+        # Framework detection rules compiled once; per-repo matches are cached for every stage
+        self.framework_matcher = FrameworkMatcher(load_framework_rules(os.getenv('FRAMEWORK_RULES_PATH', '')))
+        self.framework_matches: Dict[str, frozenset] = {}
+        # Name and description matches alone, which decide React allocation
+        self.keyword_matches: Dict[str, frozenset] = {}
+        
+        # Optional accurate mode: read package.json, pubspec.yaml, build.gradle, ... via the git API
+        self.manifest_detection = os.getenv('MANIFEST_DETECTION', 'false').lower() == 'true'
+        self.manifest_cache_path = os.getenv('MANIFEST_CACHE_PATH') or os.path.join(
+            os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'manifest-cache.json')
+        self.manifest_matches: Dict[str, frozenset] = {}
+        
+        # Optional weighting of each repository's languages by its recent activity (ACTIVITY_WEIGHTING)
+        self.activity = ActivityWeights.from_env(self)
+        self.activity_weights: Dict[str, float] = {}
         
         # Language color mapping for badges
         self.language_colors = {
@@ -83,64 +221,242 @@ class LanguageStatsUpdater:
             'Vue': 'vuedotjs',
             'Ruby': 'ruby',
             'React': 'react',
-            'JSX': 'react'
+            'JSX': 'react',
+            'Jupyter Notebook': 'jupyter',
+            'Dockerfile': 'docker',
+            'SCSS': 'sass',
+            'Vim Script': 'vim',
+            'HCL': 'terraform'
         }
     
+    def use_unauthenticated_requests(self) -> None:
+        """Drop the token from the shared session for the rest of the run"""
+        self.authenticated = False
+        self.session.headers.pop('Authorization', None)
+    
+    def record_response(self, url: str, response: requests.Response, started: float) -> None:
+        """Feed one HTTP exchange into the request metrics"""
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', None) or ()
+        elapsed = time.perf_counter() - started
+        self.metrics.record_request(url, response.status_code, elapsed, len(retries))
+        method = response.request.method if response.request is not None else 'GET'
+        self.tracer.complete(f"{method} {endpoint_label(url)}", 'http', started, elapsed,
+                             url=url, status=response.status_code)
+        budget = self.token_pool if self.token_pool and self.authenticated else self.rate_limiter
+        if budget.remaining is not None:
+            self.metrics.record_budget(budget.remaining, budget.limit)
+    
+    def acquire_token(self) -> Tuple[Optional[PooledToken], RateLimitScheduler]:
+        """Wait for the next request slot; returns the pooled token to use (None: session credentials) and its limiter"""
+        if self.token_pool and self.authenticated:
+            token = self.token_pool.acquire()
+            if token:
+                return token, token.limiter
+            print("🔄 Every pooled token was dropped, switching to unauthenticated requests...")
+            self.use_unauthenticated_requests()
+        self.rate_limiter.before_request()
+        return None, self.rate_limiter
+    
     def make_github_request(self, url: str, params: dict = None) -> dict:
         """Make a GitHub API request with retry logic and fallback to unauthenticated"""
+        data, _ = self.make_github_request_with_headers(url, params)
+        return data
+    
+    def make_github_request_with_headers(self, url: str, params: dict = None,
+                                         use_cache: bool = True) -> Tuple[dict, Dict[str, str]]:
+        """Like make_github_request, but also return the response headers (e.g. Link for pagination)"""
         max_retries = 3
         
         for attempt in range(max_retries):
+            # Look up a cached copy so the request can be made conditional
+            cache_key = None
+            cached = None
+            headers = {}
+            if self.response_cache and use_cache:
+                scope = self.username if self.authenticated else 'anonymous'
+                cache_key = ResponseCache.make_key(url, params, scope)
+                cached = self.response_cache.get(cache_key)
+                headers = self.response_cache.conditional_headers(cached)
+            
+            token, limiter = self.acquire_token()
+            if token:
+                headers = dict(headers, Authorization=f'token {token.value}')
+            started = time.perf_counter()
             try:
-                # Try authenticated request first if token is available
-                if self.github_token and self.github_token != "dummy_token":
-                    response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                # Connection errors and 5xx are retried by the session's transport adapter
+                response = self.session.get(url, headers=headers, params=params, timeout=10)
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Request failed after transport retries: {e}")
+                return {}, {}
+            limiter.update(response.headers)
+            self.record_response(url, response, started)
+            
+            # Not modified: serve the cached body (does not count against the rate limit)
+            if response.status_code == 304 and cached:
+                self.response_cache.touch(cache_key)
+                return cached['body'], {'Link': cached.get('link') or ''}
+            
+            # Primary or secondary rate limit: pause all workers (or, with a pool, this token), then retry
+            if limiter.is_rate_limited(response):
+                delay = limiter.backoff(response, attempt)
+                self.metrics.record_rate_limit_wait(delay)
+                self.metrics.record_retry()
+                if token:
+                    print(f"⚠️  Rate limit hit on token {token.label}; it sits out {delay:.0f} seconds, "
+                          f"retrying with the pool (attempt {attempt + 1}/{max_retries})")
                 else:
-                    # Use unauthenticated request
-                    headers = {'Accept': 'application/vnd.github.v3+json'}
-                    response = requests.get(url, headers=headers, params=params, timeout=10)
-                
-                # Check rate limit
-                if response.status_code == 403 and 'rate limit' in response.text.lower():
-                    print(f"⚠️  Rate limit hit. Waiting 60 seconds... (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(60)
-                    continue
-                
-                # If authenticated request fails with auth error, try unauthenticated
-                if response.status_code == 401 and self.github_token:
-                    print(f"🔄 Authentication failed, trying unauthenticated request...")
-                    headers = {'Accept': 'application/vnd.github.v3+json'}
-                    response = requests.get(url, headers=headers, params=params, timeout=10)
-                    
+                    print(f"⚠️  Rate limit hit. Waiting {delay:.0f} seconds... (attempt {attempt + 1}/{max_retries})")
+                continue
+            
+            # A pooled token that stopped working is dropped; the rest of the pool carries on
+            if response.status_code == 401 and token:
+                self.token_pool.disable(token, 'authentication failed')
+                self.metrics.record_retry()
+                continue
+            
+            # If the token stopped working, switch the whole run to unauthenticated once
+            if response.status_code == 401 and self.authenticated:
+                print("🔄 Authentication failed, switching to unauthenticated requests...")
+                self.use_unauthenticated_requests()
+                self.metrics.record_retry()
+                continue
+            
+            try:
                 response.raise_for_status()
-                return response.json()
-                
+                data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"❌ Request to {url} failed: {e}")
+                return {}, {}
+            
+            if cache_key and response.status_code == 200:
+                self.response_cache.store(
+                    cache_key, url, data,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    link=response.headers.get('Link'),
+                )
+            return data, response.headers
+        
+        # Never hand back an empty payload here: that would silently drop data from the stats
+        raise RateLimitError(f"Still rate limited after {max_retries} attempts: {url}")
+    
+    def get_response(self, url: str, params: dict = None, headers: Dict[str, str] = None,
+                     max_retries: int = 3) -> Optional[requests.Response]:
+        """GET through the rate limiter and token pool, bypassing the response cache.
+        
+        For callers that need the status (202, 204, 304) or headers themselves; rate limits
+        and dropped pooled tokens are retried. Returns None on transport errors or when still
+        rate limited after max_retries.
+        """
+        for attempt in range(max_retries):
+            request_headers = dict(headers or {})
+            token, limiter = self.acquire_token()
+            if token:
+                request_headers['Authorization'] = f'token {token.value}'
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=request_headers, params=params, timeout=10)
             except requests.exceptions.RequestException as e:
-                print(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    print(f"❌ Failed to make request after {max_retries} attempts")
-                    return {}
+                print(f"❌ Request to {url} failed: {e}")
+                return None
+            limiter.update(response.headers)
+            self.record_response(url, response, started)
+            if limiter.is_rate_limited(response):
+                delay = limiter.backoff(response, attempt)
+                self.metrics.record_rate_limit_wait(delay)
+                self.metrics.record_retry()
+                print(f"⚠️  Rate limit hit on {endpoint_label(url)}; next attempt in {delay:.0f} seconds")
+                continue
+            if response.status_code == 401 and token:
+                self.token_pool.disable(token, 'authentication failed')
+                self.metrics.record_retry()
+                continue
+            return response
+        return None
+    
+    def plan_run_budget(self, repo_count: int = None) -> None:
+        """Check the rate-limit budget before crawling and slow down, switch mode or fail.
+        
+        repo_count is the account's repository count from a listing probe (observe_latest_push);
+        without a snapshot it sizes the crawl, and it is probed here when not given.
+        """
+        # A token pool reports the sum of its tokens' budgets
+        budget_source = self.token_pool if self.token_pool and self.authenticated else self.rate_limiter
+        resources = budget_source.fetch_budget(self.session, self.base_url)
+        core = resources.get('core')
+        if not core:
+            return
+        
+        # Worst case: every known repository changed since the last run.
+        # Without a snapshot (first run) every listed repository has to be fetched.
+        known_repos = len(self.load_language_snapshot())
+        if not known_repos:
+            if repo_count is None:
+                listing_url, listing_params, _, _ = self.get_listing_endpoints()
+                observation = self.observe_latest_push(listing_url, listing_params)
+                repo_count = observation['repo_count'] if observation else 0
+            known_repos = repo_count
+        pages = known_repos // 100 + 1
+        graphql_cost = pages * 2  # ~2 points per page of 100 repositories with languages
+        rest_cost = pages + known_repos
+        
+        if self.api_backend == 'graphql' and self.authenticated:
+            budget, needed = resources.get('graphql') or {}, graphql_cost
+        else:
+            budget, needed = core, rest_cost
+        remaining = budget.get('remaining', 0)
+        print(f"📉 Rate limit budget: {remaining}/{budget.get('limit', '?')} remaining, "
+              f"run needs up to ~{needed} calls")
+        
+        if needed <= remaining - budget_source.effective_reserve():
+            return
+        
+        # Cheaper mode: one GraphQL query per 100 repositories instead of one call per repository
+        graphql_remaining = (resources.get('graphql') or {}).get('remaining', 0)
+        if self.api_backend != 'graphql' and self.authenticated and graphql_cost <= graphql_remaining:
+            print("🔀 REST budget too low for this run, switching to the GraphQL backend")
+            self.api_backend = 'graphql'
+            return
+        
+        wait = (budget.get('reset') or 0) - time.time()
+        if wait <= self.rate_limiter.max_wait:
+            print(f"🐢 Budget is tight; requests will be paced until the limit resets in {max(wait, 0):.0f}s")
+            return
+        
+        raise RateLimitError(
+            f"Run needs ~{needed} requests but only {remaining} remain and the limit resets in "
+            f"{wait:.0f}s (RATE_LIMIT_MAX_WAIT={self.rate_limiter.max_wait:.0f}s)")
     
     def validate_github_token(self) -> bool:
         """Validate GitHub token by making a test API call"""
-        if not self.github_token or self.github_token == "dummy_token":
+        if not self.authenticated:
             print("⚠️  No valid GitHub token provided, will use unauthenticated requests")
             return True  # Allow unauthenticated access for public repos
             
         try:
             url = f'{self.base_url}/user'
-            response = requests.get(url, headers=self.headers, timeout=10)
+            started = time.perf_counter()
+            response = self.session.get(url, timeout=10)
+            self.record_response(url, response, started)
             
+            if response.status_code == 401 and self.token_pool:
+                # The rest of the pool may still be good
+                for token in self.token_pool.tokens:
+                    if token.value == self.github_token:
+                        self.token_pool.disable(token, 'invalid')
+                if self.token_pool.active():
+                    return True
             if response.status_code == 401:
-                print("⚠️  GitHub token is invalid, will try unauthenticated requests")
+                print("⚠️  GitHub token is invalid, will use unauthenticated requests")
+                self.use_unauthenticated_requests()
                 return True  # Fallback to unauthenticated
             elif response.status_code == 403:
-                print("⚠️  GitHub token has limited permissions, will try unauthenticated requests")
-                return True  # Fallback to unauthenticated
+                # Workflow tokens cannot read /user but still work for repository endpoints
+                print("⚠️  GitHub token has limited permissions, continuing with it")
+                return True
             elif response.status_code == 200:
                 user_data = response.json()
+                self.viewer_login = user_data.get('login')
                 print(f"✅ GitHub token validated for user: {user_data.get('login', 'unknown')}")
                 return True
             else:
@@ -148,102 +464,387 @@ class LanguageStatsUpdater:
                 return True  # Continue anyway
                 
         except requests.exceptions.RequestException as e:
-            print(f"⚠️  Error validating GitHub token: {e}, will try without authentication")
-            return True  # Continue without authentication
+            print(f"⚠️  Error validating GitHub token: {e}, continuing anyway")
+            return True  # Continue anyway
     
-    def get_user_repositories(self) -> List[Dict]:
-        """Fetch all repositories (public and private if authenticated) for the user"""
+    def get_listing_endpoints(self) -> Tuple[str, dict, str, dict]:
+        """Return the primary and fallback listing endpoints (URL and base params) for this account"""
+        # Try to get both private and public repos if authenticated
+        url = f'{self.base_url}/user/repos'  # This endpoint includes private repos if authenticated
+        params = {
+            'visibility': 'all',  # Get both public and private
+            'affiliation': 'owner',  # Only repos owned by the user
+            'sort': 'updated',
+            'direction': 'desc',
+            'per_page': 100,
+        }
+        
+        # If that fails, fallback to public repos only
+        fallback_url = f'{self.base_url}/users/{self.username}/repos'
+        fallback_params = {
+            'type': 'public',
+            'sort': 'updated',
+            'direction': 'desc',
+            'per_page': 100,
+        }
+        
+        if self.account_type == 'org':
+            # Organizations list every repository the token can see through one endpoint
+            url = f'{self.base_url}/orgs/{self.username}/repos'
+            params = dict(fallback_params, type='all')
+        elif self.viewer_login and self.viewer_login.lower() != self.username.lower():
+            # The token belongs to someone else, so /user/repos would list the wrong account
+            url, params = fallback_url, fallback_params
+        
+        return url, params, fallback_url, fallback_params
+    
+    @staticmethod
+    def parse_link_header(link_header: str) -> Dict[str, str]:
+        """Map rel names ('next', 'last', ...) to URLs from a Link header"""
+        links = {}
+        for link in requests.utils.parse_header_links(link_header or ''):
+            if link.get('rel') and link.get('url'):
+                links[link['rel']] = link['url']
+        return links
+    
+    @staticmethod
+    def page_number(url: str) -> int:
+        """Extract the page query parameter from a pagination URL"""
+        match = re.search(r'[?&]page=(\d+)', url or '')
+        return int(match.group(1)) if match else 0
+    
+    def log_repository_page(self, records: List[RepoRecord]) -> None:
+        """Log repository info for one listing page"""
+        for repo in records:
+            privacy_status = "🔒 Private" if repo.private else "🌐 Public"
+            print(f"  Found repository: {repo.name} ({privacy_status}) (updated: {repo.updated_at or 'unknown'})")
+    
+    def observe_latest_push(self, url: str, params: dict) -> Dict:
+        """Probe a listing with one request: the newest pushed_at and the repository count"""
+        probe = dict(params, sort='pushed', direction='desc', per_page=1, page=1)
+        # Uncached: a deletion further down changes the Link header but not the body, so a 304 would hide it
+        repos, headers = self.make_github_request_with_headers(url, probe, use_cache=False)
+        if not isinstance(repos, list):
+            return None
+        # With one repository per page, the last page number is the repository count
+        last_page = self.page_number(self.parse_link_header(headers.get('Link')).get('last'))
+        return {
+            'endpoint': url,
+            'params': params,
+            'authenticated': self.authenticated,
+            'pushed_at': repos[0].get('pushed_at') if repos else None,
+            'repo_count': last_page or len(repos),
+        }
+    
+    def load_watermark(self) -> Dict:
+        """Load the preflight watermark saved by the last complete run"""
+        try:
+            with open(self.watermark_path, 'r', encoding='utf-8') as file:
+                watermark = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return watermark if watermark.get('username') == self.username else {}
+    
+    def aggregate_settings(self) -> Dict:
+        """Settings that change the totals without any new data"""
+        return {
+            'react_percent': os.getenv('REACT_JS_ALLOCATION_PERCENT', '0'),
+            'excluded_languages': sorted(self.excluded_languages),
+            'activity_weighting': [self.activity.metric, self.activity.window_weeks] if self.activity else False,
+            'manifest_detection': self.manifest_detection,
+            'framework_rules': self.framework_matcher.rules,
+        }
+    
+    def render_settings(self) -> Dict:
+        """Settings that change the rendered output without new totals"""
+        return {
+            'table_top_n': self.table_top_n,
+            'badges_top_n': self.badges_top_n,
+            'colors': self.language_colors,
+            'logos': self.logo_slugs,
+            'framework_rules': self.framework_matcher.rules,
+            'cards': [bool(self.cards_dir), self.card_theme, self.card_layout, self.card_langs_count],
+            'badges': [self.badges_dir, os.getenv('BADGE_LOGOS_DIR', '')],
+        }
+    
+    def settings_fingerprint(self) -> str:
+        """Hash of every setting that changes the outputs, so the preflight notices config changes"""
+        return content_hash(json.dumps({
+            'aggregate': self.aggregate_settings(),
+            'render': self.render_settings(),
+            'outputs': [self.readme_path, self.extra_targets, self.json_output_path, self.cards_dir],
+            # Activity weights move with the clock: a new stats week shifts the window without any push
+            'activity_week': window_week(time.time()) if self.activity else None,
+        }, sort_keys=True))
+    
+    @staticmethod
+    def card_totals(repositories: Iterable[Dict]) -> List[int]:
+        """[stars, forks] over the owned repositories, as the stats card shows them"""
+        owned = [repo for repo in repositories if not repo.get('fork', False)]
+        return [sum(repo.get('stargazers_count', 0) for repo in owned),
+                sum(repo.get('forks_count', 0) for repo in owned)]
+    
+    def observe_card_totals(self, url: str, params: dict) -> Optional[List[int]]:
+        """card_totals from the listing pages, revalidated by ETag (a 304 costs no budget); None on failure"""
         repositories = []
         page = 1
+        while True:
+            repos, headers = self.make_github_request_with_headers(url, dict(params, page=page))
+            if not headers or not isinstance(repos, list):
+                return None
+            repositories += [RepoRecord.from_rest(repo) for repo in repos]
+            if not self.parse_link_header(headers.get('Link')).get('next'):
+                return self.card_totals(repositories)
+            page += 1
+    
+    def save_watermark(self, observation: Dict) -> None:
+        directory = os.path.dirname(self.watermark_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        try:
+            write_atomic(self.watermark_path, json.dumps(dict(observation, username=self.username), indent=1))
+        except OSError as e:
+            print(f"⚠️  Could not save preflight watermark: {e}")
+    
+    def preflight_unchanged(self) -> bool:
+        """True when neither the settings nor any repository changed since the last published run"""
+        watermark = self.load_watermark()
+        if not watermark or watermark.get('authenticated') != self.authenticated:
+            return False
+        if watermark.get('settings') != self.settings_fingerprint():
+            print("🔎 Preflight: settings changed since the last run")
+            return False
+        
+        self.preflight_observation = self.observe_latest_push(watermark['endpoint'], watermark['params'])
+        if self.preflight_observation is None:
+            return False
+        
+        observed = (self.preflight_observation['pushed_at'], self.preflight_observation['repo_count'])
+        print(f"🔎 Preflight: {observed[1]} repositories, latest push {observed[0] or 'never'} "
+              f"(last run: {watermark.get('repo_count')}, {watermark.get('pushed_at') or 'never'})")
+        if observed != (watermark.get('pushed_at'), watermark.get('repo_count')):
+            return False
+        
+        # Stars and forks change without a push; only the stats card shows them
+        if self.cards_dir:
+            totals = self.observe_card_totals(watermark['endpoint'], watermark['params'])
+            print(f"🔎 Preflight: {totals[0] if totals else '?'} stars, {totals[1] if totals else '?'} forks "
+                  f"(last run: {watermark.get('card_totals')})")
+            return totals is not None and totals == watermark.get('card_totals')
+        return True
+    
+    def iter_repository_pages_rest(self) -> Iterator[List[RepoRecord]]:
+        """Stream listing pages as slim records, fetching remaining pages in parallel once the last page is known"""
+        url, params, fallback_url, fallback_params = self.get_listing_endpoints()
         
         print(f"Fetching repositories for user: {self.username}")
         
-        while True:
-            # Try to get both private and public repos if authenticated
-            url = f'{self.base_url}/user/repos'  # This endpoint includes private repos if authenticated
-            params = {
-                'visibility': 'all',  # Get both public and private
-                'affiliation': 'owner',  # Only repos owned by the user
-                'sort': 'updated',
-                'direction': 'desc',
-                'per_page': 100,
-                'page': page
-            }
-            
-            # If that fails, fallback to public repos only
-            fallback_url = f'{self.base_url}/users/{self.username}/repos'
-            fallback_params = {
-                'type': 'public',
-                'sort': 'updated',
-                'direction': 'desc',
-                'per_page': 100,
-                'page': page
-            }
+        # Try authenticated endpoint first (includes private repos)
+        repos, headers = self.make_github_request_with_headers(url, dict(params, page=1))
+        if not repos and fallback_url != url:
+            print("⚠️  No repositories returned from authenticated endpoint")
+            # Try public endpoint as fallback
+            print("🔄 Trying public repositories endpoint...")
+            url, params = fallback_url, fallback_params
+            repos, headers = self.make_github_request_with_headers(url, dict(params, page=1))
+        
+        if not repos:
+            print("⚠️  No repositories returned")
+            return
+        
+        links = self.parse_link_header(headers.get('Link'))
+        last_page = self.page_number(links.get('last'))
+        more = last_page > 1 or (not last_page and links.get('next'))
+        
+        if last_page:
+            # A complete listing holds more than the pages before the last one and at most all of them
+            self.listing_expected = ((last_page - 1) * params['per_page'] + 1, last_page * params['per_page'])
+        
+        records = [RepoRecord.from_rest(repo) for repo in repos]
+        self.log_repository_page(records)
+        yield records
+        
+        if more:
+            yield from self.iter_remaining_rest_pages(url, params, 2, last_page)
+    
+    def iter_remaining_rest_pages(self, url: str, params: dict, first_page: int,
+                                  last_page: int) -> Iterator[List[RepoRecord]]:
+        """Yield listing pages from first_page on (up to last_page, or following rel="next" when it is 0)"""
+        if last_page:
+            # Every remaining page is known up front: fetch them concurrently, yield in order
+            def fetch_page(page: int) -> List[RepoRecord]:
+                page_repos, page_headers = self.make_github_request_with_headers(url, dict(params, page=page))
+                if not page_headers:
+                    self.listing_failures.append(page)
+                return [RepoRecord.from_rest(repo) for repo in page_repos or []]
             
-            try:
-                # Try authenticated endpoint first (includes private repos)
-                repos = self.make_github_request(url, params)
-                if not repos:
-                    print(f"⚠️  No repositories returned from authenticated endpoint for page {page}")
-                    # Try public endpoint as fallback
-                    print("🔄 Trying public repositories endpoint...")
-                    repos = self.make_github_request(fallback_url, fallback_params)
-                    
-                if not repos:
-                    print(f"⚠️  No repositories returned for page {page}")
-                    break
-                    
-                # Log repository info
-                for repo in repos:
-                    repo_name = repo['name']
-                    private = repo.get('private', False)
-                    updated_at = repo.get('updated_at', 'unknown')
-                    privacy_status = "🔒 Private" if private else "🌐 Public"
-                    print(f"  Found repository: {repo_name} ({privacy_status}) (updated: {updated_at})")
-                    
-                repositories.extend(repos)
-                page += 1
-                
-                # Rate limiting
-                time.sleep(0.1)
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching repositories: {e}")
-                
-                # If authenticated request fails, try public-only endpoint
-                if page == 1:
-                    print("🔄 Attempting public repositories only...")
-                    try:
-                        repos = self.make_github_request(fallback_url, fallback_params)
-                        if repos:
-                            print(f"✅ Fallback successful - fetched {len(repos)} public repositories")
-                            repositories.extend(repos)
-                            page += 1
-                            continue
-                    except Exception as fallback_error:
-                        print(f"❌ Fallback also failed: {fallback_error}")
-                
-                break
+            with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as pool:
+                pages = range(first_page, last_page + 1)
+                for records in pool.map(fetch_page, pages):
+                    self.log_repository_page(records)
+                    yield records
+            return
         
-        # Count private vs public repos
+        # No rel="last" (e.g. a cached page without headers): follow rel="next" one page at a time
+        page = first_page
+        while True:
+            repos, headers = self.make_github_request_with_headers(url, dict(params, page=page))
+            if not headers:
+                self.listing_failures.append(page)
+            if not repos:
+                break
+            records = [RepoRecord.from_rest(repo) for repo in repos]
+            self.log_repository_page(records)
+            has_next = bool(self.parse_link_header(headers.get('Link')).get('next'))
+            yield records
+            if not has_next:
+                break
+            page += 1
+    
+    def get_user_repositories(self) -> List[RepoRecord]:
+        """Fetch all repositories (public and private if authenticated) for the user"""
+        repositories = [repo for page in self.iter_repository_pages_rest() for repo in page]
+        self.log_repository_totals(repositories)
+        return repositories
+    
+    def log_repository_totals(self, repositories: List[RepoRecord]) -> None:
+        """Print the private vs public repository counts"""
         private_count = sum(1 for repo in repositories if repo.get('private', False))
         public_count = len(repositories) - private_count
         
         print(f"Total repositories found: {len(repositories)}")
         print(f"  🌐 Public: {public_count}")
         print(f"  🔒 Private: {private_count}")
+    
+    REPOSITORIES_QUERY = """
+query($login: String!, $cursor: String) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        isFork
+        isPrivate
+        isArchived
+        description
+        createdAt
+        updatedAt
+        pushedAt
+        stargazerCount
+        forkCount
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+    
+    def make_graphql_request(self, query: str, variables: dict = None) -> dict:
+        """Run a GraphQL query with retry logic; returns the data payload or {}"""
+        max_retries = 3
         
-        return repositories
+        for attempt in range(max_retries):
+            try:
+                token = self.token_pool.acquire() if self.token_pool and self.authenticated else None
+                started = time.perf_counter()
+                response = self.session.post(
+                    self.graphql_url,
+                    json={'query': query, 'variables': variables or {}},
+                    headers={'Authorization': f'token {token.value}'} if token else None,
+                    timeout=30,
+                )
+                self.record_response(self.graphql_url, response, started)
+                if response.status_code == 401 and token:
+                    self.token_pool.disable(token, 'authentication failed')
+                    continue
+                if self.rate_limiter.is_rate_limited(response):
+                    if token:
+                        # Only this token sits out; the next attempt goes to another one
+                        delay = token.limiter.backoff(response, attempt)
+                        self.metrics.record_rate_limit_wait(delay)
+                        self.metrics.record_retry()
+                        print(f"⚠️  GraphQL rate limit hit on token {token.label}, retrying with the pool")
+                        continue
+                    delay = self.rate_limiter.backoff(response, attempt)
+                    if delay > self.rate_limiter.max_wait:
+                        raise RateLimitError(f"GraphQL rate limit resets in {delay:.0f}s")
+                    self.metrics.record_rate_limit_wait(delay)
+                    self.metrics.record_retry()
+                    print(f"⚠️  GraphQL rate limit hit. Waiting {delay:.0f} seconds...")
+                    with trace_span('rate_limit_wait', 'sleep', seconds=delay):
+                        time.sleep(delay)
+                    continue
+                response.raise_for_status()
+                payload = response.json()
+                
+                if payload.get('errors'):
+                    messages = '; '.join(error.get('message', '') for error in payload['errors'])
+                    print(f"⚠️  GraphQL errors: {messages}")
+                    if not payload.get('data'):
+                        return {}
+                return payload.get('data') or {}
+                
+            except requests.exceptions.RequestException as e:
+                print(f"GraphQL request failed (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    with trace_span('retry_backoff', 'sleep', seconds=2 ** attempt):
+                        time.sleep(2 ** attempt)  # Exponential backoff
+        
+        print(f"❌ Failed to run GraphQL query after {max_retries} attempts")
+        return {}
     
-    def get_repository_languages(self, repo_name: str) -> Dict[str, int]:
-        """Get language statistics for a specific repository"""
+    def iter_repository_pages_graphql(self) -> Iterator[List[RepoRecord]]:
+        """Stream repositories with their languages from paginated GraphQL queries"""
+        cursor = None
+        
+        print(f"Fetching repositories for user via GraphQL: {self.username}")
+        
+        while True:
+            data = self.make_graphql_request(self.REPOSITORIES_QUERY, {'login': self.username, 'cursor': cursor})
+            connection = ((data.get('repositoryOwner') or {}).get('repositories')) or {}
+            if not connection:
+                print("⚠️  No repositories returned from GraphQL")
+                if cursor:
+                    self.listing_failures.append(cursor)
+                return
+            
+            records = [RepoRecord.from_graphql(node) for node in connection.get('nodes') or []]
+            self.log_repository_page(records)
+            page_info = connection.get('pageInfo') or {}
+            cursor = page_info.get('endCursor') if page_info.get('hasNextPage') else None
+            yield records
+            
+            if not cursor:
+                break
+    
+    def iter_repository_pages(self) -> Iterator[List[RepoRecord]]:
+        """Stream repository pages from the configured API backend"""
+        if self.api_backend == 'graphql':
+            if self.authenticated:
+                yielded = False
+                for records in self.iter_repository_pages_graphql():
+                    yielded = True
+                    yield records
+                if yielded:
+                    return
+                print("🔄 GraphQL backend returned nothing, falling back to REST...")
+            else:
+                print("⚠️  GraphQL backend requires a token, falling back to REST...")
+        yield from self.iter_repository_pages_rest()
+    
+    def get_repository_languages(self, repo_name: str) -> Optional[Dict[str, int]]:
+        """Get language statistics for a specific repository (None when the request failed)"""
         url = f'{self.base_url}/repos/{self.username}/{repo_name}/languages'
         
         try:
-            return self.make_github_request(url)
+            languages, headers = self.make_github_request_with_headers(url)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching languages for {repo_name}: {e}")
-            return {}
+            return None
+        # Failed requests come back without headers; an empty repository is a successful {}
+        return languages if headers else None
     
     def detect_new_repositories(self, repositories: List[Dict]) -> List[Dict]:
         """Detect recently created repositories (within last 30 days) for immediate updates"""
@@ -273,86 +874,269 @@ class LanguageStatsUpdater:
             
         return recent_repos
     
+    def repository_keyword_frameworks(self, repo: Dict) -> frozenset:
+        """Return the frameworks a repository's name and description point to, scanning it only once per run"""
+        repo_name = repo['name']
+        frameworks = self.keyword_matches.get(repo_name)
+        if frameworks is None:
+            frameworks = self.framework_matcher.match_text(repo_name, repo.get('description'))
+            self.keyword_matches[repo_name] = frameworks
+        return frameworks
+    
+    def repository_frameworks(self, repo: Dict) -> frozenset:
+        """Return the frameworks detected for a repository (keywords, topics and manifests)"""
+        repo_name = repo['name']
+        frameworks = self.framework_matches.get(repo_name)
+        if frameworks is None:
+            frameworks = (self.repository_keyword_frameworks(repo)
+                          | self.framework_matcher.match_topics(repo.get('topics'))
+                          | self.manifest_matches.get(repo_name, frozenset()))
+            self.framework_matches[repo_name] = frameworks
+        return frameworks
+    
+    def forget_repository_frameworks(self, repo_name: str = None) -> None:
+        """Drop cached framework matches for one repository (or all) so they are detected afresh"""
+        if repo_name is None:
+            self.framework_matches.clear()
+            self.keyword_matches.clear()
+        else:
+            self.framework_matches.pop(repo_name, None)
+            self.keyword_matches.pop(repo_name, None)
+    
+    def detect_repository_manifests(self, repositories: List[Dict]) -> None:
+        """Add the frameworks declared in each repository's manifests to the per-repo matches"""
+        detector = ManifestDetector(
+            self.manifest_cache_path, self.username, self.base_url,
+            self.framework_matcher.manifest_files, self.make_github_request, self.get_response,
+            self.fetch_concurrency,
+        )
+        manifests_by_repo = detector.detect(repositories)
+        self.manifest_matches = {
+            repo_name: self.framework_matcher.match_manifests(manifests)
+            for repo_name, manifests in manifests_by_repo.items()
+        }
+        # Matches computed before the manifests were known are stale now
+        self.framework_matches.clear()
+    
     def is_react_project(self, repo_name: str, repo_data: Dict) -> bool:
         """Detect if a repository is a React project"""
-        # Check if repo name contains react
-        if 'react' in repo_name.lower():
-            return True
-            
-        # Check if repository description mentions React (handle None description)
-        description = repo_data.get('description') or ''
-        if 'react' in description.lower():
-            return True
-            
-        # For comprehensive detection, we could check for package.json with React deps
-        # but that would require additional API calls. The name-based detection
-        # should be sufficient for most cases.
-        return False
+        # Name and description only, as React allocation has always worked (topics only add
+        # badges), plus package.json dependencies when MANIFEST_DETECTION is enabled.
+        frameworks = self.repository_keyword_frameworks(repo_data) | self.manifest_matches.get(repo_name, frozenset())
+        return 'React' in frameworks
     
-    def calculate_language_statistics(self, repositories: List[Dict] = None) -> Dict[str, float]:
-        """Calculate language usage percentages across all repositories"""
-        if repositories is None:
-            repositories = self.get_user_repositories()
+    async def _fetch_languages_async(self, batches: Iterator[List[str]],
+                                     on_result: Callable[[str, Optional[Dict[str, int]]], None] = None) -> Dict[str, Dict[str, int]]:
+        """Fetch languages concurrently, bounded by fetch_concurrency, as batches of names stream in"""
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        # asyncio's default executor has min(32, cpu + 4) threads, which would cap the concurrency;
+        # this one has a thread per fetch plus one for pulling listing batches
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.fetch_concurrency + 1))
         
-        language_totals = {}
+        async def fetch_one(repo_name: str):
+            async with semaphore:
+                # requests is blocking, so each call runs on a worker thread
+                languages = await asyncio.to_thread(self.get_repository_languages, repo_name)
+                if on_result:
+                    on_result(repo_name, languages)
+                return repo_name, languages
         
-        print(f"Found {len(repositories)} repositories")
+        tasks = []
+        while True:
+            # The next batch may still be listing; pull it on a worker thread so started fetches keep running
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            tasks.extend(asyncio.create_task(fetch_one(name)) for name in batch)
         
-        for repo in repositories:
-            if repo.get('fork', False):
-                continue  # Skip forked repositories
-                
-            repo_name = repo['name']
-            print(f"Processing repository: {repo_name}")
+        results = await asyncio.gather(*tasks)
+        return dict(results)
+    
+    def add_repository_languages(self, language_totals: Dict[str, int], repo: Dict,
+                                 languages: Dict[str, int]) -> None:
+        """Add one repository's language bytes to the running totals"""
+        repo_name = repo['name']
+        languages = {language: size for language, size in languages.items() if language not in self.excluded_languages}
+        
+        # Check if this is a React project and React conversion is enabled
+        react_conversion_percent = int(os.getenv('REACT_JS_ALLOCATION_PERCENT', '0'))
+        is_react = self.is_react_project(repo_name, repo)
+        
+        if is_react and 'JavaScript' in languages and react_conversion_percent > 0:
+            # For React projects, convert a portion of JavaScript to React
+            js_bytes = languages['JavaScript']
+            # Use configurable percentage (default 0% = disabled)
+            react_bytes = int(js_bytes * (react_conversion_percent / 100))
+            remaining_js = js_bytes - react_bytes
             
-            languages = self.get_repository_languages(repo_name)
+            print(f"  Detected React project! Converting {react_bytes} bytes ({react_conversion_percent}%) to React")
             
-            # Skip if no language data available (rate limit, private repo, etc.)
-            if not languages:
-                print(f"  ⚠️  No language data available for {repo_name}")
-                continue
+            # Add React bytes
+            if 'React' not in self.excluded_languages:
+                language_totals['React'] = language_totals.get('React', 0) + react_bytes
             
-            # Check if this is a React project and React conversion is enabled
-            react_conversion_percent = int(os.getenv('REACT_JS_ALLOCATION_PERCENT', '0'))
-            is_react = self.is_react_project(repo_name, repo)
+            # Add remaining JavaScript bytes if any
+            if remaining_js > 0:
+                if 'JavaScript' not in language_totals:
+                    language_totals['JavaScript'] = 0
+                language_totals['JavaScript'] += remaining_js
             
-            if is_react and 'JavaScript' in languages and react_conversion_percent > 0:
-                # For React projects, convert a portion of JavaScript to React
-                js_bytes = languages['JavaScript']
-                # Use configurable percentage (default 0% = disabled)
-                react_bytes = int(js_bytes * (react_conversion_percent / 100))
-                remaining_js = js_bytes - react_bytes
-                
-                print(f"  Detected React project! Converting {react_bytes} bytes ({react_conversion_percent}%) to React")
-                
-                # Add React bytes
-                if 'React' not in language_totals:
-                    language_totals['React'] = 0
-                language_totals['React'] += react_bytes
-                
-                # Add remaining JavaScript bytes if any
-                if remaining_js > 0:
-                    if 'JavaScript' not in language_totals:
-                        language_totals['JavaScript'] = 0
-                    language_totals['JavaScript'] += remaining_js
-                
-                # Add other languages as-is
-                for language, bytes_count in languages.items():
-                    if language != 'JavaScript':
-                        if language not in language_totals:
-                            language_totals[language] = 0
-                        language_totals[language] += bytes_count
-            else:
-                # Add all languages as-is for non-React projects or when conversion is disabled
-                for language, bytes_count in languages.items():
+            # Add other languages as-is
+            for language, bytes_count in languages.items():
+                if language != 'JavaScript':
                     if language not in language_totals:
                         language_totals[language] = 0
                     language_totals[language] += bytes_count
-            
-            # Rate limiting
-            time.sleep(0.1)
+        else:
+            # Add all languages as-is for non-React projects or when conversion is disabled
+            for language, bytes_count in languages.items():
+                if language not in language_totals:
+                    language_totals[language] = 0
+                language_totals[language] += bytes_count
+    
+    def load_language_snapshot(self) -> Dict[str, Dict]:
+        """Load the persisted per-repository language snapshot"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable language snapshot: {e}")
+            return {}
+        
+        # A snapshot for another account is useless for this one
+        if snapshot.get('username') != self.username:
+            return {}
+        return snapshot.get('repositories', {})
+    
+    def save_language_snapshot(self, snapshot: Dict[str, Dict]) -> None:
+        """Persist the per-repository language snapshot atomically"""
+        directory = os.path.dirname(self.snapshot_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump({'username': self.username, 'repositories': snapshot}, file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️  Could not save language snapshot: {e}")
+    
+    def refresh_language_snapshot(self, repository_pages: Iterable[List[RepoRecord]]) -> Tuple[Dict[str, Dict], List[RepoRecord]]:
+        """Refetch languages only for new or pushed repositories and drop deleted ones.
         
-        # Calculate percentages
+        Consumes repository pages as they are listed, so language fetches for the
+        first page start before listing finishes. Progress is checkpointed as it
+        arrives; a crawl that was interrupted lists again from the first page and
+        reuses the checkpointed payloads. A listing that shifted while it was read
+        (a repository pushed between pages) counts as failed rather than silently
+        skipping or double-counting repositories.
+        Returns the snapshot and all repositories; crawl_failures lists what is missing.
+        """
+        self.listing_failures = []
+        self.crawl_failures = []
+        self.listing_expected = None
+        checkpoint = self.checkpoint
+        if checkpoint:
+            listing_url, _, _, _ = self.get_listing_endpoints()
+            checkpoint.load(f'{self.api_backend}:{listing_url}:{self.authenticated}')
+        # Payloads fetched by an interrupted run are as good as snapshot entries
+        with trace_span('load_snapshot'):
+            previous = {**self.load_language_snapshot(), **(checkpoint.languages if checkpoint else {})}
+        snapshot = {}
+        repositories = []
+        stale_repos = {}
+        duplicates = []
+        
+        def stale_batches() -> Iterator[List[str]]:
+            listed = set()
+            for page in repository_pages:
+                batch = []
+                for repo in page:
+                    # sort=updated moves a repository pushed mid-listing onto an earlier page
+                    if repo['name'] in listed:
+                        duplicates.append(repo['name'])
+                        continue
+                    listed.add(repo['name'])
+                    repositories.append(repo)
+                    if repo.get('fork', False):
+                        continue
+                    entry = previous.get(repo['name'])
+                    if 'languages' in repo:
+                        # The GraphQL backend already delivered this repository's languages
+                        snapshot[repo['name']] = {'pushed_at': repo.get('pushed_at'), 'languages': repo['languages']}
+                    elif entry and entry.get('pushed_at') and entry.get('pushed_at') == repo.get('pushed_at'):
+                        snapshot[repo['name']] = entry
+                    else:
+                        stale_repos[repo['name']] = repo.get('pushed_at')
+                        batch.append(repo['name'])
+                yield batch
+        
+        def on_result(repo_name: str, languages: Optional[Dict[str, int]]) -> None:
+            if languages is None:
+                self.crawl_failures.append(repo_name)
+            elif checkpoint:
+                checkpoint.record_languages(repo_name, stale_repos.get(repo_name), languages)
+        
+        started = time.perf_counter()
+        try:
+            # Listing pages and language fetches overlap, so they share one span
+            with trace_span('list_and_fetch_languages') as span:
+                languages_by_repo = asyncio.run(self._fetch_languages_async(stale_batches(), on_result))
+                span.update(repositories=len(repositories), refetched=len(stale_repos))
+        except BaseException:
+            # Rate limit, timeout or cancellation: keep what was fetched for the next run
+            if checkpoint:
+                checkpoint.flush(force=True)
+                print(f"💾 Crawl interrupted; progress saved to {checkpoint.path}")
+            raise
+        
+        if duplicates:
+            print(f"⚠️  Repository listing shifted while it was read ({', '.join(duplicates)} listed twice)")
+            self.listing_failures.append('shifted')
+        elif self.listing_expected and not self.listing_failures:
+            low, high = self.listing_expected
+            if not low <= len(repositories) <= high:
+                print(f"⚠️  Listed {len(repositories)} repositories, but the pagination implies {low}-{high}")
+                self.listing_failures.append('count')
+        
+        reused = len(snapshot)
+        for repo_name, pushed_at in stale_repos.items():
+            languages = languages_by_repo.get(repo_name)
+            # Failed fetches are not stored so the next run retries them; an empty
+            # repository's {} is kept with its pushed_at so it is not refetched every run
+            if languages is not None:
+                snapshot[repo_name] = {
+                    'pushed_at': pushed_at,
+                    'languages': languages,
+                }
+        
+        removed = len(set(previous) - {repo['name'] for repo in repositories if not repo.get('fork', False)})
+        print(f"♻️  Reused {reused} cached repositories, refetched {len(stale_repos)}, "
+              f"dropped {removed} (concurrency: {self.fetch_concurrency}, "
+              f"{time.perf_counter() - started:.2f}s)")
+        
+        if self.listing_failures or self.crawl_failures:
+            print(f"⚠️  Crawl incomplete: {len(self.listing_failures)} listing errors and "
+                  f"{len(self.crawl_failures)} repositories failed")
+            if checkpoint:
+                checkpoint.flush(force=True)
+                print(f"💾 Progress saved to {checkpoint.path}; the next run retries only what is missing")
+        # A partial listing would drop the unlisted repositories from the snapshot, and an
+        # empty listing is far more likely a failed crawl than a deleted account
+        if repositories and not self.listing_failures:
+            with trace_span('save_snapshot'):
+                self.save_language_snapshot(snapshot)
+            if checkpoint and not self.crawl_failures:
+                checkpoint.clear()
+        return snapshot, repositories
+    
+    def dataset_complete(self) -> bool:
+        """True when the last crawl is complete enough to publish (MAX_MISSING_REPOSITORIES tolerates a few failed repositories)"""
+        return not self.listing_failures and len(self.crawl_failures) <= self.max_missing_repositories
+    
+    def calculate_percentages(self, language_totals: Dict[str, int]) -> Dict[str, float]:
+        """Turn language byte totals into percentages sorted in descending order"""
         total_bytes = sum(language_totals.values())
         if total_bytes == 0:
             return {}
@@ -368,64 +1152,81 @@ class LanguageStatsUpdater:
         
         return sorted_languages
     
+    def compute_language_statistics(self, repository_pages: Iterable[List[RepoRecord]] = None) -> Tuple[Dict[str, float], List[RepoRecord]]:
+        """Stream repositories into the snapshot and return (language percentages, repositories)"""
+        if repository_pages is None:
+            repository_pages = self.iter_repository_pages()
+        
+        snapshot, repositories = self.refresh_language_snapshot(repository_pages)
+        
+        print(f"Found {len(repositories)} repositories")
+        
+        # Runs before the totals so React allocation can use package.json dependencies
+        if self.manifest_detection and repositories:
+            with trace_span('manifest_detection'):
+                self.detect_repository_manifests(repositories)
+        
+        with trace_span('aggregate'):
+            language_totals = self.aggregate_language_totals(snapshot, repositories)
+        
+        if self.activity and repositories:
+            with trace_span('activity_weights'):
+                self.activity_weights = self.activity.compute(repositories)
+            language_totals = self.activity_weighted_totals(language_totals)
+        return self.calculate_percentages(language_totals), repositories
+    
+    def aggregate_language_totals(self, snapshot: Dict[str, Dict], repositories: List[Dict]) -> Dict[str, int]:
+        """Sum the snapshot's language bytes over non-fork repositories (no API calls)"""
+        react_percent = int(os.getenv('REACT_JS_ALLOCATION_PERCENT', '0'))
+        react_repos = [repo['name'] for repo in repositories
+                       if react_percent > 0 and not repo.get('fork', False) and self.is_react_project(repo['name'], repo)]
+        
+        # Kept on the updater so other views (windows, exclusions, archived or private) can be reduced without refetching
+        self.language_matrix = LanguageMatrix.build(snapshot, repositories, react_repos)
+        missing = sum(1 for repo in repositories
+                      if not repo.get('fork', False) and repo['name'] not in snapshot)
+        if missing:
+            print(f"  ⚠️  No language data available for {missing} repositories")
+        if react_repos:
+            print(f"  Detected {len(react_repos)} React projects, converting {react_percent}% of their JavaScript to React")
+        
+        language_totals = self.language_matrix.totals(react_percent=react_percent,
+                                                      exclude_languages=self.excluded_languages)
+        self.repo_languages = self.language_matrix.repo_languages()
+        self.language_totals = language_totals
+        print(f"🧮 Aggregated {len(self.repo_languages)} repositories x {len(self.language_matrix.languages)} languages")
+        return language_totals
+    
+    def activity_weighted_totals(self, language_totals: Dict[str, int]) -> Dict[str, float]:
+        """Spread each repository's activity weight over its languages by byte share (needs language_matrix)"""
+        weighted = self.language_matrix.weighted_totals(
+            self.activity_weights, react_percent=int(os.getenv('REACT_JS_ALLOCATION_PERCENT', '0')),
+            exclude_languages=self.excluded_languages)
+        if not weighted:
+            print("⚠️  No repository was active in the activity window, falling back to byte totals")
+            return language_totals
+        return weighted
+    
+    def calculate_language_statistics(self, repositories: List[Dict] = None) -> Dict[str, float]:
+        """Calculate language usage percentages across all repositories"""
+        repository_pages = None if repositories is None else iter([repositories])
+        language_stats, _ = self.compute_language_statistics(repository_pages)
+        return language_stats
+    
     def get_language_color(self, language: str) -> str:
         """Get color code for a language badge"""
         return self.language_colors.get(language, '808080')  # Default gray
     
     def detect_frameworks_and_tools(self, repositories: List[Dict]) -> Dict[str, bool]:
         """Detect frameworks and tools used across repositories"""
-        detected = {
-            'Flutter': False,
-            'React': False,
-            'Node.js': False,
-            'Firebase': False,
-            'MySQL': False,
-            'Android Studio': False
-        }
-        
-        for repo in repositories:
-            if repo.get('fork', False):
-                continue
-                
-            repo_name = repo['name'].lower()
-            description = (repo.get('description') or '').lower()
-            topics = repo.get('topics', []) if repo.get('topics') else []
-            
-            # Convert topics to lowercase for comparison
-            topics_lower = [topic.lower() for topic in topics]
-            
-            # Detect frameworks based on repo name, description, and topics
-            if any(keyword in repo_name for keyword in ['flutter']) or \
-               any(keyword in description for keyword in ['flutter']) or \
-               'flutter' in topics_lower:
-                detected['Flutter'] = True
-                
-            if any(keyword in repo_name for keyword in ['react']) or \
-               any(keyword in description for keyword in ['react']) or \
-               'react' in topics_lower:
-                detected['React'] = True
-                
-            if any(keyword in repo_name for keyword in ['node', 'nodejs']) or \
-               any(keyword in description for keyword in ['node.js', 'nodejs', 'node js']) or \
-               any(topic in topics_lower for topic in ['nodejs', 'node']):
-                detected['Node.js'] = True
-                
-            if any(keyword in repo_name for keyword in ['firebase']) or \
-               any(keyword in description for keyword in ['firebase']) or \
-               'firebase' in topics_lower:
-                detected['Firebase'] = True
-                
-            if any(keyword in repo_name for keyword in ['mysql']) or \
-               any(keyword in description for keyword in ['mysql']) or \
-               'mysql' in topics_lower:
-                detected['MySQL'] = True
-                
-            if any(keyword in repo_name for keyword in ['android']) or \
-               any(keyword in description for keyword in ['android']) or \
-               'android' in topics_lower:
-                detected['Android Studio'] = True
+        found = set()
+        with trace_span('framework_detection', repositories=len(repositories)):
+            for repo in repositories:
+                if repo.get('fork', False):
+                    continue
+                found |= self.repository_frameworks(repo)
         
-        return detected
+        return {framework: framework in found for framework in self.framework_matcher.frameworks}
     
     def generate_languages_and_tools_section(self, language_stats: Dict[str, float], repositories: List[Dict]) -> str:
         """Generate the complete Languages and Tools section"""
@@ -433,13 +1234,17 @@ class LanguageStatsUpdater:
             return ""
         
         # Get top languages (limit to most relevant ones)
-        top_languages = dict(list(language_stats.items())[:8])
+        top_languages = dict(list(language_stats.items())[:self.badges_top_n])
         
         # Generate programming languages badges
         lang_badges = []
         for language, _ in top_languages.items():
             color = self.get_language_color(language)
             logo = self.logo_slugs.get(language, language.lower())
+            if self.badges_dir:
+                src = self.local_badge(language, '', language, color, 'for-the-badge', logo=logo)
+                lang_badges.append(f'  <img src="{src}" alt="{language}"/>')
+                continue
             # URL encode the language name for the badge
             encoded_lang = language.replace('+', '%2B').replace('#', '%23').replace(' ', '%20')
             badge = f'  <img src="https://img.shields.io/badge/{encoded_lang}-{color}?style=for-the-badge&amp;logo={logo}&amp;logoColor=white" alt="{language}"/>'
@@ -448,20 +1253,17 @@ class LanguageStatsUpdater:
         # Detect frameworks and tools
         frameworks = self.detect_frameworks_and_tools(repositories)
         
-        # Generate framework badges for detected tools
-        framework_mapping = {
-            'Flutter': ('Flutter', '02569B', 'flutter'),
-            'React': ('React', '20232A', 'react'),
-            'Node.js': ('Node.js', '43853D', 'node.js'),
-            'Firebase': ('Firebase', '039BE5', 'Firebase'),
-            'MySQL': ('MySQL', '005C84', 'mysql'),
-            'Android Studio': ('Android_Studio', '3DDC84', 'android-studio')
-        }
-        
         framework_badges = []
         for framework, is_detected in frameworks.items():
-            if is_detected and framework in framework_mapping:
-                name, color, logo = framework_mapping[framework]
+            badge_info = self.framework_matcher.badges.get(framework)
+            if is_detected and badge_info:
+                name = badge_info.get('label', framework)
+                color = badge_info.get('color', '808080')
+                logo = badge_info.get('logo', framework.lower())
+                if self.badges_dir:
+                    src = self.local_badge(framework, '', name, color, 'for-the-badge', logo=logo)
+                    framework_badges.append(f'  <img src="{src}" alt="{framework}"/>')
+                    continue
                 badge = f'  <img src="https://img.shields.io/badge/{name}-{color}?style=for-the-badge&amp;logo={logo}&amp;logoColor=white" alt="{framework}"/>'
                 framework_badges.append(badge)
         
@@ -487,8 +1289,8 @@ class LanguageStatsUpdater:
         if not language_stats:
             return ""
         
-        # Take top 10 languages
-        top_languages = dict(list(language_stats.items())[:10])
+        # Take the top languages for the table
+        top_languages = dict(list(language_stats.items())[:self.table_top_n])
         
         table_lines = [
             "| Language   | Percentage | Progress Bar |",
@@ -499,6 +1301,12 @@ class LanguageStatsUpdater:
             color = self.get_language_color(language)
             percentage_str = f"{percentage:.2f}%"
             
+            if self.badges_dir:
+                src = self.local_badge(f'{language}-percent', language, percentage_str, color, 'flat-square',
+                                       label_color='000000' if language == 'JavaScript' else '555555')
+                table_lines.append(f"| {language:<10} | {percentage_str:<10} | ![{language}]({src}) |")
+                continue
+            
             # URL encode the language name and percentage for the badge
             encoded_lang = language.replace('+', '%2B').replace('#', '%23').replace(' ', '%20')
             encoded_percentage = percentage_str.replace('%', '%25')
@@ -513,121 +1321,269 @@ class LanguageStatsUpdater:
         
         return "\n".join(table_lines)
     
-    def update_readme(self, language_stats: Dict[str, float], repositories: List[Dict]) -> bool:
-        """Update the README.md file with new language statistics and tools"""
-        # Use portable path that works locally and in CI
-        workspace = os.getenv('GITHUB_WORKSPACE', '.')
-        readme_path = os.path.join(workspace, 'README.md')
-        
+    # Human-readable names for the marker sections this script maintains
+    SECTION_LABELS = {
+        'LANG-TABLE': 'language table',
+        'LANG-TOOLS': 'languages and tools section',
+    }
+    
+    def local_badge(self, slug: str, label: str, message: str, color: str, style: str,
+                    label_color: str = '555555', logo: str = None) -> str:
+        """Render a badge into badge_files and return its path relative to the README"""
+        svg = render_badge(label, message, color, style, label_color, load_logo(self.badge_logos_dir, logo))
+        name = badge_file_name(slug, svg)
+        self.badge_files[name] = svg
+        return f'{self.badges_dir}/{name}'
+    
+    def badge_directory(self) -> str:
+        return os.path.join(os.path.dirname(self.readme_path), *self.badges_dir.split('/'))
+    
+    def build_readme_sections(self, language_stats: Dict[str, float], repositories: List[Dict]) -> Dict[str, str]:
+        """Render every generated section once, keyed by marker name (badges go to badge_files)"""
+        self.badge_files = {}
+        return {
+            'LANG-TABLE': self.generate_language_table(language_stats),
+            'LANG-TOOLS': self.generate_languages_and_tools_section(language_stats, repositories),
+        }
+    
+    def update_target_file(self, path: str, sections: Dict[str, str], required: bool = False) -> bool:
+        """Splice the generated sections into one file; returns True if it was rewritten"""
+        file_name = os.path.basename(path)
+        self.target_status[path] = 'failed'
         try:
-            with open(readme_path, 'r', encoding='utf-8') as file:
+            with open(path, 'r', encoding='utf-8') as file:
                 content = file.read()
         except FileNotFoundError:
-            print(f"README.md not found at {readme_path}")
+            print(f"{file_name} not found at {path}")
             return False
         
-        # Generate new content
-        new_table = self.generate_language_table(language_stats)
-        new_tools_section = self.generate_languages_and_tools_section(language_stats, repositories)
+        new_content, changed, missing = splice_sections(content, sections)
         
-        if not new_table or not new_tools_section:
-            print("No language statistics to update")
+        if required and missing:
+            for name in missing:
+                print(f"⚠️  Could not find {self.SECTION_LABELS.get(name, name)} with markers in {file_name}")
             return False
         
-        # Find and replace the language statistics table using HTML markers
-        table_pattern = r'(<!-- LANG-TABLE-START -->\s*\n\| Language\s+\| Percentage\s+\| Progress Bar \|\s*\n\|[^\n]+\|\s*\n)(.*?)(\n<!-- LANG-TABLE-END -->)'
-        table_lines = new_table.split('\n')
-        table_data_rows = '\n'.join(table_lines[2:])  # Skip header and separator
-        
-        if re.search(table_pattern, content, flags=re.MULTILINE | re.DOTALL):
-            table_replacement = f"\\1{table_data_rows}\\3"
-            new_content = re.sub(table_pattern, table_replacement, content, flags=re.MULTILINE | re.DOTALL)
-            print("✅ Successfully updated language table")
-        else:
-            print("⚠️  Could not find language table section with markers")
+        if not changed:
+            print(f"No changes needed in {file_name}")
+            self.target_status[path] = 'unchanged'
             return False
         
-        # Find and replace the Languages and Tools section using HTML markers
-        tools_pattern = r'(<!-- LANG-TOOLS-START -->\s*\n)(.*?)(\n<!-- LANG-TOOLS-END -->)'
+        for name in changed:
+            print(f"✅ Successfully updated {self.SECTION_LABELS.get(name, name)} in {file_name}")
         
-        if re.search(tools_pattern, new_content, flags=re.MULTILINE | re.DOTALL):
-            tools_replacement = f"\\1{new_tools_section}\\3"
-            new_content = re.sub(tools_pattern, tools_replacement, new_content, flags=re.MULTILINE | re.DOTALL)
-            print("✅ Successfully updated languages and tools section")
-        else:
-            print("⚠️  Could not find languages and tools section with markers")
-            return False
+        # Write updated content through a temp file so a crash never leaves a truncated file
+        write_atomic(path, new_content)
+        
+        print(f"{file_name} updated successfully")
+        self.target_status[path] = 'updated'
+        return True
+    
+    def update_readme(self, language_stats: Dict[str, float], repositories: List[Dict]) -> bool:
+        """Update README.md (and any extra target files) with new language statistics and tools"""
+        # Generate new content once for every target
+        with trace_span('render'):
+            sections = self.build_readme_sections(language_stats, repositories)
         
-        # Check if content actually changed
-        if new_content == content:
-            print("No changes needed in README.md")
+        if not all(sections.values()):
+            print("No language statistics to update")
             return False
         
-        # Write updated content
-        with open(readme_path, 'w', encoding='utf-8') as file:
-            file.write(new_content)
+        with trace_span('write'):
+            return self.write_sections(sections, self.badge_files)
+    
+    def write_sections(self, sections: Dict[str, str], badges: Dict[str, str] = None) -> bool:
+        """Splice rendered sections into README.md and the extra targets; returns True if any file changed"""
+        # Without a README nothing would reference the badges (e.g. batch output dirs)
+        if not os.path.exists(self.readme_path):
+            badges = None
+        # Badges first, so the README never points at a file that is not there yet
+        if badges:
+            try:
+                written = write_badges(self.badge_directory(), badges)
+                if written:
+                    print(f"🏷️  Rendered {written} new badges into {self.badge_directory()}")
+            except OSError as e:
+                print(f"⚠️  Could not write badges: {e}")
+        try:
+            return self.splice_targets(sections)
+        finally:
+            # Old badges are only unreferenced once README.md holds the new sections
+            if badges and self.target_status.get(self.readme_path) in ('updated', 'unchanged'):
+                try:
+                    removed = prune_badges(self.badge_directory(), badges)
+                    if removed:
+                        print(f"🧹 Removed {removed} unreferenced badges")
+                except OSError as e:
+                    print(f"⚠️  Could not prune badges: {e}")
+    
+    def splice_targets(self, sections: Dict[str, str]) -> bool:
+        """write_sections without the badges"""
+        # Reading and comparing the files is cheap, and it repairs hand-edited or reverted files
+        # and new targets; the sections hash is only kept for the history
+        if self.history and self.history_run_id:
+            try:
+                self.history.set_sections_hash(self.history_run_id, content_hash(json.dumps(sections, sort_keys=True)))
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not record the sections hash: {e}")
         
-        print("README.md updated successfully")
+        updated = self.update_target_file(self.readme_path, sections, required=True)
+        for path in self.extra_targets:
+            updated = self.update_target_file(path, sections) or updated
+        return updated
+    
+    def stage_publish(self, observation: Dict = None, repositories: List[Dict] = None) -> bool:
+        """Stage --confirm-publish for output that left README.md in sync; every publish path ends here.
+        
+        observation is the listing probe taken before the data was crawled; with it the
+        confirmation also saves the preflight watermark. Returns False (and drops any
+        older staged confirmation) when README.md could not be written.
+        """
+        if self.target_status.get(self.readme_path) not in ('updated', 'unchanged'):
+            self.discard_pending_publish()
+            return False
+        pending = {'history_run_id': self.history_run_id}
+        if observation is not None:
+            pending['watermark'] = dict(observation, settings=self.settings_fingerprint(),
+                                        card_totals=self.card_totals(repositories or []))
+        self.save_pending_publish(pending)
         return True
     
-    def run(self):
-        """Main execution function with enhanced repository detection"""
+    def discard_pending_publish(self) -> None:
+        """Drop a confirmation staged earlier so it cannot vouch for newer output"""
         try:
-            print(f"🚀 Starting language statistics update for user: {self.username}")
-            print("=" * 50)
-            
-            # Validate GitHub token first
-            print("🔐 Validating GitHub token...")
-            if not self.validate_github_token():
-                print("⚠️  Continuing without valid authentication...")
-            
-            # Get repositories first
-            repositories = self.get_user_repositories()
-            
-            if not repositories:
-                print("❌ No repositories found")
-                print("This could be due to:")
-                print("  - Network connectivity issues")
-                print("  - User has no public repositories")
-                print("  - API rate limiting")
-                print("  - Repository privacy settings")
-                print("⚠️  Exiting gracefully...")
-                return  # Exit gracefully instead of raising exception
-            
-            # Detect new repositories for immediate attention
-            print("\n🔍 Checking for recently created repositories...")
-            recent_repos = self.detect_new_repositories(repositories)
-            
-            # Calculate language statistics using all repositories
-            print(f"\n📊 Calculating language statistics across {len(repositories)} repositories...")
-            language_stats = self.calculate_language_statistics(repositories)
-            
-            if not language_stats:
-                print("⚠️  No language statistics calculated - this might be due to:")
-                print("   - All repositories are forks (excluded from stats)")
-                print("   - API rate limiting")
-                print("   - Network connectivity issues")
-                print("   - Empty repositories with no detectable languages")
-                return
-            
-            print(f"\n📈 Language Statistics (Top {min(len(language_stats), 10)} languages):")
-            for i, (language, percentage) in enumerate(list(language_stats.items())[:10], 1):
-                print(f"  {i:2d}. {language}: {percentage:.2f}%")
-            
-            # Update README with both language stats and tools
-            print(f"\n📝 Updating README.md with latest statistics...")
-            updated = self.update_readme(language_stats, repositories)
-            
-            if updated:
-                print("✅ README.md updated successfully!")
-                if recent_repos:
-                    print(f"🎉 Included {len(recent_repos)} recently created repositories in the update!")
+            os.remove(self.pending_publish_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️  Could not drop the staged publish confirmation: {e}")
+    
+    def save_pending_publish(self, pending: Dict) -> None:
+        """Stage what --confirm-publish records once the updated files are pushed"""
+        directory = os.path.dirname(self.pending_publish_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        try:
+            write_atomic(self.pending_publish_path, json.dumps(dict(pending, username=self.username), indent=1))
+        except OSError as e:
+            print(f"⚠️  Could not stage the publish confirmation: {e}")
+    
+    def confirm_publish(self) -> bool:
+        """Record the last run as published (call after its files were pushed); returns False if nothing was pending"""
+        try:
+            with open(self.pending_publish_path, 'r', encoding='utf-8') as file:
+                pending = json.load(file)
+        except FileNotFoundError:
+            print("ℹ️  No run waiting for publish confirmation")
+            return False
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable publish confirmation: {e}")
+            return False
+        if pending.get('username') != self.username:
+            print(f"⚠️  The pending publish belongs to {pending.get('username')}, not {self.username}")
+            return False
+        
+        if self.history and pending.get('history_run_id'):
+            try:
+                self.history.mark_published(pending['history_run_id'])
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not mark the run as published: {e}")
+        # From now on the preflight may skip runs that would publish the same output
+        if pending.get('watermark'):
+            self.save_watermark(pending['watermark'])
+        os.remove(self.pending_publish_path)
+        print(f"📌 Confirmed publish of run #{pending.get('history_run_id') or '-'} for {self.username}")
+        return True
+    
+    def record_history(self) -> None:
+        """Append this run's per-repo language bytes and totals to the history store"""
+        try:
+            self.history_run_id = self.history.record_run(self.username, self.repo_languages, self.language_totals)
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not record language history: {e}")
+            return
+        latest = self.history.latest_run(self.username)
+        if latest and latest[1] != latest[0]:
+            print(f"📜 Recorded run #{self.history_run_id}; no byte changes since the previous run")
+            return
+        deltas = self.history.language_deltas(self.username)
+        changes = ', '.join(f"{language} {delta:+,}" for language, delta in list(deltas.items())[:5])
+        print(f"📜 Recorded run #{self.history_run_id}" + (f"; biggest changes: {changes}" if changes else ""))
+    
+    def write_json_output(self, language_stats: Dict[str, float], repositories: List[Dict]) -> None:
+        """Write the computed statistics as JSON for consumers other than the README"""
+        frameworks = self.detect_frameworks_and_tools(repositories)
+        payload = {
+            'account': self.username,
+            'account_type': self.account_type,
+            'repository_count': len(repositories),
+            'weighting': f'activity ({self.activity.metric}, {self.activity.window_weeks} weeks)' if self.activity else 'bytes',
+            'languages': {language: round(percentage, 4) for language, percentage in language_stats.items()},
+            'frameworks': sorted(name for name, detected in frameworks.items() if detected),
+        }
+        directory = os.path.dirname(self.json_output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.json_output_path, 'w', encoding='utf-8') as file:
+            json.dump(payload, file, indent=2)
+        print(f"💾 Wrote language statistics JSON to {self.json_output_path}")
+    
+    def render_profile_cards(self, language_stats: Dict[str, float], repositories: List[Dict]) -> Dict[str, str]:
+        """Render the top-languages and stats SVG cards, keyed by file name"""
+        owned = [repo for repo in repositories if not repo.get('fork', False)]
+        stars, forks = self.card_totals(owned)
+        stats = [
+            ('Total Stars', f"{stars:,}"),
+            ('Total Forks', f"{forks:,}"),
+            ('Repositories', f"{len(owned):,}"),
+            ('Languages', f"{len(language_stats):,}"),
+            ('Top Language', next(iter(language_stats), '-')),
+        ]
+        return {
+            'top-langs.svg': render_top_languages_card(
+                language_stats, self.language_colors, self.card_theme, self.card_layout, self.card_langs_count),
+            'github-stats.svg': render_stats_card(stats, self.card_theme, f"{self.username}'s GitHub Stats"),
+        }
+    
+    def write_profile_cards(self, language_stats: Dict[str, float], repositories: List[Dict],
+                            cards: Dict[str, str] = None) -> None:
+        """Write the SVG cards into cards_dir, rendering them unless already given"""
+        if cards is None:
+            cards = self.render_profile_cards(language_stats, repositories)
+        for file_name, svg in cards.items():
+            path = os.path.join(self.cards_dir, file_name)
+            if write_card(path, svg):
+                print(f"🖼️  Rendered {path}")
             else:
-                print("ℹ️  No changes needed - statistics are already up to date")
-            
-            print("=" * 50)
-            print("🏁 Language statistics update completed")
-            
+                print(f"No changes needed in {path}")
+    
+    def export_metrics(self) -> None:
+        """Write the request metrics as a JSON summary and/or Prometheus textfile"""
+        summary = self.metrics.to_dict()
+        print(f"📡 API usage: {summary['requests_total']} requests, {summary['not_modified_total']} not modified, "
+              f"{summary['retries_total']} retries, {summary['rate_limit_waits_total']} rate-limit waits, "
+              f"budget remaining: {summary['rate_limit_remaining'] if summary['rate_limit_remaining'] is not None else 'unknown'}")
+        if self.token_pool:
+            print(f"🔑 Token pool usage: {self.token_pool.summary()}")
+        try:
+            if self.metrics_json_path:
+                self.metrics.write_json(self.metrics_json_path)
+                print(f"💾 Wrote run metrics to {self.metrics_json_path}")
+            if self.metrics_prometheus_path:
+                self.metrics.write_prometheus(self.metrics_prometheus_path, {'account': self.username})
+                print(f"💾 Wrote Prometheus metrics to {self.metrics_prometheus_path}")
+        except OSError as e:
+            print(f"⚠️  Could not write metrics: {e}")
+    
+    def run(self) -> bool:
+        """Main execution function with enhanced repository detection; returns True when stats were computed"""
+        self.tracer.start()
+        try:
+            with trace_span('run', account=self.username):
+                return self.run_phases()
+        except RateLimitError as e:
+            # Publishing stats with repositories missing would be worse than failing
+            print(f"❌ Rate limit budget exhausted, README left untouched: {e}")
+            raise
         except Exception as e:
             print(f"❌ Fatal error during execution: {e}")
             print(f"Error type: {type(e).__name__}")
@@ -636,14 +1592,142 @@ class LanguageStatsUpdater:
             traceback.print_exc()
             # Don't raise the exception, just exit gracefully
             print("⚠️  Exiting gracefully to prevent workflow failure")
-            return
+            return False
+        finally:
+            if self.metrics.run_success is None:
+                self.metrics.run_success = False
+            self.tracer.finish()
+            self.export_metrics()
+    
+    def run_phases(self) -> bool:
+        """The phases of run(), each timed in its own trace span"""
+        print(f"🚀 Starting language statistics update for user: {self.username}")
+        print("=" * 50)
+        
+        # A confirmation staged by an earlier run must not vouch for this one
+        self.discard_pending_publish()
+        
+        # Idle days end here, after a single listing request
+        if self.force_full_run:
+            print("⏩ FORCE_FULL_RUN is set, skipping the change-detection preflight")
+        else:
+            with trace_span('preflight'):
+                unchanged = self.preflight_unchanged()
+            if unchanged:
+                print("💤 No settings or repositories changed since the last published run - nothing to do")
+                self.metrics.run_success = True
+                return True
+        
+        # Validate GitHub token first
+        print("🔐 Validating GitHub token...")
+        with trace_span('validate_token'):
+            if not self.validate_github_token():
+                print("⚠️  Continuing without valid authentication...")
+        
+        # Watermark for the next preflight, observed before crawling so pushes during the run are not missed
+        listing_url, listing_params, _, _ = self.get_listing_endpoints()
+        observation = self.preflight_observation
+        if observation is None or observation['endpoint'] != listing_url:
+            with trace_span('observe_watermark'):
+                observation = self.observe_latest_push(listing_url, listing_params)
+        
+        # Make sure the run can finish before starting to crawl (the observation sizes a first run)
+        with trace_span('plan_budget'):
+            self.plan_run_budget(observation['repo_count'] if observation else 0)
+        
+        # Stream the repository listing straight into the language fetches
+        print("\n📊 Calculating language statistics...")
+        with trace_span('crawl'):
+            language_stats, repositories = self.compute_language_statistics()
+        self.log_repository_totals(repositories)
+        
+        if repositories and not self.dataset_complete():
+            # Percentages without the missing repositories would be skewed
+            print(f"⏸️  Dataset incomplete ({len(self.listing_failures)} listing errors, "
+                  f"{len(self.crawl_failures)} repositories missing), README left untouched; rerun to resume")
+            return False
+        
+        if not repositories:
+            print("❌ No repositories found")
+            print("This could be due to:")
+            print("  - Network connectivity issues")
+            print("  - User has no public repositories")
+            print("  - API rate limiting")
+            print("  - Repository privacy settings")
+            print("⚠️  Exiting gracefully...")
+            return False  # Exit gracefully instead of raising exception
+        
+        # Detect new repositories for immediate attention
+        print("\n🔍 Checking for recently created repositories...")
+        recent_repos = self.detect_new_repositories(repositories)
+        
+        if not language_stats:
+            print("⚠️  No language statistics calculated - this might be due to:")
+            print("   - All repositories are forks (excluded from stats)")
+            print("   - API rate limiting")
+            print("   - Network connectivity issues")
+            print("   - Empty repositories with no detectable languages")
+            return False
+        
+        if self.history:
+            with trace_span('record_history'):
+                self.record_history()
+        
+        print(f"\n📈 Language Statistics (Top {min(len(language_stats), 10)} languages):")
+        for i, (language, percentage) in enumerate(list(language_stats.items())[:10], 1):
+            print(f"  {i:2d}. {language}: {percentage:.2f}%")
+        
+        if self.json_output_path:
+            with trace_span('write_json_output'):
+                self.write_json_output(language_stats, repositories)
+        
+        # Update README with both language stats and tools
+        print("\n📝 Updating README.md with latest statistics...")
+        updated = self.update_readme(language_stats, repositories)
+        
+        if updated:
+            print("✅ README.md updated successfully!")
+            if recent_repos:
+                print(f"🎉 Included {len(recent_repos)} recently created repositories in the update!")
+        else:
+            print("ℹ️  No changes needed - statistics are already up to date")
+        
+        if self.cards_dir:
+            with trace_span('profile_cards'):
+                self.write_profile_cards(language_stats, repositories)
+        
+        if self.response_cache:
+            with trace_span('prune_cache'):
+                evicted = self.response_cache.prune()
+            if evicted:
+                print(f"🧹 Evicted {evicted} stale entries from the API response cache")
+        
+        # Only a run that left README.md in sync may let the next one short-circuit, and only once
+        # --confirm-publish reports the push went through
+        self.stage_publish(observation, repositories)
+        
+        print("=" * 50)
+        print("🏁 Language statistics update completed")
+        self.metrics.run_success = True
+        return True
 
 def main():
+    parser = argparse.ArgumentParser(description='Update the language statistics in README.md')
+    parser.add_argument('--profile', nargs='?', metavar='TRACE_PATH', default=os.getenv('TRACE_OUTPUT_PATH'),
+                        const=os.path.join(os.getenv('GITHUB_WORKSPACE', '.'), '.cache', 'language-stats-trace.json'),
+                        help='write a Chrome trace / speedscope JSON of every phase and request '
+                             '(default path: .cache/language-stats-trace.json)')
+    parser.add_argument('--cprofile', metavar='PATH', default=os.getenv('CPROFILE_OUTPUT_PATH'),
+                        help='also dump cProfile stats of the run to PATH')
+    parser.add_argument('--confirm-publish', action='store_true',
+                        help='record the last run as published; run it after the updated files were pushed')
+    args = parser.parse_args()
+    
     github_token = os.getenv('GITHUB_TOKEN')
     username = os.getenv('GITHUB_USERNAME')
     
     # Allow empty token for unauthenticated access
-    if not github_token:
+    if not github_token and not env_tokens():
         print("⚠️  No GITHUB_TOKEN provided, using unauthenticated access")
         github_token = ""
     
@@ -652,7 +1736,14 @@ def main():
         return 1
     
     updater = LanguageStatsUpdater(github_token, username)
-    updater.run()
+    if args.confirm_publish:
+        updater.confirm_publish()
+        return 0
+    updater.tracer = RunTracer(args.profile, args.cprofile)
+    try:
+        updater.run()
+    except RateLimitError:
+        return 1
     
     return 0
 
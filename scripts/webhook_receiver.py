@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Long-running GitHub webhook receiver for incremental language statistics.
+Accepts signed push and repository events, coalesces bursts per repository,
+refetches only the affected repositories' languages into running totals, and
+regenerates the README (and cards/JSON) at most once per interval.
+
+Usage:
+    WEBHOOK_SECRET=... GITHUB_TOKEN=... GITHUB_USERNAME=octocat python scripts/webhook_receiver.py --port 8080
+    python scripts/webhook_receiver.py --debounce 10 --interval 300 --on-update "git commit -am 'stats' && git push"
+
+Point the webhooks of your repositories (or an organization/user-level hook)
+at http://<host>:<port>/ with content type application/json and the same secret.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from rate_limiter import RateLimitError
+from repo_record import RepoRecord
+from update_language_stats import LanguageStatsUpdater
+
+# Repository event actions that change what the stats should contain
+REFRESH_ACTIONS = {'created', 'edited', 'publicized', 'privatized', 'archived', 'unarchived', 'transferred'}
+
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    """Check an X-Hub-Signature-256 header against the raw request body"""
+    if not signature or not signature.startswith('sha256='):
+        return False
+    expected = 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class WebhookReceiver:
+    def __init__(self, updater: LanguageStatsUpdater, secret: str, debounce: float = 10.0,
+                 interval: float = 300.0, on_update: str = None):
+        self.updater = updater
+        self.secret = secret
+        self.debounce = debounce
+        self.interval = interval
+        self.on_update = on_update
+
+        # {repo name: 'refresh' | 'delete'}; later events for the same repository overwrite earlier ones
+        self.pending: Dict[str, str] = {}
+        self.first_event_at = 0.0
+        self.last_event_at = 0.0
+        self.last_publish_at = 0.0
+        self.events_received = 0
+        self.batch_events = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+
+        # Running state: repository metadata, per-repo language bytes and each repo's contribution to the totals
+        self.repositories: Dict[str, RepoRecord] = {}
+        self.snapshot: Dict[str, Dict] = {}
+        self.contributions: Dict[str, Dict[str, int]] = {}
+        self.language_totals: Dict[str, int] = {}
+
+    def bootstrap(self) -> None:
+        """Build the running totals once from a full (snapshot-backed, so mostly cached) crawl"""
+        print(f"🚀 Bootstrapping running totals for {self.updater.username}...")
+        self.updater.validate_github_token()
+        snapshot, repositories = self.updater.refresh_language_snapshot(self.updater.iter_repository_pages())
+        if not self.updater.dataset_complete():
+            raise RuntimeError("the initial crawl is incomplete (progress is checkpointed, restart to resume)")
+        self.snapshot = snapshot
+        self.repositories = {repo['name']: repo for repo in repositories}
+        for repo_name in self.snapshot:
+            if repo_name in self.repositories:
+                self.apply_contribution(repo_name)
+        print(f"✅ Tracking {len(self.repositories)} repositories, {len(self.language_totals)} languages")
+
+    def apply_contribution(self, repo_name: str) -> None:
+        """Replace one repository's share of the running totals with its current one"""
+        for language, size in self.contributions.pop(repo_name, {}).items():
+            self.language_totals[language] -= size
+            if self.language_totals[language] <= 0:
+                del self.language_totals[language]
+
+        repo = self.repositories.get(repo_name)
+        languages = self.snapshot.get(repo_name, {}).get('languages')
+        if not repo or repo.get('fork', False) or not languages:
+            return
+        contribution = {}
+        self.updater.add_repository_languages(contribution, repo, languages)
+        self.contributions[repo_name] = contribution
+        for language, size in contribution.items():
+            self.language_totals[language] = self.language_totals.get(language, 0) + size
+
+    def enqueue(self, event: str, payload: Dict) -> str:
+        """Record what an event means for the stats; returns a short description for the response"""
+        repository = payload.get('repository') or {}
+        owner = (repository.get('owner') or {}).get('login', '')
+        name = repository.get('name')
+        if event == 'ping':
+            return 'pong'
+        if not name or owner.lower() != self.updater.username.lower():
+            return 'ignored: not a repository of this account'
+
+        action = payload.get('action')
+        if event == 'push':
+            change = {name: 'refresh'}
+        elif event == 'repository' and action == 'deleted':
+            change = {name: 'delete'}
+        elif event == 'repository' and action == 'renamed':
+            old_name = (((payload.get('changes') or {}).get('repository') or {}).get('name') or {}).get('from')
+            change = {old_name: 'delete', name: 'refresh'} if old_name else {name: 'refresh'}
+        elif event == 'repository' and action in REFRESH_ACTIONS:
+            change = {name: 'refresh'}
+        else:
+            return f'ignored: {event}/{action}'
+
+        self.queue(change)
+        return 'queued: ' + ', '.join(f'{repo} ({kind})' for repo, kind in change.items())
+
+    def queue(self, change: Dict[str, str], events: int = 1) -> None:
+        """Add {repo name: 'refresh' | 'delete'} to the pending batch"""
+        with self.condition:
+            now = time.time()
+            if not self.pending:
+                self.first_event_at = now
+            self.pending.update(change)
+            self.last_event_at = now
+            self.events_received += events
+            self.condition.notify()
+
+    def take_batch(self) -> Optional[Dict[str, str]]:
+        """Block until a batch is due (quiet for `debounce`, or waiting `interval`, and rate-limited to one per `interval`)"""
+        with self.condition:
+            while not self.stopping:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                now = time.time()
+                quiet_at = self.last_event_at + self.debounce
+                # A steady stream of events must not postpone the update forever
+                overdue_at = self.first_event_at + self.interval
+                allowed_at = self.last_publish_at + self.interval
+                due_at = max(min(quiet_at, overdue_at), allowed_at)
+                if now >= due_at:
+                    batch, self.pending = self.pending, {}
+                    self.batch_events, self.events_received = self.events_received, 0
+                    return batch
+                self.condition.wait(timeout=due_at - now)
+            return None
+
+    def refresh_repository(self, repo_name: str) -> None:
+        """Refetch one repository's metadata and languages"""
+        url = f'{self.updater.base_url}/repos/{self.updater.username}/{repo_name}'
+        data = self.updater.make_github_request(url)
+        if not data or 'name' not in data:
+            print(f"  ⚠️  Could not fetch {repo_name}; keeping its previous data")
+            return
+        repo = RepoRecord.from_rest(data)
+        self.repositories[repo_name] = repo
+        # Description or topics may have changed, so detect frameworks afresh
+        self.updater.forget_repository_frameworks(repo_name)
+        if repo.fork:
+            self.snapshot.pop(repo_name, None)
+            return
+        languages = self.updater.get_repository_languages(repo_name)
+        if languages is not None:
+            self.snapshot[repo_name] = {'pushed_at': repo.pushed_at, 'languages': languages}
+
+    def process_batch(self, batch: Dict[str, str]) -> None:
+        """Apply one coalesced batch and regenerate the outputs once"""
+        started = time.perf_counter()
+        print(f"\n📥 Applying {len(batch)} repository change(s) from {self.batch_events} event(s)")
+
+        for repo_name, kind in batch.items():
+            if kind == 'delete':
+                print(f"  🗑️  {repo_name} removed")
+                self.repositories.pop(repo_name, None)
+                self.snapshot.pop(repo_name, None)
+                self.updater.forget_repository_frameworks(repo_name)
+            else:
+                print(f"  🔄 {repo_name} refreshed")
+                self.refresh_repository(repo_name)
+            self.apply_contribution(repo_name)
+
+        self.publish()
+        self.last_publish_at = time.time()
+        print(f"⏱️  Incremental update finished in {time.perf_counter() - started:.2f}s")
+
+    def publish(self) -> None:
+        """Write the README, snapshot, history, JSON and cards from the running totals"""
+        updater = self.updater
+        language_stats = updater.calculate_percentages(self.language_totals)
+        repositories = list(self.repositories.values())
+
+        updater.save_language_snapshot(self.snapshot)
+        updater.repo_languages = {name: entry['languages'] for name, entry in self.snapshot.items()}
+        updater.language_totals = dict(self.language_totals)
+        if updater.history:
+            updater.record_history()
+
+        updated = updater.update_readme(language_stats, repositories)
+        if updater.json_output_path:
+            updater.write_json_output(language_stats, repositories)
+        if updater.cards_dir:
+            updater.write_profile_cards(language_stats, repositories)
+
+        # No watermark: events can lag the listing, so the next full run must not be skipped on it
+        staged = updater.stage_publish()
+        if updated and self.on_update:
+            print(f"📤 Running update hook: {self.on_update}")
+            result = subprocess.run(self.on_update, shell=True, cwd=os.getenv('GITHUB_WORKSPACE', '.'))
+            if result.returncode != 0:
+                print(f"⚠️  Update hook exited with status {result.returncode}")
+            elif staged:
+                # The hook is what publishes, so its success is the confirmation
+                updater.confirm_publish()
+
+    def run_worker(self) -> None:
+        while True:
+            batch = self.take_batch()
+            if batch is None:
+                return
+            try:
+                self.process_batch(batch)
+            except RateLimitError as e:
+                # Put the work back; the next batch is at least one interval away
+                print(f"❌ Rate limited, will retry later: {e}")
+                with self.condition:
+                    for repo_name, kind in batch.items():
+                        self.pending.setdefault(repo_name, kind)
+                    self.last_publish_at = time.time()
+            except Exception as e:
+                print(f"❌ Incremental update failed: {type(e).__name__}: {e}")
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    receiver: WebhookReceiver = None
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def reply(self, status: int, message: str) -> None:
+        payload = json.dumps({'message': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        # Health check for load balancers and uptime monitors
+        self.reply(200, f'ok, {len(self.receiver.pending)} repositories pending')
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length', '0') or 0))
+        if not verify_signature(self.receiver.secret, body, self.headers.get('X-Hub-Signature-256')):
+            print("⚠️  Rejected webhook with a missing or invalid signature")
+            return self.reply(401, 'invalid signature')
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return self.reply(400, 'invalid JSON')
+
+        event = self.headers.get('X-GitHub-Event', '')
+        result = self.receiver.enqueue(event, payload)
+        print(f"📨 {event} ({self.headers.get('X-GitHub-Delivery', '-')}): {result}")
+        # Answer immediately: GitHub times deliveries out after 10 seconds
+        self.reply(202 if result.startswith('queued') else 200, result)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Incremental language stats from GitHub webhooks')
+    parser.add_argument('--host', default=os.getenv('WEBHOOK_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('WEBHOOK_PORT', '8080')))
+    parser.add_argument('--debounce', type=float, default=float(os.getenv('WEBHOOK_DEBOUNCE_SECONDS', '10')),
+                        help='seconds without new events before a batch is applied')
+    parser.add_argument('--interval', type=float, default=float(os.getenv('WEBHOOK_MIN_INTERVAL_SECONDS', '300')),
+                        help='minimum seconds between README regenerations')
+    parser.add_argument('--on-update', default=os.getenv('WEBHOOK_ON_UPDATE'),
+                        help='shell command run in the workspace after files changed (e.g. git commit and push)')
+    args = parser.parse_args()
+
+    secret = os.getenv('WEBHOOK_SECRET')
+    username = os.getenv('GITHUB_USERNAME')
+    if not secret:
+        print("Error: WEBHOOK_SECRET environment variable not set")
+        return 1
+    if not username:
+        print("Error: GITHUB_USERNAME environment variable not set")
+        return 1
+
+    updater = LanguageStatsUpdater(os.getenv('GITHUB_TOKEN', ''), username)
+    receiver = WebhookReceiver(updater, secret, args.debounce, args.interval, args.on_update)
+    try:
+        receiver.bootstrap()
+    except (RateLimitError, RuntimeError) as e:
+        print(f"❌ Could not bootstrap: {e}")
+        return 1
+
+    WebhookHandler.receiver = receiver
+    server = ThreadingHTTPServer((args.host, args.port), WebhookHandler)
+    worker = threading.Thread(target=receiver.run_worker, daemon=True)
+    worker.start()
+    print(f"👂 Listening for webhooks on http://{args.host}:{server.server_port}/ "
+          f"(debounce {args.debounce:.0f}s, at most one update per {args.interval:.0f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        receiver.stop()
+        server.server_close()
+        updater.export_metrics()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())